@@ -1,5 +1,4 @@
 from flask import Flask
-from flask_restx import Api
 from flask_cors import CORS
 
 from app.extensions import db, bcrypt, jwt
@@ -15,31 +14,49 @@ def create_app(config_class):
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
          supports_credentials=True)
     
+    from app.db.database import engine_options
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(app.config),
+        **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+
     # Initialize extensions
     db.init_app(app)
+
+    from app.db.session import SessionLocal
+    from app.db.sqlite import install_sqlite_profile
+    with app.app_context():
+        for engine in db.engines.values():
+            install_sqlite_profile(engine, app.config.get("SQLITE_PROFILE", "default"))
+        SessionLocal.configure(bind=db.engine)
+
     bcrypt.init_app(app)
     jwt.init_app(app)
+
+    from app.services import passwords
+    passwords.init_app(app)
+
+    # after_request hooks run in reverse order of registration: compress the
+    # response after the unit of work has settled its status
+    from app import compression
+    compression.init_app(app)
+
+    from app.services import singleflight, unit_of_work
+    unit_of_work.init_app(app)
+    singleflight.init_app(app)
+
+    # registers the session listeners that bump per-table write counters
+    from app.db import versions  # noqa: F401
+
+    from app.cache import fragments, objects as object_cache
+    object_cache.init_app(app)
+    fragments.init_app(app)
+
+    from app.commands import register_commands
+    register_commands(app)
     
-    # Create API
-    api = Api(
-        app,
-        version="1.0",
-        title="HBnB API",
-        description="HBnB Application API",
-        doc="/api/v1/"
-    )
-    
-    # Import and register namespaces
-    from app.api.v1.users import api as users_ns
-    from app.api.v1.auth import api as auth_ns
-    from app.api.v1.amenities import api as amenities_ns
-    from app.api.v1.places import api as places_ns
-    from app.api.v1.reviews import api as reviews_ns
-    
-    api.add_namespace(users_ns, path="/api/v1/users")
-    api.add_namespace(auth_ns, path="/api/v1/auth")
-    api.add_namespace(amenities_ns, path="/api/v1/amenities")
-    api.add_namespace(places_ns, path="/api/v1/places")
-    api.add_namespace(reviews_ns, path="/api/v1/reviews")
-    
+    # the API (flask-restx, namespaces, facade), now or on the first request
+    from app.api import v1
+    v1.init_app(app)
+
     return app
@@ -1 +1,80 @@
+"""
+The v1 API: one flask-restx Api with a namespace per resource.
 
+Building it imports flask-restx, every namespace module and, through them,
+the facade and its repositories, then compiles every route. With LAZY_API
+that happens on the first request instead of in create_app, so processes
+that never serve one (CLI commands, short-lived scripts) never pay for it.
+"""
+
+import threading
+from importlib import import_module
+
+EXTENSION = "api"
+
+# (module, url prefix), in registration order
+NAMESPACES = (
+    ("app.api.v1.users", "/api/v1/users"),
+    ("app.api.v1.auth", "/api/v1/auth"),
+    ("app.api.v1.amenities", "/api/v1/amenities"),
+    ("app.api.v1.places", "/api/v1/places"),
+    ("app.api.v1.reviews", "/api/v1/reviews"),
+    ("app.api.v1.admin", "/api/v1/admin"),
+    ("app.api.v1.export", "/api/v1/export"),
+)
+
+
+def build_api(app):
+    from flask_restx import Api
+
+    api = Api(
+        app,
+        version="1.0",
+        title="HBnB API",
+        description="HBnB Application API",
+        doc="/api/v1/"
+    )
+    for module, path in NAMESPACES:
+        api.add_namespace(import_module(module).api, path=path)
+    return api
+
+
+class DeferredApi:
+    """WSGI middleware building the API when the first request arrives.
+
+    It runs ahead of Flask, so the routes are added before the app has
+    handled any request (Flask refuses new routes after that).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.api = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self.api is None:
+            with self._lock:
+                if self.api is None:
+                    self.api = build_api(self.app)
+        return self.api
+
+    def __call__(self, environ, start_response):
+        if self.api is None:
+            self.load()
+        return self.wsgi_app(environ, start_response)
+
+
+def load_api(app):
+    """The app's Api, building it now if it was deferred."""
+    api = app.extensions[EXTENSION]
+    return api.load() if isinstance(api, DeferredApi) else api
+
+
+def init_app(app):
+    if app.config.get("LAZY_API", False):
+        deferred = DeferredApi(app)
+        app.wsgi_app = deferred
+        app.extensions[EXTENSION] = deferred
+    else:
+        app.extensions[EXTENSION] = build_api(app)
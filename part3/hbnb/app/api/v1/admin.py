@@ -0,0 +1,66 @@
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+
+from app.cache import fragments
+from app.compression import current_compressor
+from app.cache.objects import current_cache
+from app.extensions import db
+from app.services.facade import facade
+from app.services.singleflight import current_flights
+from app.db.pool import pool_status
+
+api = Namespace("admin", description="Operational endpoints (admin only)")
+
+
+def require_admin():
+    claims = get_jwt()
+    if not claims.get("is_admin", False):
+        api.abort(403, "Admin privileges required")
+
+
+@api.route("/pool")
+class PoolStats(Resource):
+    @jwt_required()
+    def get(self):
+        require_admin()
+        engines = {
+            (key or "default"): pool_status(engine)
+            for key, engine in db.engines.items()
+        }
+        return {"engines": engines}, 200
+
+
+@api.route("/singleflight")
+class SingleFlightStats(Resource):
+    @jwt_required()
+    def get(self):
+        require_admin()
+        flights = current_flights()
+        return {"enabled": flights is not None, "methods": flights.stats() if flights else {}}, 200
+
+
+@api.route("/cache")
+class CacheStats(Resource):
+    @jwt_required()
+    def get(self):
+        require_admin()
+        cache = current_cache()
+        fragment_cache = fragments.current_cache()
+        compressed = getattr(current_compressor(), "cache", None)
+        return {
+            "disabled": sorted(cache.disabled),
+            "regions": cache.stats(),
+            "fragments": fragment_cache.stats() if fragment_cache is not None else None,
+            "compressed": compressed.stats() if compressed is not None else None,
+        }, 200
+
+    @jwt_required()
+    def delete(self):
+        require_admin()
+        current_cache().clear(
+            repo.model.__table__.name for repo in vars(facade).values() if getattr(repo, "cached", False)
+        )
+        for store in (fragments.current_cache(), getattr(current_compressor(), "cache", None)):
+            if store is not None:
+                store.clear()
+        return {"message": "Cache cleared"}, 200
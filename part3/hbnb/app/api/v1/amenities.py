@@ -1,10 +1,17 @@
 # app/api/v1/amenities.py
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
+from app.cache import fragments
+from app.serializers import serializer
 from app.services.facade import facade
+from app.api.v1.pagination import encoded_page_response, page_args
+from app.api.v1.conditional import conditional_item, conditional_list
+from app.api.v1.fieldsets import FIELDS_DOC, fields_arg
 
 api = Namespace("amenities", description="Amenity operations")
 
+amenity_json = serializer("amenity")
+
 amenity_model = api.model("Amenity", {
     "name": fields.String(required=True, description="Name of the amenity")
 })
@@ -20,9 +27,16 @@ def require_admin():
 
 @api.route("/")
 class AmenityList(Resource):
+    @api.doc(params={"fields": FIELDS_DOC})
+    @conditional_list("amenities")
     def get(self):
-        amenities = facade.get_all_amenities()
-        return [a.to_dict() for a in amenities], 200
+        limit, cursor = page_args(api)
+        serialize, profile = fields_arg(api, "amenity", amenity_json, None)
+        try:
+            amenities, next_cursor = facade.get_amenities_page(limit, cursor, profile)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return encoded_page_response([fragments.encode(a, serialize) for a in amenities], next_cursor)
 
     @api.expect(amenity_model, validate=True)
     @jwt_required()
@@ -30,17 +44,20 @@ class AmenityList(Resource):
         require_admin()
         try:
             amenity = facade.create_amenity(api.payload or {})
-            return amenity.to_dict(), 201
+            return amenity_json(amenity), 201
         except ValueError as e:
             api.abort(400, str(e))
 
 @api.route("/<string:amenity_id>")
 class AmenityResource(Resource):
+    @api.doc(params={"fields": FIELDS_DOC})
+    @conditional_item
     def get(self, amenity_id):
-        amenity = facade.get_amenity(amenity_id)
+        serialize, profile = fields_arg(api, "amenity", amenity_json, None)
+        amenity = facade.get_amenity(amenity_id, profile)
         if not amenity:
             api.abort(404, "Amenity not found")
-        return amenity.to_dict(), 200
+        return serialize(amenity), 200
 
     @api.expect(update_amenity_model, validate=True)
     @jwt_required()
@@ -48,7 +65,7 @@ class AmenityResource(Resource):
         require_admin()
         try:
             amenity = facade.update_amenity(amenity_id, api.payload or {})
-            return amenity.to_dict(), 200
+            return amenity_json(amenity), 200
         except ValueError as e:
 
             msg = str(e)
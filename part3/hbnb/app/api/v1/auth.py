@@ -1,6 +1,8 @@
 from flask_restx import Resource, Namespace, fields
 from flask_jwt_extended import create_access_token
 from app.services.facade import facade
+from app.api.v1.errors import abort_busy
+from app.services.passwords import HasherBusy
 
 api = Namespace("auth", description="Authentication operations")
 
@@ -28,8 +30,11 @@ class Login(Resource):
         if not email or not password:
             api.abort(400, "Missing email or password")
 
-        user = facade.user_repo.get_by_email(email)
-        if not user or not user.check_password(password):
+        try:
+            user = facade.authenticate(email, password)
+        except HasherBusy as e:
+            abort_busy(e)
+        if not user:
             api.abort(401, "Invalid email or password")
 
         access_token = create_access_token(
@@ -0,0 +1,23 @@
+from flask import current_app
+
+
+def batch_items(api):
+    """Return the ``items`` list of a batch payload, aborting on bad input."""
+    items = (api.payload or {}).get("items")
+    if not isinstance(items, list) or not items:
+        api.abort(400, "items must be a non-empty list")
+
+    maximum = current_app.config.get("BATCH_MAX_ITEMS", 10000)
+    if len(items) > maximum:
+        api.abort(400, f"A batch may contain at most {maximum} items")
+
+    return items
+
+
+def batch_response(results):
+    created = sum(1 for r in results if "id" in r)
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": results,
+    }
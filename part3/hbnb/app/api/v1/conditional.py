@@ -0,0 +1,95 @@
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, request
+from werkzeug.http import http_date, is_resource_modified
+
+from app.services.facade import facade
+
+
+def _split(result):
+    """Normalize a Resource return value to (data, code, headers)."""
+    if isinstance(result, current_app.response_class):
+        return result, result.status_code, {}
+    if not isinstance(result, tuple):
+        return result, 200, {}
+    data = result[0]
+    code = result[1] if len(result) > 1 else 200
+    headers = result[2] if len(result) > 2 else None
+    return data, code, dict(headers or {})
+
+
+def _validators(etag, last_modified):
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def _not_modified(etag, last_modified):
+    response = current_app.response_class(status=304)
+    response.headers.update(_validators(etag, last_modified))
+    return response
+
+
+def _fresh(etag, last_modified):
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110)
+    return not is_resource_modified(
+        request.environ, etag=etag, last_modified=last_modified.replace(microsecond=0) if last_modified else None
+    )
+
+
+def conditional_list(*tables):
+    """Validate a list GET against the write counters of ``tables``.
+
+    The ETag combines the tables' versions with the request's query string,
+    so a revalidation that ends in 304 reads only the table_versions rows and
+    never runs the list query.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            tag, last_modified = facade.get_tables_version(tables)
+            query = "&".join(sorted(request.query_string.decode("latin-1").split("&")))
+            etag = hashlib.sha256(f"{request.path}?{query}|{tag}".encode("utf-8")).hexdigest()[:32]
+
+            if _fresh(etag, last_modified):
+                return _not_modified(etag, last_modified)
+
+            data, code, headers = _split(func(*args, **kwargs))
+            if code == 200:
+                headers.update(_validators(etag, last_modified))
+            if isinstance(data, current_app.response_class):
+                # pre-encoded bodies (see pagination.encoded_page_response)
+                data.headers.update(headers)
+                return data
+            return data, code, headers
+        return wrapper
+    return decorator
+
+
+def conditional_item(func):
+    """Validate a single-object GET against its serialized body and ``updated_at``.
+
+    The ETag is a hash of the JSON body, so it is strong and also changes
+    when related data the body embeds (amenity names, authors) changes.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        data, code, headers = _split(func(*args, **kwargs))
+        if code != 200:
+            return data, code, headers
+
+        body = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+        etag = hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+        updated_at = data.get("updated_at") if isinstance(data, dict) else None
+        last_modified = datetime.fromisoformat(updated_at) if updated_at else None
+
+        if _fresh(etag, last_modified):
+            return _not_modified(etag, last_modified)
+
+        headers.update(_validators(etag, last_modified))
+        return data, code, headers
+    return wrapper
@@ -0,0 +1,10 @@
+import math
+
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+
+
+def abort_busy(error):
+    """Answer a HasherBusy with 503 and a Retry-After of the pool's waiting bound."""
+    retry_after = max(1, math.ceil(current_app.config.get("BCRYPT_BUSY_TIMEOUT", 1.0)))
+    raise ServiceUnavailable(str(error), retry_after=retry_after)
@@ -0,0 +1,41 @@
+from flask import current_app, request, stream_with_context
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+
+from app.api.v1.fieldsets import FIELDS_DOC, fields_arg
+from app.services import export
+
+api = Namespace("export", description="Bulk export (admin only)")
+
+
+def require_admin():
+    claims = get_jwt()
+    if not claims.get("is_admin", False):
+        api.abort(403, "Admin privileges required")
+
+
+@api.route("/<string:entity>")
+class Export(Resource):
+    @api.doc(params={
+        "entity": "places, reviews or users",
+        "format": "ndjson (default) or csv",
+        "fields": FIELDS_DOC,
+    })
+    @jwt_required()
+    def get(self, entity):
+        """Stream every row of a table; the body is written while the rows are read."""
+        require_admin()
+        if entity not in export.ENTITIES:
+            api.abort(404, f"Unknown entity: {entity}")
+        fmt = request.args.get("format", "ndjson")
+        serialize, _ = fields_arg(api, export.ENTITIES[entity], None, None)
+        try:
+            chunks = export.export(entity, fmt, serialize, current_app.config.get("EXPORT_CHUNK_SIZE", 1000))
+        except ValueError as e:
+            api.abort(400, str(e))
+
+        return current_app.response_class(
+            stream_with_context(chunks),
+            mimetype=export.FORMATS[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{entity}.{fmt}"'},
+        )
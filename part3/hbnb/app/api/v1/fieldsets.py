@@ -0,0 +1,27 @@
+from flask import request
+
+from app.serializers import serializer
+
+FIELDS_DOC = "Comma-separated fields to return, e.g. id,title,amenities (default: all)"
+
+
+def fields_arg(api, schema, default, profile):
+    """(serializer, loading profile) for the ``fields`` query parameter.
+
+    Without it: ``default`` and the named ``profile``. With it, the compiled
+    serializer for the requested fields is also the profile, so the query
+    selects only the columns and relationships it reads. Unknown fields
+    abort with 400.
+    """
+    raw = request.args.get("fields")
+    if raw is None:
+        return default, profile
+
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    if not names:
+        api.abort(400, "fields must name at least one field")
+    try:
+        serialize = serializer(schema, names)
+    except ValueError as e:
+        api.abort(400, str(e))
+    return serialize, serialize
@@ -0,0 +1,30 @@
+from flask import current_app, request
+
+from app.cache import fragments
+
+
+def page_args(api):
+    """Read ``limit`` and ``cursor`` from the query string, aborting on bad input."""
+    default = current_app.config.get("PAGE_SIZE_DEFAULT", 50)
+    maximum = current_app.config.get("PAGE_SIZE_MAX", 200)
+
+    limit = request.args.get("limit", default)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        api.abort(400, "limit must be an integer")
+
+    if limit < 1:
+        api.abort(400, "limit must be at least 1")
+
+    return min(limit, maximum), request.args.get("cursor") or None
+
+
+def page_response(items, next_cursor):
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def encoded_page_response(items, next_cursor):
+    """page_response for items already encoded by app.cache.fragments, as a ready response."""
+    body = b'{"items":' + fragments.array(items) + b',"next_cursor":' + fragments.dumps(next_cursor) + b"}\n"
+    return current_app.response_class(body, mimetype="application/json")
@@ -1,6 +1,13 @@
+from flask import request
 from flask_restx import Resource, Namespace, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.cache import fragments
+from app.serializers import serializer
 from app.services.facade import facade
+from app.api.v1.pagination import encoded_page_response, page_args
+from app.api.v1.batch import batch_items, batch_response
+from app.api.v1.conditional import conditional_item, conditional_list
+from app.api.v1.fieldsets import FIELDS_DOC, fields_arg
 
 api = Namespace("places", description="Place operations")
 
@@ -20,11 +27,81 @@ place_update_model = api.model("PlaceUpdate", {
     "longitude": fields.Float(description="Longitude (-180 to 180)"),
 })
 
+place_batch_model = api.model("PlaceBatch", {
+    "items": fields.List(fields.Nested(place_create_model), required=True),
+})
+
+place_json = serializer("place")
+
+# tables a serialized place reads from; list ETags follow their versions
+PLACE_TABLES = ("places", "place_amenity", "amenities")
+
+
+def parse_floats(name, count):
+    raw = request.args.get(name)
+    try:
+        values = [float(v) for v in raw.split(",")]
+    except ValueError:
+        values = []
+    if len(values) != count:
+        api.abort(400, f"{name} must be {count} comma-separated numbers")
+    return values
+
+
+def parse_filters():
+    """Price range and amenity filters shared by every listing mode."""
+    filters = {}
+    for name in ("min_price", "max_price"):
+        if request.args.get(name):
+            try:
+                filters[name] = float(request.args[name])
+            except ValueError:
+                api.abort(400, f"{name} must be a number")
+    if request.args.get("amenities"):
+        filters["amenity_ids"] = [a for a in request.args["amenities"].split(",") if a]
+    return filters
+
+
 @api.route("/")
 class Places(Resource):
+    @api.doc(params={
+        "limit": "Page size",
+        "cursor": "next_cursor from the previous page",
+        "near": "lat,lon - return places within radius_km, nearest first",
+        "radius_km": "Search radius for near (default 10)",
+        "bbox": "min_lon,min_lat,max_lon,max_lat - return places inside the box",
+        "min_price": "Lowest price per night",
+        "max_price": "Highest price per night",
+        "amenities": "Comma-separated amenity ids; places must have all of them",
+        "fields": FIELDS_DOC,
+    })
+    @conditional_list(*PLACE_TABLES)
     def get(self):
-        places = facade.get_all_places()
-        return [place.to_dict() for place in places], 200
+        limit, cursor = page_args(api)
+        filters = parse_filters()
+        serialize, profile = fields_arg(api, "place", place_json, "card")
+
+        if request.args.get("near"):
+            lat, lon = parse_floats("near", 2)
+            try:
+                radius_km = float(request.args.get("radius_km", 10))
+                hits = facade.get_places_near(lat, lon, radius_km, limit, profile=profile, **filters)
+            except ValueError as e:
+                api.abort(400, str(e))
+            items = [
+                fragments.extend(fragments.encode(place, serialize), {"distance_km": round(distance, 3)})
+                for place, distance in hits
+            ]
+            return encoded_page_response(items, None)
+
+        bbox = parse_floats("bbox", 4) if request.args.get("bbox") else None
+        try:
+            places, next_cursor = facade.get_places_page(
+                limit, cursor, profile=profile, bbox=bbox, **filters
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        return encoded_page_response([fragments.encode(place, serialize) for place in places], next_cursor)
 
     @api.expect(place_create_model, validate=True)
     @jwt_required()
@@ -36,18 +113,87 @@ class Places(Resource):
 
         try:
             place = facade.create_place(payload)
-            return place.to_dict(), 201
+            return place_json(place), 201
+        except ValueError as e:
+            api.abort(400, str(e))
+
+
+@api.route("/search")
+class PlaceSearch(Resource):
+    @api.doc(params={
+        "q": "Words to look for in titles and descriptions; the last letters of a word may be left off",
+        "limit": "Page size",
+        "cursor": "next_cursor from the previous page",
+        "min_price": "Lowest price per night",
+        "max_price": "Highest price per night",
+        "amenities": "Comma-separated amenity ids; places must have all of them",
+        "fields": FIELDS_DOC,
+    })
+    @conditional_list(*PLACE_TABLES)
+    def get(self):
+        limit, cursor = page_args(api)
+        filters = parse_filters()
+        serialize, profile = fields_arg(api, "place", place_json, "card")
+        try:
+            hits, next_cursor = facade.search_places(
+                request.args.get("q", ""), limit, cursor, profile=profile, **filters
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        items = [
+            fragments.extend(fragments.encode(place, serialize), {"score": -score})
+            for place, score in hits
+        ]
+        return encoded_page_response(items, next_cursor)
+
+
+@api.route("/top")
+class PlaceTop(Resource):
+    @api.doc(params={
+        "by": "rating (Bayesian average) or trending (recent review volume)",
+        "limit": "Number of places",
+        "fields": FIELDS_DOC,
+    })
+    def get(self):
+        limit, _ = page_args(api)
+        serialize, profile = fields_arg(api, "place", place_json, "card")
+        try:
+            top = facade.get_top_places(request.args.get("by", "rating"), limit, profile=profile)
         except ValueError as e:
             api.abort(400, str(e))
+        items = [
+            fragments.extend(fragments.encode(place, serialize), {"score": round(score, 4)})
+            for place, score in top
+        ]
+        return encoded_page_response(items, None)
+
+
+@api.route("/batch")
+class PlaceBatch(Resource):
+    # the schema (types, required fields) is checked for the whole batch;
+    # the facade's rules are applied item by item, so an item breaking
+    # them is reported in its result instead of rejecting the batch
+    @api.expect(place_batch_model, validate=True)
+    @jwt_required()
+    def post(self):
+        items = batch_items(api)
+        try:
+            results = facade.create_places(items, get_jwt_identity())
+        except ValueError as e:
+            api.abort(400, str(e))
+        return batch_response(results), 200
 
 
 @api.route("/<string:place_id>")
 class PlaceResource(Resource):
+    @api.doc(params={"fields": FIELDS_DOC})
+    @conditional_item
     def get(self, place_id):
-        place = facade.get_place(place_id)
+        serialize, profile = fields_arg(api, "place", place_json, "detail")
+        place = facade.get_place(place_id, profile=profile)
         if not place:
             api.abort(404, "Place not found")
-        return place.to_dict(), 200
+        return serialize(place), 200
 
     @api.expect(place_update_model, validate=True)
     @jwt_required()
@@ -81,7 +227,7 @@ class PlaceResource(Resource):
             place.longitude = data["longitude"]
 
         facade.place_repo.update()
-        return place.to_dict(), 200
+        return place_json(place), 200
 
     @jwt_required()
     def delete(self, place_id):
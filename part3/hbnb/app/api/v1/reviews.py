@@ -1,29 +1,50 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
+from app.cache import fragments
+from app.serializers import serializer
 from app.services.facade import facade
+from app.api.v1.pagination import encoded_page_response, page_args
+from app.api.v1.batch import batch_items, batch_response
+from app.api.v1.conditional import conditional_item, conditional_list
+from app.api.v1.fieldsets import FIELDS_DOC, fields_arg
 
 api = Namespace('reviews', description='Review operations')
 
+review_json = serializer('review')
+
 review_model = api.model('Review', {
     'text': fields.String(required=True, description='Review text'),
     'rating': fields.Integer(required=True, description='Rating (1-5)'),
     'place_id': fields.String(required=True, description='Place ID')
 })
 
+review_update_model = api.model('ReviewUpdate', {
+    'text': fields.String(description='Review text'),
+    'rating': fields.Integer(description='Rating (1-5)')
+})
+
+review_batch_model = api.model('ReviewBatch', {
+    'items': fields.List(fields.Nested(review_model), required=True)
+})
+
 @api.route('/')
 class ReviewList(Resource):
+    @api.doc(params={'fields': FIELDS_DOC})
+    @conditional_list('reviews', 'users')
     def get(self):
+        limit, cursor = page_args(api)
+        serialize, profile = fields_arg(api, 'review', review_json, 'review_with_author')
         try:
-            place_id = request.args.get('place_id')
-
-            if place_id:
-                reviews = facade.get_reviews_by_place(place_id)
-            else:
-                reviews = facade.get_all_reviews()
+            place_id = request.args.get('place_id') or None
+            reviews, next_cursor = facade.get_reviews_page(
+                limit, cursor, place_id, profile=profile
+            )
 
-            return [r.to_dict() for r in reviews], 200
+            return encoded_page_response(
+                [fragments.encode(r, serialize) for r in reviews], next_cursor
+            )
 
         except ValueError as e:
             api.abort(400, str(e))
@@ -49,9 +70,59 @@ class ReviewList(Resource):
             review_data["user_id"] = current_user_id
 
             new_review = facade.create_review(review_data)
-            return new_review.to_dict(), 201
+            return review_json(new_review), 201
 
         except ValueError as e:
             api.abort(400, str(e))
         except Exception as e:
             api.abort(500, f"Error: {str(e)}")
+
+
+@api.route('/batch')
+class ReviewBatch(Resource):
+    @api.expect(review_batch_model, validate=True)
+    @jwt_required()
+    def post(self):
+        items = batch_items(api)
+        try:
+            results = facade.create_reviews(items, get_jwt_identity())
+        except ValueError as e:
+            api.abort(400, str(e))
+        return batch_response(results), 200
+
+
+@api.route('/<string:review_id>')
+class ReviewResource(Resource):
+    @api.doc(params={'fields': FIELDS_DOC})
+    @conditional_item
+    def get(self, review_id):
+        serialize, profile = fields_arg(api, 'review', review_json, None)
+        review = facade.get_review(review_id, profile)
+        if not review:
+            api.abort(404, 'Review not found')
+        return serialize(review), 200
+
+    def _authorize(self, review_id):
+        review = facade.get_review(review_id)
+        if not review:
+            api.abort(404, 'Review not found')
+
+        claims = get_jwt()
+        if not claims.get('is_admin', False) and review.user_id != get_jwt_identity():
+            api.abort(403, 'Forbidden')
+
+    @api.expect(review_update_model)
+    @jwt_required()
+    def put(self, review_id):
+        self._authorize(review_id)
+        try:
+            review = facade.update_review(review_id, api.payload or {})
+        except ValueError as e:
+            api.abort(400, str(e))
+        return review_json(review), 200
+
+    @jwt_required()
+    def delete(self, review_id):
+        self._authorize(review_id)
+        facade.delete_review(review_id)
+        return {'message': 'Review deleted'}, 200
@@ -2,8 +2,13 @@
 
 from flask_restx import Resource, Namespace, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.cache import fragments
+from app.serializers import serializer
 from app.services.facade import facade
-from app.extensions import db
+from app.api.v1.errors import abort_busy
+from app.services.passwords import HasherBusy
+from app.api.v1.pagination import encoded_page_response, page_args
+from app.api.v1.fieldsets import FIELDS_DOC, fields_arg
 
 api = Namespace("users", description="User operations")
 
@@ -29,6 +34,14 @@ user_response_model = api.model("UserResponse", {
     "is_admin": fields.Boolean,
 })
 
+user_page_model = api.model("UserPage", {
+    "items": fields.List(fields.Nested(user_response_model)),
+    "next_cursor": fields.String,
+})
+
+# the fields of user_response_model, without the marshalling overhead
+user_json = serializer("user", ("id", "email", "first_name", "last_name", "is_admin"))
+
 
 def require_admin():
     claims = get_jwt()
@@ -40,7 +53,7 @@ def require_admin():
 @api.route("/signup")
 class Signup(Resource):
     @api.expect(user_model, validate=True)
-    @api.marshal_with(user_response_model, code=201)
+    @api.response(201, "User created", user_response_model)
     def post(self):
         """تسجيل مستخدم جديد - بدون الحاجة لـ token"""
         data = api.payload or {}
@@ -51,11 +64,12 @@ class Signup(Resource):
                 first_name=data.get("first_name"),
                 last_name=data.get("last_name"),
             )
-            db.session.commit()   
             print(f"DEBUG: Created user: {user.id}")  
-            return user, 201
+            return user_json(user), 201
         except ValueError as e:
             api.abort(400, str(e))
+        except HasherBusy as e:
+            abort_busy(e)
         except Exception as e:
             api.abort(500, f"Error: {str(e)}")
 
@@ -63,7 +77,7 @@ class Signup(Resource):
 @api.route("/")
 class Users(Resource):
     @api.expect(user_model, validate=True)
-    @api.marshal_with(user_response_model, code=201)
+    @api.response(201, "User created", user_response_model)
     @jwt_required()
     def post(self):
         require_admin()
@@ -75,28 +89,39 @@ class Users(Resource):
                 first_name=data.get("first_name"),
                 last_name=data.get("last_name"),
             )
-            return user, 201
+            return user_json(user), 201
         except ValueError as e:
             api.abort(400, str(e))
+        except HasherBusy as e:
+            abort_busy(e)
 
-    @api.marshal_list_with(user_response_model)
+    @api.response(200, "Success", user_page_model)
+    @api.doc(params={"fields": FIELDS_DOC})
     @jwt_required()
     def get(self):
         require_admin()
-        return facade.user_repo.get_all(), 200
+        limit, cursor = page_args(api)
+        serialize, profile = fields_arg(api, "user", user_json, None)
+        try:
+            users, next_cursor = facade.get_users_page(limit, cursor, profile)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return encoded_page_response([fragments.encode(u, serialize) for u in users], next_cursor)
 
 
 @api.route("/<string:user_id>")
 class User(Resource):
-    @api.marshal_with(user_response_model)
+    @api.response(200, "Success", user_response_model)
+    @api.doc(params={"fields": FIELDS_DOC})
     def get(self, user_id):
-        user = facade.user_repo.get_by_id(user_id)
+        serialize, profile = fields_arg(api, "user", user_json, None)
+        user = facade.user_repo.get_by_id(user_id, profile)
         if not user:
             api.abort(404, "User not found")
-        return user, 200
+        return serialize(user), 200
 
     @api.expect(update_user_model, validate=True)
-    @api.marshal_with(user_response_model)
+    @api.response(200, "Success", user_response_model)
     @jwt_required()
     def put(self, user_id):
         claims = get_jwt()
@@ -128,7 +153,10 @@ class User(Resource):
                 user.email = data["email"]
 
             if "password" in data and data["password"]:
-                user.set_password(data["password"])
+                try:
+                    user.set_password(data["password"])
+                except HasherBusy as e:
+                    abort_busy(e)
 
         facade.user_repo.update()
-        return user, 200
+        return user_json(user), 200
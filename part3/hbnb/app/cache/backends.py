@@ -0,0 +1,492 @@
+"""
+Storage and invalidation transport for the app's caches (app/cache/objects.py,
+app/cache/fragments.py), chosen by URL:
+
+    memory                  in-process LRU (LRUCache); every worker has its own copy
+    sqlite:///path/cache.db one file shared by the workers of a host
+    redis://host:port/db    any server speaking the Redis protocol
+
+Every backend stores the entries of one namespace (e.g. "obj:places") and
+offers the LRUCache interface: get/peek/set/delete/clear/stats. ``shared``
+tells whether other processes see the same entries. Shared backends pickle
+their values, so they must point at storage only this app writes to.
+
+Buses carry invalidation messages (JSON objects) to the other workers:
+sqlite buses append to an events table that subscribers poll, redis buses
+use PUBLISH/SUBSCRIBE. A memory bus delivers nothing; with a per-process
+store and several workers, point CACHE_INVALIDATION_URL at a sqlite or
+redis URL so the workers' copies are invalidated together.
+
+A shared store that is down, unreachable or locked never fails a request:
+a read that errors is a miss, a write or delete that errors is skipped
+(entries expire by TTL), and the error is counted and logged.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.cache.lru import LRUCache
+from app.cache.resp import RespConnection, RespError
+
+logger = logging.getLogger(__name__)
+
+# what a shared store raises while it is down, unreachable or locked
+# (ConnectionError and socket timeouts are OSErrors)
+UNAVAILABLE = (OSError, RespError, sqlite3.OperationalError)
+
+# seconds between two logged failures of the same backend or bus
+WARN_INTERVAL = 10.0
+
+
+def _tolerant(method):
+    """Turn a store failure into a None result, counted in ``errors`` and logged."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except UNAVAILABLE as e:
+            self.errors += 1
+            now = time.monotonic()
+            if now - self._warned_at >= WARN_INTERVAL:
+                self._warned_at = now
+                logger.warning("cache %s: %s failed, continuing without it: %s",
+                               self.name, method.__name__.strip("_"), e)
+            return None
+
+    return wrapper
+
+
+def _key(namespace, key):
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class _Counters:
+    def __init__(self):
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+        self.errors = 0
+        self._warned_at = float("-inf")
+
+    def _count(self, value):
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def counters(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+class _SQLiteFile:
+    """Per-thread, per-process connections to one cache file."""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache_entries ("
+        " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+        " size INTEGER NOT NULL, stored_at REAL NOT NULL, expires_at REAL,"
+        " PRIMARY KEY (namespace, key)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS ix_cache_entries_age ON cache_entries (namespace, stored_at)",
+        "CREATE TABLE IF NOT EXISTS cache_events ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL,"
+        " message TEXT NOT NULL, created_at REAL NOT NULL)",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def connect(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+
+_files = {}
+_files_lock = threading.Lock()
+
+
+def _sqlite_file(url):
+    path = url[len("sqlite:///"):]
+    with _files_lock:
+        return _files.setdefault(path, _SQLiteFile(path))
+
+
+class SQLiteBackend(_Counters):
+    """Entries in a SQLite file, shared by every process that opens it.
+
+    Bounds are enforced every ``prune_every`` writes by dropping the oldest
+    written entries, so they may be exceeded briefly.
+    """
+
+    shared = True
+
+    def __init__(self, url, namespace, maxsize=None, ttl=None, maxbytes=None, prune_every=64):
+        super().__init__()
+        self.file = _sqlite_file(url)
+        self.namespace = namespace
+        self.maxsize, self.ttl, self.maxbytes = maxsize, ttl, maxbytes
+        self.prune_every = prune_every
+        self._writes = 0
+
+    @property
+    def name(self):
+        return f"{self.namespace} ({self.file.path})"
+
+    @_tolerant
+    def _read(self, key):
+        now = time.time()
+        row = self.file.connect().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, _key(self.namespace, key)),
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= now:
+            self.expirations += 1
+            return None
+        return pickle.loads(row[0])
+
+    def get(self, key, default=None):
+        value = self._count(self._read(key))
+        return default if value is None else value
+
+    def peek(self, key, default=None):
+        value = self._read(key)
+        return default if value is None else value
+
+    @_tolerant
+    def set(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.maxbytes is not None and len(data) > self.maxbytes:
+            return
+        now = time.time()
+        self.file.connect().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, stored_at, expires_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (self.namespace, _key(self.namespace, key), data, len(data), now,
+             now + self.ttl if self.ttl else None),
+        )
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def prune(self):
+        conn = self.file.connect()
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, time.time()),
+        )
+        if self.maxsize is not None:
+            self.evictions += conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache_entries WHERE namespace = ?"
+                " ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.maxsize),
+            ).rowcount
+        if self.maxbytes is not None:
+            self.evictions += conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY stored_at DESC) AS total"
+                " FROM cache_entries WHERE namespace = ?) WHERE total > ?)",
+                (self.namespace, self.namespace, self.maxbytes),
+            ).rowcount
+
+    @_tolerant
+    def delete(self, key):
+        self.invalidations += self.file.connect().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, _key(self.namespace, key)),
+        ).rowcount
+
+    @_tolerant
+    def clear(self):
+        self.invalidations += self.file.connect().execute(
+            "DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).rowcount
+
+    @_tolerant
+    def _size(self):
+        return self.file.connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+
+    def stats(self):
+        size, total = self._size() or (None, None)
+        stats = {"backend": "sqlite", "size": size, "maxsize": self.maxsize, "ttl": self.ttl}
+        stats.update(self.counters())
+        if self.maxbytes is not None:
+            stats.update(bytes=total, maxbytes=self.maxbytes)
+        return stats
+
+
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def _resp_connection(url):
+    # one connection per process and URL; commands are serialized on it
+    key = (url, os.getpid())
+    with _connections_lock:
+        if key not in _connections:
+            _connections[key] = RespConnection(url)
+        return _connections[key]
+
+
+class RedisBackend(_Counters):
+    """Entries on a Redis-protocol server; size bounds are the server's
+    (maxmemory with an LRU eviction policy), TTLs are set per key."""
+
+    shared = True
+
+    def __init__(self, url, namespace, maxsize=None, ttl=None, maxbytes=None, prefix="hbnb:"):
+        super().__init__()
+        self.url = url
+        self.namespace = f"{prefix}{namespace}"
+        self.ttl = ttl
+
+    @property
+    def conn(self):
+        return _resp_connection(self.url)
+
+    @property
+    def name(self):
+        return f"{self.namespace} ({self.url})"
+
+    @_tolerant
+    def _read(self, key):
+        data = self.conn.execute("GET", _key(self.namespace, key))
+        return None if data is None else pickle.loads(data)
+
+    def get(self, key, default=None):
+        value = self._count(self._read(key))
+        return default if value is None else value
+
+    def peek(self, key, default=None):
+        value = self._read(key)
+        return default if value is None else value
+
+    @_tolerant
+    def set(self, key, value):
+        args = ["SET", _key(self.namespace, key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)]
+        if self.ttl:
+            args += ["PX", int(self.ttl * 1000)]
+        self.conn.execute(*args)
+
+    @_tolerant
+    def delete(self, key):
+        self.invalidations += self.conn.execute("DEL", _key(self.namespace, key))
+
+    @_tolerant
+    def clear(self):
+        cursor = b"0"
+        while True:
+            cursor, keys = self.conn.execute("SCAN", cursor, "MATCH", f"{self.namespace}:*", "COUNT", 500)
+            if keys:
+                self.invalidations += self.conn.execute("DEL", *keys)
+            if cursor in (b"0", 0, "0"):
+                break
+
+    def stats(self):
+        stats = {"backend": "redis", "ttl": self.ttl}
+        stats.update(self.counters())
+        return stats
+
+
+def open_backend(url, namespace, maxsize=None, ttl=None, maxbytes=None):
+    url = url or "memory"
+    if url == "memory":
+        return LRUCache(maxsize, ttl, maxbytes=maxbytes)
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url, namespace, maxsize, ttl, maxbytes)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url, namespace, maxsize, ttl, maxbytes)
+    raise ValueError(f"Unsupported cache backend: {url}")
+
+
+class MemoryBus:
+    """No other workers to tell."""
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    def publish(self, message):
+        pass
+
+    def subscribe(self, handler):
+        pass
+
+    def poll(self):
+        pass
+
+
+class _Bus:
+    def __init__(self, channel):
+        self.channel = channel
+        self.handlers = []
+        self.errors = 0
+        self._warned_at = float("-inf")
+        self._token = uuid.uuid4().hex
+
+    @property
+    def name(self):
+        return f"bus {self.channel}"
+
+    @property
+    def origin(self):
+        # forked workers share the token, not the pid
+        return f"{self._token}:{os.getpid()}"
+
+    def subscribe(self, handler):
+        self.handlers.append(handler)
+
+    def _deliver(self, raw):
+        message = json.loads(raw)
+        if message.pop("origin", None) == self.origin:
+            return
+        for handler in self.handlers:
+            handler(message)
+
+    def _encode(self, message):
+        return json.dumps({**message, "origin": self.origin})
+
+
+class SQLiteBus(_Bus):
+    """Messages appended to the cache file; poll() delivers the ones written
+    by other processes since the last poll. Messages older than
+    ``retention`` seconds are deleted by publishers.
+
+    poll() runs a query on the shared file; with ``poll_interval`` it does
+    so at most once per interval and is free in between, so a cache hit
+    stays a dictionary lookup. Invalidations from other workers then take
+    up to that long to arrive.
+    """
+
+    def __init__(self, url, channel, retention=300, poll_interval=0.0):
+        super().__init__(channel)
+        self.file = _sqlite_file(url)
+        self.retention = retention
+        self.poll_interval = poll_interval
+        self._next_poll = 0.0
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def _last_id(self):
+        pid = os.getpid()
+        if pid not in self._last:
+            # a new process only cares about messages from now on
+            row = self.file.connect().execute("SELECT MAX(id) FROM cache_events").fetchone()
+            self._last[pid] = row[0] or 0
+        return self._last[pid]
+
+    @_tolerant
+    def publish(self, message):
+        conn = self.file.connect()
+        self._last_id()
+        now = time.time()
+        conn.execute(
+            "INSERT INTO cache_events (channel, message, created_at) VALUES (?, ?, ?)",
+            (self.channel, self._encode(message), now),
+        )
+        conn.execute("DELETE FROM cache_events WHERE created_at < ?", (now - self.retention,))
+
+    def poll(self):
+        if self.poll_interval:
+            now = time.monotonic()
+            if now < self._next_poll:
+                return
+            self._next_poll = now + self.poll_interval
+        for raw in self._fetch() or ():
+            self._deliver(raw)
+
+    @_tolerant
+    def _fetch(self):
+        with self._lock:
+            rows = self.file.connect().execute(
+                "SELECT id, message FROM cache_events WHERE id > ? AND channel = ? ORDER BY id",
+                (self._last_id(), self.channel),
+            ).fetchall()
+            if rows:
+                self._last[os.getpid()] = rows[-1][0]
+        return [raw for _, raw in rows]
+
+
+class RedisBus(_Bus):
+    """PUBLISH/SUBSCRIBE; each process runs one daemon thread per bus to
+    receive messages, started on first use and restarted after a fork."""
+
+    subscribe_timeout = 1.0
+
+    def __init__(self, url, channel, prefix="hbnb:"):
+        super().__init__(f"{prefix}{channel}")
+        self.url = url
+        self._listener = None
+        self._listener_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return f"bus {self.channel} ({self.url})"
+
+    @_tolerant
+    def publish(self, message):
+        _resp_connection(self.url).execute("PUBLISH", self.channel, self._encode(message))
+
+    def poll(self):
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            conn, stop, ready = RespConnection(self.url), threading.Event(), threading.Event()
+            thread = threading.Thread(
+                target=conn.listen, args=(self.channel, self._deliver, stop, ready),
+                name=f"cache-bus-{self.channel}", daemon=True,
+            )
+            self._listener = (conn, stop, thread)
+            thread.start()
+        # messages published before the subscription is confirmed are lost
+        ready.wait(self.subscribe_timeout)
+
+    def close(self):
+        if self._listener is not None:
+            conn, stop, thread = self._listener
+            stop.set()
+            conn.shutdown()
+            thread.join(timeout=2)
+            self._listener = self._listener_pid = None
+
+
+def open_bus(url, channel, poll_interval=0.0):
+    url = url or "memory"
+    if url == "memory":
+        return MemoryBus(channel)
+    if url.startswith("sqlite:///"):
+        return SQLiteBus(url, channel, poll_interval=poll_interval)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBus(url, channel)
+    raise ValueError(f"Unsupported cache invalidation transport: {url}")
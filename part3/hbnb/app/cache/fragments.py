@@ -0,0 +1,91 @@
+"""
+Pre-encoded JSON of serialized rows, so list endpoints only re-serialize
+the rows that changed.
+
+A fragment is keyed by (entity type, id, updated_at, profile, dependencies):
+the profile is the serializer's schema and field set (app/serializers.py),
+and the dependencies are whatever else the serialization embeds that can
+change without touching the row's updated_at: rating aggregates maintained
+by Core UPDATEs, the names of a place's amenities, a review's author. A
+changed row simply gets a new key; old versions are never looked up again
+and age out of the byte-bounded store (CACHE_BACKEND; shared backends
+evict on their own terms, see app/cache/backends.py).
+"""
+
+import json
+
+from flask import current_app, has_app_context
+
+from sqlalchemy import inspect
+
+from app.cache import backends
+from app.models.place import RATINGS, Place
+
+EXTENSION = "fragment_cache"
+
+# columns written by Core UPDATEs (rating aggregates), which leave updated_at alone
+VOLATILE_COLUMNS = {
+    Place: frozenset(("review_count", "rating_sum") + tuple(f"rating_{star}" for star in RATINGS)),
+}
+
+
+def dependencies(obj, serialize):
+    """What ``serialize(obj)`` reads beyond the row's own updated_at.
+
+    Volatile columns it reads, and the (id, updated_at) of every related
+    row it nests, recursively. Relationships the serializer does not nest
+    are never touched.
+    """
+    model = type(obj)
+    volatile = VOLATILE_COLUMNS.get(model, frozenset())
+    deps = [getattr(obj, column) for column in sorted(serialize.columns & volatile)]
+    relationships = inspect(model).relationships
+    for name, nested in serialize.relationships.items():
+        related = getattr(obj, name)
+        if not relationships[name].uselist:
+            related = () if related is None else (related,)
+        deps.append(tuple((row.id, row.updated_at, dependencies(row, nested)) for row in related))
+    return tuple(deps)
+
+
+def dumps(data):
+    return json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def current_cache():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION)
+
+
+def encode(obj, serialize):
+    """JSON bytes of ``serialize(obj)``, a compiled serializer (app/serializers.py)."""
+    cache = current_cache()
+    if cache is None:
+        return dumps(serialize(obj))
+
+    key = (type(obj).__name__, obj.id, obj.updated_at, serialize.key, dependencies(obj, serialize))
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = dumps(serialize(obj))
+        cache.set(key, fragment)
+    return fragment
+
+
+def extend(fragment, extra):
+    """Add the keys of ``extra`` to an encoded JSON object."""
+    if not extra:
+        return fragment
+    return fragment[:-1] + b"," + dumps(extra)[1:]
+
+
+def array(fragments):
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def init_app(app):
+    maxbytes = int(app.config.get("FRAGMENT_CACHE_BYTES", 0))
+    app.extensions[EXTENSION] = (
+        backends.open_backend(app.config.get("CACHE_BACKEND"), "frag", maxbytes=maxbytes)
+        if maxbytes > 0 else None
+    )
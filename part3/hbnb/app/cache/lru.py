@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe bounded map with least-recently-used eviction and an optional TTL.
+
+    ``maxsize`` may be None to bound by bytes only. With ``maxbytes`` set,
+    values must be bytes and their total length is kept within it (a value
+    larger than that is not stored at all).
+
+    Counters: hits and misses for lookups, evictions for entries dropped to
+    stay within ``maxsize``/``maxbytes``, expirations for entries found past
+    their TTL, invalidations for entries removed by ``delete``/``clear``.
+    """
+
+    def __init__(self, maxsize, ttl=None, clock=time.monotonic, maxbytes=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.maxbytes = maxbytes
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def _size(self, value):
+        return len(value) if self.maxbytes is not None else 0
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= self._size(entry[1])
+        return entry
+
+    def _lookup(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= self.clock():
+            self._pop(key)
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key, default=None):
+        """Like get() but without touching the hit/miss counters."""
+        with self._lock:
+            entry = self._lookup(key)
+            return default if entry is None else entry[1]
+
+    def set(self, key, value):
+        size = self._size(value)
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        expires_at = self.clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (expires_at, value)
+            self.bytes += size
+            while (self.maxsize is not None and len(self._data) > self.maxsize) or (
+                self.maxbytes is not None and self.bytes > self.maxbytes
+            ):
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if self._pop(key) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+            if self.maxbytes is not None:
+                stats.update(bytes=self.bytes, maxbytes=self.maxbytes)
+            return stats
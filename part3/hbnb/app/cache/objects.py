@@ -0,0 +1,249 @@
+"""
+Read-through cache of ORM rows for SQLAlchemyRepository lookups by id and
+by unique key (see ``SQLAlchemyRepository.cached``).
+
+Entries hold column values, never live instances: a hit rebuilds the object
+straight into the current session as if it had just been loaded, so later
+lazy loads, updates and deletes work as usual. Each table gets its own
+bounded LRU/TTL region. Unique keys (email, amenity name) map to the id and
+are checked against the cached row on every hit, so only ids ever need
+invalidating.
+
+Invalidation follows the session: ids of flushed objects are dropped right
+after the flush and again after commit or rollback, so a concurrent reader
+cannot re-cache the old row in between. Commits are also published to the
+other workers (see app/cache/backends.py). Bulk and Core UPDATE/DELETE drop the
+ids given in their ``invalidate_ids`` execution option, or the whole region
+when they do not say. INSERTs never invalidate: misses are not cached.
+"""
+
+import threading
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.cache import backends
+from app.db.routing import is_pinned
+
+EXTENSION = "object_cache"
+INVALIDATE_IDS = "invalidate_ids"
+
+_PENDING = "cache_invalidations"
+_ALL = None
+
+
+class ObjectCache:
+    """The regions of one application, keyed by table name.
+
+    Regions live in the configured backend (app/cache/backends.py).
+    Committed invalidations are published on ``bus`` so other workers drop
+    their own copies and discard reads that raced the write.
+    """
+
+    def __init__(self, maxsize, ttl=None, disabled=(), backend="memory", bus=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disabled = set(disabled)
+        self.backend = backend
+        self.bus = bus or backends.MemoryBus("invalidations")
+        self.bus.subscribe(self._receive)
+        self.regions = {}
+        # bumped on every invalidation of a table; a read only stores its
+        # result if nothing was invalidated while it ran
+        self.generations = {}
+        self._lock = threading.Lock()
+
+    def enabled_for(self, table):
+        return self.maxsize > 0 and "*" not in self.disabled and table not in self.disabled
+
+    def region(self, table):
+        if not self.enabled_for(table):
+            return None
+        region = self.regions.get(table)
+        if region is None:
+            with self._lock:
+                region = self.regions.get(table)
+                if region is None:
+                    region = backends.open_backend(self.backend, f"obj:{table}", self.maxsize, self.ttl)
+                    self.regions[table] = region
+        return region
+
+    def generation(self, table):
+        return self.generations.get(table, 0)
+
+    def lookup(self, model, key):
+        """Cached column values for a ("id", value) or (column, value) key, or None."""
+        region = self.region(model.__table__.name)
+        if region is None:
+            return None
+        self.bus.poll()
+        column, value = key
+        if column == "id":
+            return region.get(key)
+
+        obj_id = region.get(key)
+        state = region.peek(("id", obj_id)) if obj_id is not None else None
+        if state is None or state.get(column) != value:
+            return None
+        return state
+
+    def store(self, obj, keys=(), generation=None, exclude=()):
+        table = obj.__table__.name
+        region = self.region(table)
+        if region is None:
+            return
+        self.bus.poll()
+        if generation is not None and generation != self.generation(table):
+            return
+        state = snapshot(obj, exclude)
+        region.set(("id", state["id"]), state)
+        for column in keys:
+            if state.get(column) is not None:
+                region.set((column, state[column]), state["id"])
+
+    def invalidate(self, table, ids=_ALL, publish=False):
+        with self._lock:
+            self.generations[table] = self.generation(table) + 1
+        region = self.regions.get(table)
+        if region is not None:
+            if ids is _ALL:
+                region.clear()
+            else:
+                for obj_id in ids:
+                    region.delete(("id", obj_id))
+        if publish:
+            self.bus.publish({"table": table, "ids": None if ids is _ALL else sorted(ids)})
+
+    def _receive(self, message):
+        table, ids = message["table"], message["ids"]
+        with self._lock:
+            self.generations[table] = self.generation(table) + 1
+        region = self.regions.get(table)
+        if region is not None and not getattr(region, "shared", False):
+            if ids is None:
+                region.clear()
+            else:
+                for obj_id in ids:
+                    region.delete(("id", obj_id))
+
+    def clear(self, tables=()):
+        """Invalidate the regions this worker opened, plus ``tables``: with a
+        shared backend, other workers may have filled regions this one never read."""
+        for table in set(self.regions) | set(tables):
+            if self.region(table) is not None:
+                self.invalidate(table, publish=True)
+
+    def stats(self):
+        return {table: region.stats() for table, region in sorted(self.regions.items())}
+
+
+def snapshot(obj, exclude=()):
+    mapper = inspect(obj).mapper
+    return {attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs if attr.key not in exclude}
+
+
+def restore(session, model, state):
+    """Attach a cached row to ``session`` as a clean persistent object.
+
+    Columns left out of the snapshot are expired, so they load from the
+    database on first access.
+    """
+    existing = session.identity_map.get(identity_key(model, state["id"]))
+    if existing is not None:
+        return existing
+    obj = model.__mapper__.class_manager.new_instance()
+    for key, value in state.items():
+        set_committed_value(obj, key, value)
+    make_transient_to_detached(obj)
+    session.add(obj)
+    missing = [attr.key for attr in model.__mapper__.column_attrs if attr.key not in state]
+    if missing:
+        session.expire(obj, missing)
+    return obj
+
+
+def current_cache():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION)
+
+
+def can_store(session):
+    """Rows read after the session's first write may be uncommitted; only
+    cache clean reads. Callers fill the cache from the primary (see
+    app.db.routing.read_primary): a lagging replica could hand back a row
+    older than an invalidation this worker already applied."""
+    return not is_pinned(session)
+
+
+def init_app(app):
+    disabled = app.config.get("OBJECT_CACHE_DISABLED", ())
+    if isinstance(disabled, str):
+        disabled = [name.strip() for name in disabled.split(",") if name.strip()]
+    backend = app.config.get("CACHE_BACKEND") or "memory"
+    app.extensions[EXTENSION] = ObjectCache(
+        int(app.config.get("OBJECT_CACHE_SIZE", 0)),
+        app.config.get("OBJECT_CACHE_TTL") or None,
+        disabled,
+        backend,
+        backends.open_bus(
+            app.config.get("CACHE_INVALIDATION_URL") or backend, "invalidations",
+            poll_interval=float(app.config.get("CACHE_INVALIDATION_POLL_INTERVAL", 0)),
+        ),
+    )
+
+
+def _invalidate(session, table, ids):
+    """Drop entries now and remember them for another pass when the transaction ends."""
+    pending = session.info.setdefault(_PENDING, {})
+    if ids is _ALL or pending.get(table, ()) is _ALL:
+        pending[table] = _ALL
+    else:
+        ids = set(ids)
+        pending.setdefault(table, set()).update(ids)
+
+    cache = current_cache()
+    if cache is not None:
+        cache.invalidate(table, ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        state = inspect(obj)
+        if state.identity is not None:
+            for table in state.mapper.tables:
+                _invalidate(session, table.name, state.identity)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_executed(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None:
+        ids = orm_execute_state.execution_options.get(INVALIDATE_IDS, _ALL)
+        _invalidate(orm_execute_state.session, table.name, ids)
+
+
+def _invalidate_again(session, publish):
+    pending = session.info.pop(_PENDING, None)
+    cache = current_cache()
+    if cache is None or not pending:
+        return
+    for table, ids in pending.items():
+        cache.invalidate(table, ids, publish=publish)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    # only committed writes concern the other workers
+    _invalidate_again(session, publish=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _invalidate_rolled_back(session):
+    _invalidate_again(session, publish=False)
@@ -0,0 +1,131 @@
+"""
+Minimal client for the Redis serialization protocol (RESP2).
+
+Only what the cache backend needs: request/response commands over one
+socket and a subscriber loop for pub/sub. Works with Redis, Valkey,
+KeyDB and any other server that speaks RESP.
+"""
+
+import socket
+import threading
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    """Error reply sent by the server."""
+
+
+def _encode(args):
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif not isinstance(arg, bytes):
+            arg = str(arg).encode("ascii")
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+class RespConnection:
+    def __init__(self, url, timeout=5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int((parsed.path or "/0").lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock, self._file = sock, sock.makefile("rb")
+        if self.password:
+            self._roundtrip(("AUTH", self.password))
+        if self.db:
+            self._roundtrip(("SELECT", self.db))
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            finally:
+                self._sock = self._file = None
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            raise RespError(rest.decode("utf-8"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read() for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def _roundtrip(self, args):
+        self._sock.sendall(_encode(args))
+        return self._read()
+
+    def execute(self, *args):
+        """Send one command and return its reply; reconnects once on a dropped connection."""
+        with self._lock:
+            for attempt in (1, 2):
+                if self._sock is None:
+                    self._connect()
+                try:
+                    return self._roundtrip(args)
+                except (ConnectionError, OSError):
+                    self.close()
+                    if attempt == 2:
+                        raise
+
+    def listen(self, channel, handler, stop, ready=None):
+        """Call ``handler(message_bytes)`` for every message on ``channel`` until ``stop`` is set.
+
+        ``ready``, an Event, is set once the server confirmed the subscription.
+
+        Blocks; run it on its own connection and thread, and call
+        shutdown() after setting ``stop`` to unblock it. Reconnects (and resubscribes)
+        after connection errors.
+        """
+        while not stop.is_set():
+            try:
+                self._connect()
+                self._sock.settimeout(None)
+                self._sock.sendall(_encode(("SUBSCRIBE", channel)))
+                while not stop.is_set():
+                    reply = self._read()
+                    if not isinstance(reply, list) or not reply:
+                        continue
+                    if reply[0] == b"message":
+                        handler(reply[2])
+                    elif reply[0] == b"subscribe" and ready is not None:
+                        ready.set()
+            except (ConnectionError, OSError):
+                stop.wait(1.0)
+            finally:
+                self.close()
+
+    def shutdown(self):
+        """Unblock a listen() running on another thread."""
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
@@ -0,0 +1,96 @@
+import click
+
+from app.extensions import db
+
+
+def _echo_schema_report(report):
+    """Print an ensure_schema report; returns whether anything was changed."""
+    for name in report["columns"]:
+        click.echo(f"added column {name}")
+    for name, count in report["backfilled"].items():
+        click.echo(f"backfilled {count} rows of {name}")
+    for name in report["indexes"]:
+        click.echo(f"created index {name}")
+    return any(report.values())
+
+
+def register_commands(app):
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        """Create any declared index missing from the database."""
+        from app.db.schema import ensure_indexes
+
+        created = ensure_indexes(db.engine)
+        if created:
+            for name in created:
+                click.echo(f"created index {name}")
+        else:
+            click.echo("all indexes present")
+
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create missing tables, then bring existing ones up to the declared schema.
+
+        Run once per deployment, before the workers start; the app itself
+        never touches the schema. An empty leaderboard over existing reviews
+        (data loaded without the facade) is rebuilt too.
+        """
+        from app.db.schema import create_tables, ensure_schema
+        from app.services.facade import facade
+
+        tables = create_tables(db.engine)
+        for name in tables:
+            click.echo(f"created table {name}")
+        changed = _echo_schema_report(ensure_schema(db.engine))
+        ranked = facade.repair_leaderboard()
+        if ranked:
+            click.echo(f"leaderboard was empty: ranked {ranked} places")
+        if not (changed or tables or ranked):
+            click.echo("schema up to date")
+
+    @app.cli.command("ensure-schema")
+    def ensure_schema_command():
+        """Add missing columns and indexes and backfill derived data."""
+        from app.db.schema import ensure_schema
+
+        if not _echo_schema_report(ensure_schema(db.engine)):
+            click.echo("schema up to date")
+
+    @app.cli.command("repair-ratings")
+    def repair_ratings_command():
+        """Recompute every place's rating aggregates from its reviews."""
+        from app.services.facade import facade
+
+        repaired = facade.repair_rating_aggregates()
+        if repaired:
+            click.echo(f"repaired rating aggregates of {repaired} places")
+        else:
+            click.echo("rating aggregates consistent")
+
+    @app.cli.command("refresh-leaderboard")
+    def refresh_leaderboard_command():
+        """Rebuild the top/trending place rankings from reviews."""
+        from app.services.facade import facade
+
+        ranked = facade.refresh_leaderboard()
+        click.echo(f"ranked {ranked} places")
+
+    @app.cli.command("export")
+    @click.argument("entity")
+    @click.option("--format", "fmt", default="ndjson", show_default=True, help="ndjson or csv")
+    @click.option("--fields", help="Comma-separated fields to export (default: all)")
+    @click.option("--output", "-o", type=click.File("wb"), default="-", help="File to write (default: stdout)")
+    def export_command(entity, fmt, fields, output):
+        """Stream every row of ENTITY (places, reviews or users) as NDJSON or CSV."""
+        from app.serializers import serializer
+        from app.services import export
+
+        if entity not in export.ENTITIES:
+            raise click.UsageError(f"Unknown entity: {entity}")
+        try:
+            serialize = serializer(export.ENTITIES[entity], fields.split(",")) if fields else None
+            chunks = export.export(entity, fmt, serialize, app.config.get("EXPORT_CHUNK_SIZE", 1000))
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        for chunk in chunks:
+            output.write(chunk)
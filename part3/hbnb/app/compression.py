@@ -0,0 +1,128 @@
+"""
+Negotiated compression of response bodies (br, gzip, deflate).
+
+Brotli is offered only when the ``brotli`` package is installed. Bodies
+under COMPRESS_MIN_SIZE, media types that do not shrink, and streamed
+responses (exports) are sent as they are.
+
+A compressed body of a response that has an ETag is cached under (ETag,
+encoding, level), so a hot list page is compressed once per version of its
+data instead of once per request. The ETag of a compressed response is made
+weak: the bytes differ from the identity body, yet revalidation
+(If-None-Match uses weak comparison) still answers 304.
+"""
+
+import gzip
+import zlib
+
+from flask import current_app, has_app_context, request
+
+from app.cache import backends
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+EXTENSION = "compression"
+
+COMPRESSIBLE = frozenset((
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "application/javascript",
+    "text/css",
+))
+
+
+def _gzip(body, level):
+    # mtime=0: the same body always gives the same bytes
+    return gzip.compress(body, level, mtime=0)
+
+
+def _deflate(body, level):
+    return zlib.compress(body, level)
+
+
+def _brotli(body, quality):
+    return brotli.compress(body, quality=quality)
+
+
+# in order of preference when the client accepts several equally
+ENCODERS = {"gzip": _gzip, "deflate": _deflate}
+if brotli is not None:
+    ENCODERS = {"br": _brotli, **ENCODERS}
+
+
+class Compressor:
+    """after_request hook compressing one application's responses."""
+
+    def __init__(self, min_size=500, level=6, brotli_quality=5, cache=None):
+        self.min_size = min_size
+        self.levels = {"gzip": level, "deflate": level, "br": brotli_quality}
+        self.cache = cache
+
+    def encode(self, body, encoding, etag=None):
+        """``body`` compressed with ``encoding``; cached under ``etag`` when one is given."""
+        level = self.levels[encoding]
+        key = (etag, encoding, level)
+        if etag and self.cache is not None:
+            compressed = self.cache.get(key)
+            if compressed is not None:
+                return compressed
+        compressed = ENCODERS[encoding](body, level)
+        if etag and self.cache is not None:
+            self.cache.set(key, compressed)
+        return compressed
+
+    def __call__(self, response):
+        if (
+            response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.is_streamed or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(ENCODERS)
+        if encoding is None or request.method == "HEAD":
+            return response
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        etag, _ = response.get_etag()
+        response.set_data(self.encode(body, encoding, etag))
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def current_compressor():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION)
+
+
+def init_app(app):
+    if not app.config.get("COMPRESS_ENABLED", True):
+        app.extensions[EXTENSION] = None
+        return
+
+    maxbytes = int(app.config.get("COMPRESS_CACHE_BYTES", 0))
+    compressor = Compressor(
+        min_size=int(app.config.get("COMPRESS_MIN_SIZE", 500)),
+        level=int(app.config.get("COMPRESS_LEVEL", 6)),
+        brotli_quality=int(app.config.get("COMPRESS_BROTLI_QUALITY", 5)),
+        cache=(
+            backends.open_backend(app.config.get("CACHE_BACKEND"), "gz", maxbytes=maxbytes)
+            if maxbytes > 0 else None
+        ),
+    )
+    app.extensions[EXTENSION] = compressor
+    app.after_request(compressor)
@@ -1,10 +1,40 @@
-from sqlalchemy import create_engine
-from config import config
+from sqlalchemy.engine import make_url
 
+from app.db.pool import InstrumentedQueuePool
+from app.extensions import db
 
-def get_engine(env="development"):
-    return create_engine(
-        config[env].SQLALCHEMY_DATABASE_URI,
-        echo=False,
-        future=True
-    ) 
+
+def engine_options(config):
+    """SQLAlchemy pool settings built from the DB_POOL_* config values.
+
+    In-memory SQLite keeps Flask-SQLAlchemy's StaticPool, which takes no
+    pool sizing arguments.
+    """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config.get("DB_POOL_SIZE", 5),
+        "max_overflow": config.get("DB_MAX_OVERFLOW", 10),
+        "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+        "pool_timeout": config.get("DB_POOL_TIMEOUT", 30),
+    }
+
+
+def get_engine():
+    """The engine Flask-SQLAlchemy built for the current app (needs an app context)."""
+    return db.engine
+
+
+def dispose_after_fork(app):
+    """Drop the pooled connections a forked worker inherited from its parent.
+
+    close=False: the sockets and file handles still belong to the parent,
+    so they are forgotten rather than closed; the worker opens its own.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
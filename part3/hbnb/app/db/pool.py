@@ -0,0 +1,78 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class PoolWaitStats:
+    """Checkout latency counters for one pool (thread safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if timed_out:
+                self.timeouts += 1
+
+    def to_dict(self):
+        with self._lock:
+            avg = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    # log as SQLAlchemy's QueuePool; the default name would be a child of
+    # the Flask app's "app" logger and inherit its DEBUG level
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.QueuePool"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return conn
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # QueuePool counts overflow from -pool_size upwards
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+
+    stats = getattr(pool, "wait_stats", None)
+    if stats is not None:
+        status["waits"] = stats.to_dict()
+
+    return status
@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+from functools import wraps
+
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+
+REPLICA_BIND = "replica"
+
+_READ_REPLICA = "read_replica"
+_PINNED = "primary_pinned"
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """Session that sends repository reads to the replica bind when one exists.
+
+    A SELECT goes to the replica only inside ``read_replica()`` and only
+    while the session is not pinned to the primary. Flushes, bulk writes and
+    everything after the first write of the session stay on the primary, so
+    a request always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and self.info.get(_READ_REPLICA)
+            and not self.info.get(_PINNED)
+            and not self._flushing
+            and isinstance(clause, sa.Select)
+        ):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def pin_primary(session):
+    session.info[_PINNED] = True
+
+
+def is_pinned(session):
+    return bool(session.info.get(_PINNED))
+
+
+@contextmanager
+def read_replica(session, allowed=True):
+    previous = session.info.get(_READ_REPLICA, False)
+    session.info[_READ_REPLICA] = allowed
+    try:
+        yield
+    finally:
+        session.info[_READ_REPLICA] = previous
+
+
+def read_primary(session):
+    """Send the reads inside the block to the primary, even within a replica_read."""
+    return read_replica(session, allowed=False)
+
+
+def replica_read(func):
+    """Mark a repository method as a read that may be served by the replica."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        from app.extensions import db
+
+        with read_replica(db.session):
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,258 @@
+from sqlalchemy import DateTime, func, inspect, select, update
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.schema import CreateColumn
+
+from app.db import versions
+from app.extensions import db
+from app.models import fulltext, geo
+
+# every model must be imported so its tables are on db.metadata
+from app.models.user import User  # noqa: F401
+from app.models.place import Place  # noqa: F401
+from app.models.review import Review  # noqa: F401
+from app.models.amenity import Amenity  # noqa: F401
+from app.models.table_version import TableVersion
+
+from app.repositories.place_repository import recompute_ratings
+
+
+def _existing_keys(inspector, table_name):
+    """Column tuples already backed by an index, mapped to whether it is unique."""
+    keys = {}
+
+    pk = inspector.get_pk_constraint(table_name).get("constrained_columns") or []
+    if pk:
+        keys[tuple(pk)] = True
+
+    for uq in inspector.get_unique_constraints(table_name):
+        keys[tuple(uq["column_names"])] = True
+
+    for ix in inspector.get_indexes(table_name):
+        cols = tuple(ix["column_names"])
+        keys[cols] = keys.get(cols, False) or bool(ix.get("unique"))
+
+    return keys
+
+
+def missing_indexes(engine):
+    """Declared indexes that an existing database does not have yet."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    missing = []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+
+        names = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        keys = _existing_keys(inspector, table.name)
+
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name in names:
+                continue
+            cols = tuple(c.name for c in index.columns)
+            if cols in keys and (keys[cols] or not index.unique):
+                continue
+            missing.append(index)
+
+    return missing
+
+
+def ensure_indexes(engine):
+    """Create missing declared indexes; returns the names of those added.
+
+    Safe to run on every start: indexes that exist (by name, or by an
+    equivalent index/unique constraint on the same columns) are skipped.
+    """
+    created = []
+    for index in missing_indexes(engine):
+        index.create(bind=engine)
+        created.append(index.name)
+    return created
+
+
+def missing_columns(engine):
+    """Declared columns that existing tables do not have yet."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    missing = []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        present = {c["name"] for c in inspector.get_columns(table.name)}
+        missing.extend(c for c in table.columns if c.name not in present)
+
+    return missing
+
+
+def ensure_columns(engine):
+    """ALTER TABLE ADD COLUMN for missing declared columns; returns "table.column" names.
+
+    Only columns SQLite can add in place are supported: nullable ones, or
+    NOT NULL ones with a server default.
+    """
+    added = []
+    with engine.begin() as conn:
+        for column in missing_columns(engine):
+            ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {column.table.name} ADD COLUMN {ddl}")
+            added.append(f"{column.table.name}.{column.name}")
+    return added
+
+
+def backfill_geohashes(engine, chunk_size=1000):
+    """Fill places.geohash for rows written before the column existed."""
+    places = Place.__table__
+    filled = 0
+    with engine.begin() as conn:
+        while True:
+            rows = conn.execute(
+                select(places.c.id, places.c.latitude, places.c.longitude)
+                .where(places.c.geohash.is_(None), places.c.latitude.is_not(None), places.c.longitude.is_not(None))
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                conn.execute(
+                    update(places)
+                    .where(places.c.id == row.id)
+                    .values(geohash=geo.encode(row.latitude, row.longitude))
+                )
+            filled += len(rows)
+    return filled
+
+
+# the text SQLAlchemy stores a DateTime as on SQLite ("2024-01-01 12:00:00.000000")
+DATETIME_SQL = "strftime('%Y-%m-%d %H:%M:%f', {0}) || '000'"
+DATETIME_LENGTH = 26
+
+
+def normalize_datetimes(engine):
+    """Rewrite DateTime values written by plain SQL in SQLAlchemy's format.
+
+    SQLite compares them as text, so "2024-01-01 12:00:00" (CURRENT_TIMESTAMP)
+    never equals the "...12:00:00.000000" a keyset cursor binds, and rows
+    sharing that instant are skipped by pagination. Returns the rows
+    rewritten per "table.column".
+    """
+    if engine.dialect.name != "sqlite":
+        return {}
+    # inspected before the transaction: on in-memory SQLite the inspector
+    # shares its connection and would roll the updates back
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    columns = [
+        (table.name, column.name)
+        for table in db.metadata.sorted_tables if table.name in existing
+        for column in table.columns
+        if isinstance(column.type, DateTime)
+        and column.name in {c["name"] for c in inspector.get_columns(table.name)}
+    ]
+
+    quote = engine.dialect.identifier_preparer.quote
+    rewritten = {}
+    with engine.begin() as conn:
+        for table, column in columns:
+            # plain SQL: a Core update() would also bump updated_at
+            value = DATETIME_SQL.format(quote(column))
+            result = conn.exec_driver_sql(
+                f"UPDATE {quote(table)} SET {quote(column)} = {value} "
+                f"WHERE length({quote(column)}) != {DATETIME_LENGTH} AND {value} IS NOT NULL"
+            )
+            rewritten[f"{table}.{column}"] = result.rowcount
+    return rewritten
+
+
+def ensure_fulltext(engine):
+    """Create the places full-text index if missing and index existing rows.
+
+    Returns the number of places indexed, or None when the index was
+    already there (or the database is not SQLite).
+    """
+    if engine.dialect.name != "sqlite":
+        return None
+    inspector = inspect(engine)
+    if fulltext.FTS_TABLE in inspector.get_table_names() or "places" not in inspector.get_table_names():
+        return None
+
+    with engine.begin() as conn:
+        for statement in fulltext.CREATE_STATEMENTS:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(fulltext.REBUILD_STATEMENT)
+        return conn.execute(select(func.count()).select_from(Place.__table__)).scalar()
+
+
+def repair_fulltext(engine):
+    """Rebuild the places full-text index if it no longer matches places.
+
+    Returns the number of places reindexed, 0 when the index was sound
+    (or absent, or the database is not SQLite). See app/models/fulltext.py
+    for how the two drift apart.
+    """
+    if engine.dialect.name != "sqlite" or fulltext.FTS_TABLE not in inspect(engine).get_table_names():
+        return 0
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql(fulltext.INTEGRITY_CHECK_STATEMENT)
+        return 0
+    except DatabaseError:
+        pass
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(fulltext.REBUILD_STATEMENT)
+        return conn.execute(select(func.count()).select_from(Place.__table__)).scalar()
+
+
+def create_tables(engine):
+    """Create declared tables the database does not have yet; returns their names."""
+    existing = set(inspect(engine).get_table_names())
+    db.metadata.create_all(engine)
+    return [table.name for table in db.metadata.sorted_tables if table.name not in existing]
+
+
+def ensure_schema(engine):
+    """Bring an existing database up to the declared schema.
+
+    Adds missing columns, backfills derived data and creates missing
+    indexes (including the full-text index, which is rebuilt when it has
+    drifted from places), in that order. Returns a report of what was
+    changed.
+    """
+    columns = ensure_columns(engine)
+    backfilled = {"places.geohash": backfill_geohashes(engine), **normalize_datetimes(engine)}
+    if "places.review_count" in columns:
+        with engine.begin() as conn:
+            backfilled["places.review_count"] = recompute_ratings(conn)
+    indexes = ensure_indexes(engine)
+
+    indexed = ensure_fulltext(engine)
+    if indexed is not None:
+        indexes.append(fulltext.FTS_TABLE)
+        backfilled[fulltext.FTS_TABLE] = indexed
+    else:
+        backfilled[fulltext.FTS_TABLE] = repair_fulltext(engine)
+
+    backfilled = {name: count for name, count in backfilled.items() if count}
+    _bump_backfilled(engine, backfilled)
+    return {"columns": columns, "backfilled": backfilled, "indexes": indexes}
+
+
+def _bump_backfilled(engine, backfilled):
+    """Bump the write counters of the tables a backfill rewrote.
+
+    Backfills write through Core or raw SQL, which the session hooks of
+    app.db.versions never see; without this, ETags over those tables
+    would keep matching the pre-backfill data. A rebuilt full-text index
+    counts as a write to places, since it changes what searching them returns.
+    """
+    tables = {
+        "places" if name == fulltext.FTS_TABLE else name.split(".")[0]
+        for name in backfilled
+    }
+    tables.discard(TableVersion.__tablename__)
+    if not tables or TableVersion.__tablename__ not in inspect(engine).get_table_names():
+        return
+    with engine.begin() as conn:
+        versions.bump(conn, tables)
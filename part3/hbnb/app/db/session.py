@@ -1,8 +1,8 @@
 from sqlalchemy.orm import sessionmaker
-from app.db.database import get_engine
 
+# bound to the app's engine by create_app, so scripts using SessionLocal
+# share Flask-SQLAlchemy's connection pool instead of opening their own
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
-    bind=get_engine()
 )
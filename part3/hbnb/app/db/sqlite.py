@@ -0,0 +1,37 @@
+from sqlalchemy import event
+
+# PRAGMAs applied to every new SQLite connection, by profile name
+SQLITE_PROFILES = {
+    # SQLite's own defaults: rollback journal, synchronous=FULL
+    "default": {},
+    # WAL lets readers run alongside a writer; NORMAL is durable in WAL
+    # mode except for the last commits on power loss
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negative = KiB, so 64 MiB
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def install_sqlite_profile(engine, profile):
+    """Run the profile's PRAGMAs on each connection the engine opens."""
+    try:
+        pragmas = SQLITE_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown SQLite profile: {profile}")
+
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
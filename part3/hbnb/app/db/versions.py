@@ -0,0 +1,77 @@
+"""
+Per-table write counters (see app.models.table_version.TableVersion).
+
+Tables written in a transaction are collected from the session: flushed
+objects (and association tables whose collections changed) via after_flush,
+bulk and Core INSERT/UPDATE/DELETE via do_orm_execute. Just before commit
+each collected table's counter is bumped once, in the same transaction as
+the writes, so a version is never visible before the data it stands for.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event, inspect, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.table_version import TableVersion
+
+_TOUCHED = "touched_tables"
+
+_versions = TableVersion.__table__
+
+
+def _touch(session, names):
+    touched = session.info.setdefault(_TOUCHED, set())
+    touched.update(names)
+    touched.discard(_versions.name)
+
+
+def _object_tables(obj):
+    state = inspect(obj)
+    names = {table.name for table in state.mapper.tables}
+    for rel in state.mapper.relationships:
+        if rel.secondary is not None and state.attrs[rel.key].history.has_changes():
+            names.add(rel.secondary.name)
+    return names
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session, flush_context):
+    names = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        names |= _object_tables(obj)
+    _touch(session, names)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_executed_table(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _touch(orm_execute_state.session, {table.name})
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    session.flush()
+    names = session.info.pop(_TOUCHED, None)
+    if names:
+        bump(session.connection(), names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_tables(session):
+    session.info.pop(_TOUCHED, None)
+
+
+def bump(connection, names, now=None):
+    """Increment the counters of ``names``, creating missing rows."""
+    now = now or datetime.utcnow()
+    for name in sorted(names):
+        result = connection.execute(
+            update(_versions)
+            .where(_versions.c.name == name)
+            .values(version=_versions.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(_versions).values(name=name, version=1, updated_at=now))
@@ -3,7 +3,9 @@ from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 
-db = SQLAlchemy()
+from app.db.routing import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
 jwt = JWTManager()
 cors = CORS()
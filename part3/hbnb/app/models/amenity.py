@@ -1,5 +1,6 @@
 from app.extensions import db
 from app.models.base_model import BaseModel
+from app.serializers import serializer
 
 place_amenity = db.Table(
     "place_amenity",
@@ -13,7 +14,8 @@ place_amenity = db.Table(
         "amenity_id",
         db.String(36),
         db.ForeignKey("amenities.id"),
-        primary_key=True
+        primary_key=True,
+        index=True
     ),
 )
 
@@ -29,9 +31,4 @@ class Amenity(BaseModel):
     )
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+        return serializer("amenity")(self)
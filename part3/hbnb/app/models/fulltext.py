@@ -0,0 +1,140 @@
+"""
+SQLite FTS5 index over place titles and descriptions.
+
+places_fts is an external-content FTS5 table: it stores only the inverted
+index and reads title/description back from places by rowid. Triggers on
+places keep it in sync, so ORM writes, bulk inserts and bulk deletes are
+all covered without any Python-side bookkeeping.
+
+places has a VARCHAR primary key, so that rowid is SQLite's implicit one,
+which is not guaranteed stable: VACUUM may renumber it and a dump and
+restore assigns new ones, after which the index points at the wrong
+places. ensure_schema (and so init-db) therefore checks the index against
+places with INTEGRITY_CHECK_STATEMENT and rebuilds it when they disagree;
+run it after a VACUUM or a restore.
+"""
+
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import DDL, column, event, func, literal_column, table
+
+FTS_TABLE = "places_fts"
+
+# title matches weigh ten times as much as description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+MAX_TERMS = 16
+
+INSERT_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS places_fts_ai AFTER INSERT ON places BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END
+    """
+
+CREATE_STATEMENTS = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='places', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    INSERT_TRIGGER,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS places_fts_ad AFTER DELETE ON places BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS places_fts_au AFTER UPDATE OF title, description ON places BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+)
+
+DROP_STATEMENTS = (
+    "DROP TRIGGER IF EXISTS places_fts_au",
+    "DROP TRIGGER IF EXISTS places_fts_ad",
+    "DROP TRIGGER IF EXISTS places_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+REBUILD_STATEMENT = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+# rank 1: also compare the index with the rows of places; raises when they differ
+INTEGRITY_CHECK_STATEMENT = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)"
+
+places_fts = table(FTS_TABLE, column("rowid"))
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def attach(places_table):
+    """Create and drop the index together with the places table (SQLite only)."""
+    for statement in CREATE_STATEMENTS:
+        event.listen(places_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in DROP_STATEMENTS:
+        event.listen(places_table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+
+
+@contextmanager
+def deferred_index(connection):
+    """Index the places inserted inside the block with one INSERT ... SELECT.
+
+    The insert trigger costs a statement per row, ten times what indexing
+    the same rows in one go does, so a bulk insert drops it and restores
+    it afterwards. Must run inside the transaction of the inserts: SQLite
+    DDL is transactional, and since SQLite has a single writer no other
+    insert can happen while the trigger is gone.
+    """
+    present = connection.dialect.name == "sqlite" and connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'places_fts_ai'"
+    ).first()
+    if not present:
+        yield
+        return
+
+    last_rowid = connection.exec_driver_sql("SELECT COALESCE(MAX(rowid), 0) FROM places").scalar()
+    connection.exec_driver_sql("DROP TRIGGER places_fts_ai")
+    try:
+        yield
+        connection.exec_driver_sql(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, description)"
+            " SELECT rowid, title, description FROM places WHERE rowid > ?",
+            (last_rowid,),
+        )
+    finally:
+        connection.exec_driver_sql(INSERT_TRIGGER)
+
+
+def match_expression(text):
+    """Turn free user input into a safe FTS5 query.
+
+    Every word is quoted and all of them must match; the last one is a
+    prefix so "desert ca" finds "Desert camp" while the user is still
+    typing. Only the last word is a prefix because FTS5 merges the full
+    doclist of every term a prefix expands to. FTS5 operators in the
+    input are treated as plain words.
+    """
+    terms = _TERM.findall(text or "")[:MAX_TERMS]
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def matches(expression):
+    return literal_column(FTS_TABLE).op("MATCH")(expression)
+
+
+def score():
+    """bm25 of the current match; lower is more relevant."""
+    return func.bm25(literal_column(FTS_TABLE), TITLE_WEIGHT, DESCRIPTION_WEIGHT)
@@ -0,0 +1,137 @@
+"""
+Geohash and great-circle helpers used for place proximity search.
+"""
+
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~4.8m x 4.8m cells, plenty for listings
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _spread(x):
+    """Interleave zeros between the bits of x (x < 2**32): 0b111 -> 0b10101."""
+    x = (x | x << 16) & 0x0000FFFF0000FFFF
+    x = (x | x << 8) & 0x00FF00FF00FF00FF
+    x = (x | x << 4) & 0x0F0F0F0F0F0F0F0F
+    x = (x | x << 2) & 0x3333333333333333
+    return (x | x << 1) & 0x5555555555555555
+
+
+def _cell_index(value, low, span, bits):
+    """Index of the cell holding value among 2**bits equal cells of [low, low + span].
+
+    The same answer as bisecting with ``value >= mid``: the float estimate
+    is corrected against the exact (dyadic) cell edges.
+    """
+    cells = 1 << bits
+    step = span / cells
+    index = min(max(int((value - low) / step), 0), cells - 1)
+    if index > 0 and value < low + index * step:
+        index -= 1
+    elif index < cells - 1 and value >= low + (index + 1) * step:
+        index += 1
+    return index
+
+
+def encode(lat, lon, precision=GEOHASH_PRECISION):
+    total = 5 * precision
+    lon_bits, lat_bits = (total + 1) // 2, total // 2
+    lon_index = _spread(_cell_index(lon, -180.0, 360.0, lon_bits))
+    lat_index = _spread(_cell_index(lat, -90.0, 180.0, lat_bits))
+    # longitude takes the first (most significant) bit
+    if total % 2:
+        value = lon_index | lat_index << 1
+    else:
+        value = lon_index << 1 | lat_index
+    return "".join(BASE32[(value >> shift) & 31] for shift in range(total - 5, -1, -5))
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def cover(min_lat, min_lon, max_lat, max_lon, max_cells=32):
+    """Geohash prefixes whose cells together contain the bounding box.
+
+    Uses the finest precision that needs at most ``max_cells`` cells, so a
+    prefix range scan on an indexed geohash column reads only rows near
+    the box. Returns ``[""]`` (everything) when even one-character cells
+    cannot cover it within the budget.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        y0 = int((min_lat + 90.0) // height)
+        y1 = int(min((max_lat + 90.0) // height, (180.0 / height) - 1))
+        x0 = int((min_lon + 180.0) // width)
+        x1 = int(min((max_lon + 180.0) // width, (360.0 / width) - 1))
+
+        if (y1 - y0 + 1) * (x1 - x0 + 1) > max_cells:
+            continue
+
+        return sorted({
+            encode(-90.0 + (y + 0.5) * height, -180.0 + (x + 0.5) * width, precision)
+            for y in range(y0, y1 + 1)
+            for x in range(x0, x1 + 1)
+        })
+
+    return [""]
+
+
+def _next_prefix(prefix):
+    """Smallest string greater than every geohash starting with prefix."""
+    prefix = prefix.rstrip(BASE32[-1])
+    if not prefix:
+        return None
+    return prefix[:-1] + BASE32[BASE32.index(prefix[-1]) + 1]
+
+
+def prefix_ranges(prefixes):
+    """Merge geohash prefixes into half-open ``(low, high)`` string ranges.
+
+    ``high`` is None when the range runs to the end of the keyspace.
+    """
+    ranges = []
+    for prefix in sorted(prefixes):
+        low, high = prefix, _next_prefix(prefix)
+        if ranges and ranges[-1][1] == low:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((low, high))
+    return ranges
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bboxes(lat, lon, radius_km):
+    """Bounding boxes (min_lat, min_lon, max_lat, max_lon) around a circle.
+
+    Two boxes are returned when the circle crosses the antimeridian.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    min_lat, max_lat = lat - dlat, lat + dlat
+
+    if min_lat <= -90.0 or max_lat >= 90.0 or math.sin(angle) >= math.cos(math.radians(lat)):
+        # the circle contains a pole: every longitude is in range
+        return [(max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0)]
+
+    # widest longitude span of the circle, reached at the tangent meridians;
+    # radius / cos(lat) underestimates it away from the equator
+    dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180.0:
+        return [(min_lat, min_lon + 360.0, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    if max_lon > 180.0:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon - 360.0)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
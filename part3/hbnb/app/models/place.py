@@ -1,16 +1,44 @@
+from sqlalchemy import event, inspect
+
 from app.extensions import db
+from app.models import fulltext, geo
 from app.models.base_model import BaseModel
 from app.models.amenity import place_amenity
+from app.models.ranking import PlaceRanking  # noqa: F401
+from app.serializers import field_names, serializer
+
+
+RATINGS = range(1, 6)
+
+
+def _default_geohash(context):
+    # context-sensitive default so bulk inserts get a geohash too
+    params = context.get_current_parameters()
+    if params.get("latitude") is None or params.get("longitude") is None:
+        return None
+    return geo.encode(params["latitude"], params["longitude"])
+
 
 class Place(BaseModel):
     __tablename__ = "places"
 
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(1024), default="", nullable=False)
-    price_per_night = db.Column(db.Float, default=0.0, nullable=False)
+    price_per_night = db.Column(db.Float, default=0.0, nullable=False, index=True)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False, index=True)
+    geohash = db.Column(db.String(12), index=True, default=_default_geohash)
+
+    # review aggregates, kept in step with the reviews table by the facade
+    # (see PlaceRepository.adjust_ratings) so showing a rating never reads reviews
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_1 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_2 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_3 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_4 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     owner = db.relationship("User", back_populates="places")
 
@@ -26,28 +54,36 @@ class Place(BaseModel):
         back_populates="places"
     )
 
-    def to_dict(self, include_amenities=True, include_reviews=False):
-        data = {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "price_per_night": self.price_per_night,
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "owner_id": self.owner_id,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
-
-        if include_amenities:
-            data["amenities"] = [
-                {"id": a.id, "name": a.name}
-                for a in (self.amenities or [])
-            ]
+    ranking = db.relationship(
+        "PlaceRanking",
+        uselist=False,
+        cascade="all, delete-orphan"
+    )
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
+    @property
+    def rating_histogram(self):
+        return {str(star): getattr(self, f"rating_{star}") or 0 for star in RATINGS}
 
+    def to_dict(self, include_amenities=True, include_reviews=False):
+        fields = set(field_names("place"))
+        if not include_amenities:
+            fields.discard("amenities")
         if include_reviews:
-            data["reviews"] = [
-                r.to_dict() for r in (self.reviews or [])
-            ]
+            fields.add("reviews")
+        return serializer("place", fields)(self)
+
+
+@event.listens_for(Place, "before_update")
+def _refresh_geohash(mapper, connection, place):
+    state = inspect(place)
+    if state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes():
+        place.geohash = geo.encode(place.latitude, place.longitude)
+
 
-        return data
+fulltext.attach(Place.__table__)
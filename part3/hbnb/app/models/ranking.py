@@ -0,0 +1,81 @@
+"""
+Leaderboard rows and the scores they are ranked by.
+
+rating_score is a Bayesian average: every place starts with prior_weight
+virtual reviews of prior_mean stars, so one 5-star review does not beat a
+hundred 4.8s. The prior is configured rather than derived from all reviews
+so a review only ever changes its own place's score.
+
+trend_key ranks places by recent review volume. Each review weighs
+2 ** ((created_at - TREND_EPOCH) / half_life), i.e. its weight halves
+every half_life relative to newer ones. The key is log2 of the sum of
+those weights: comparing keys compares decayed volumes at any moment, a
+new review is one log-add, and nothing ever has to be decayed in place.
+"""
+
+import math
+from collections import namedtuple
+from datetime import datetime
+
+from app.extensions import db
+
+TREND_EPOCH = datetime(2024, 1, 1)
+
+
+class RankingParams(namedtuple("RankingParams", "prior_mean prior_weight half_life_hours")):
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            float(config.get("LEADERBOARD_PRIOR_MEAN", 3.5)),
+            float(config.get("LEADERBOARD_PRIOR_WEIGHT", 5)),
+            float(config.get("LEADERBOARD_TREND_HALF_LIFE_HOURS", 72)),
+        )
+
+
+def bayesian_score(rating_sum, review_count, params):
+    return (params.prior_mean * params.prior_weight + rating_sum) / (params.prior_weight + review_count)
+
+
+def trend_exponent(at, params):
+    return (at - TREND_EPOCH).total_seconds() / 3600.0 / params.half_life_hours
+
+
+def log2_add(a, b):
+    """log2(2**a + 2**b) without leaving log space; None is an empty sum."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1.0 + 2.0 ** (low - high))
+
+
+def trend_key(review_times, params, key=None):
+    for at in review_times:
+        key = log2_add(key, trend_exponent(at, params))
+    return key
+
+
+def trend_weight(key, params, now=None):
+    """Decayed review volume as of now, in reviews written at that moment."""
+    if key is None:
+        return 0.0
+    return 2.0 ** (key - trend_exponent(now or datetime.utcnow(), params))
+
+
+class PlaceRanking(db.Model):
+    """Materialized leaderboard row for one reviewed place (see LeaderboardRepository)."""
+
+    __tablename__ = "place_rankings"
+
+    place_id = db.Column(db.String(36), db.ForeignKey("places.id", ondelete="CASCADE"), primary_key=True)
+    rating_score = db.Column(db.Float, nullable=False)
+    trend_key = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # both boards read these backwards (score DESC, place_id DESC), so a
+    # top-N request walks N index entries and never sorts
+    __table_args__ = (
+        db.Index("ix_place_rankings_rating", "rating_score", "place_id"),
+        db.Index("ix_place_rankings_trend", "trend_key", "place_id"),
+    )
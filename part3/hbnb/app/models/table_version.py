@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class TableVersion(db.Model):
+    """Write counter for one table, bumped once per committing transaction.
+
+    List endpoints derive their ETag and Last-Modified from these rows, so
+    revalidating a collection reads a handful of rows instead of the table.
+    """
+
+    __tablename__ = "table_versions"
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -1,5 +1,7 @@
-from app.extensions import db, bcrypt
+from app.extensions import db
 from app.models.base_model import BaseModel
+from app.serializers import serializer
+from app.services.passwords import current_hasher
 
 
 class User(BaseModel):
@@ -15,18 +17,14 @@ class User(BaseModel):
     reviews = db.relationship("Review", back_populates="user", cascade="all, delete-orphan")
 
     def set_password(self, password: str):
-        self.password = bcrypt.generate_password_hash(password).decode("utf-8")
+        self.password = current_hasher().hash(password)
 
     def check_password(self, password: str) -> bool:
-        return bcrypt.check_password_hash(self.password, password)
+        return current_hasher().check(self.password, password)
+
+    def password_needs_rehash(self) -> bool:
+        """True when the stored hash was made at another cost than BCRYPT_LOG_ROUNDS."""
+        return current_hasher().needs_rehash(self.password)
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "email": self.email,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "is_admin": self.is_admin,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+        return serializer("user")(self)
@@ -4,8 +4,11 @@ from app.models.amenity import Amenity
 
 
 class AmenityRepository(SQLAlchemyRepository):
+    cached = True
+    cache_keys = ("name",)
+
     def __init__(self):
         super().__init__(Amenity)
 
     def get_by_name(self, name):
-        return self.model.query.filter_by(name=name).first()
+        return self.get_by_key("name", name)
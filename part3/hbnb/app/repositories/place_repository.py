@@ -1,12 +1,240 @@
+import heapq
+
+from sqlalchemy import and_, bindparam, case, func, literal_column, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.util import identity_key
+
+from app.cache import objects as object_cache
 from app.extensions import db
-from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
-from app.models.place import Place
+from app.db.routing import replica_read
+from app.repositories.sqlalchemy_repository import SQLAlchemyRepository, decode_keyset, encode_keyset
+from app.models import fulltext, geo
+from app.models.amenity import place_amenity
+from app.models.place import RATINGS, Place
+from app.models.review import Review
+
+RATING_COLUMNS = ("review_count", "rating_sum") + tuple(f"rating_{star}" for star in RATINGS)
+
+
+def recompute_ratings(executor):
+    """Rebuild every place's rating aggregates from the reviews table.
+
+    ``executor`` is a session or connection. Only places whose stored
+    aggregates differ are rewritten; returns how many that was.
+    """
+    places, reviews = Place.__table__, Review.__table__
+    stats = (
+        select(
+            reviews.c.place_id,
+            func.count().label("review_count"),
+            func.sum(reviews.c.rating).label("rating_sum"),
+            *(
+                func.sum(case((reviews.c.rating == star, 1), else_=0)).label(f"rating_{star}")
+                for star in RATINGS
+            ),
+        )
+        .group_by(reviews.c.place_id)
+        .subquery()
+    )
+    expected = {name: func.coalesce(stats.c[name], 0) for name in RATING_COLUMNS}
+    drifted = executor.execute(
+        select(places.c.id, *(value.label(name) for name, value in expected.items()))
+        .outerjoin(stats, stats.c.place_id == places.c.id)
+        .where(or_(*(places.c[name] != value for name, value in expected.items())))
+    ).all()
+
+    if drifted:
+        executor.execute(
+            update(places)
+            .where(places.c.id == bindparam("b_id"))
+            .values({name: bindparam(f"b_{name}") for name in RATING_COLUMNS})
+            .execution_options(**{object_cache.INVALIDATE_IDS: [row.id for row in drifted]}),
+            [
+                {"b_id": row.id, **{f"b_{name}": getattr(row, name) for name in RATING_COLUMNS}}
+                for row in drifted
+            ],
+        )
+    return len(drifted)
 
 
 class PlaceRepository(SQLAlchemyRepository):
+    cached = True
+
+    profiles = {
+        # listings: one extra SELECT ... IN for the amenities of the whole page
+        "card": (selectinload(Place.amenities),),
+        # single place: amenities come back in the same round trip
+        "detail": (joinedload(Place.amenities),),
+    }
+
+    # below this many rows the per-row index trigger is cheaper than
+    # dropping and recreating it
+    DEFERRED_INDEX_MIN_ROWS = 100
+
     def __init__(self):
         super().__init__(Place)
 
+    def add_many(self, rows, chunk_size=1000):
+        rows = list(rows)
+        if len(rows) < self.DEFERRED_INDEX_MIN_ROWS:
+            return super().add_many(rows, chunk_size)
+        with fulltext.deferred_index(db.session.connection()):
+            return super().add_many(rows, chunk_size)
+
+    @replica_read
     def get_by_owner(self, user_id):
         return self.model.query.filter_by(owner_id=user_id).all()
 
+    def _within_boxes(self, boxes):
+        """Filter on geohash prefix ranges (index range scans), then the exact box."""
+        ranges = []
+        exact = []
+        for min_lat, min_lon, max_lat, max_lon in boxes:
+            for low, high in geo.prefix_ranges(geo.cover(min_lat, min_lon, max_lat, max_lon)):
+                if high is None:
+                    ranges.append(Place.geohash >= low)
+                else:
+                    ranges.append(and_(Place.geohash >= low, Place.geohash < high))
+            exact.append(and_(
+                Place.latitude.between(min_lat, max_lat),
+                Place.longitude.between(min_lon, max_lon),
+            ))
+        return and_(or_(*ranges), or_(*exact))
+
+    def adjust_ratings(self, changes):
+        """Apply review changes to the places' rating aggregates.
+
+        ``changes`` maps place_id -> {rating: +n or -n}. Every place gets one
+        relative UPDATE (sent as a single executemany), so concurrent
+        reviewers never overwrite each other's counts.
+        """
+        places = Place.__table__
+        params = []
+        for place_id, ratings in changes.items():
+            row = {
+                "b_place_id": place_id,
+                "b_review_count": sum(ratings.values()),
+                "b_rating_sum": sum(star * n for star, n in ratings.items()),
+            }
+            row.update({f"b_rating_{star}": ratings.get(star, 0) for star in RATINGS})
+            params.append(row)
+        if not params:
+            return
+
+        db.session.execute(
+            update(places)
+            .where(places.c.id == bindparam("b_place_id"))
+            .values({name: places.c[name] + bindparam(f"b_{name}") for name in RATING_COLUMNS})
+            .execution_options(**{object_cache.INVALIDATE_IDS: list(changes)}),
+            params,
+        )
+
+        # places already loaded in this session must not keep the old counts
+        for place_id in changes:
+            place = db.session.identity_map.get(identity_key(Place, place_id))
+            if place is not None:
+                db.session.expire(place, RATING_COLUMNS)
+
+    def repair_ratings(self):
+        return recompute_ratings(db.session)
+
+    def apply_filters(self, query, min_price=None, max_price=None, amenity_ids=None):
+        """Narrow a places query by price range and required amenities (all of them)."""
+        if min_price is not None:
+            query = query.filter(Place.price_per_night >= min_price)
+        if max_price is not None:
+            query = query.filter(Place.price_per_night <= max_price)
+
+        if amenity_ids:
+            amenity_ids = sorted(set(amenity_ids))
+            having_all = (
+                select(place_amenity.c.place_id)
+                .where(place_amenity.c.amenity_id.in_(amenity_ids))
+                .group_by(place_amenity.c.place_id)
+                .having(func.count(place_amenity.c.amenity_id) == len(amenity_ids))
+            )
+            query = query.filter(Place.id.in_(having_all))
+
+        return query
+
+    def listing_query(self, profile=None, bbox=None, min_price=None, max_price=None, amenity_ids=None):
+        """Places query for the listing filters; bbox is (min_lat, min_lon, max_lat, max_lon)."""
+        query = self.query(profile)
+
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            if min_lon > max_lon:
+                # box crosses the antimeridian
+                boxes = [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+            else:
+                boxes = [(min_lat, min_lon, max_lat, max_lon)]
+            query = query.filter(self._within_boxes(boxes))
+
+        return self.apply_filters(query, min_price, max_price, amenity_ids)
+
+    @replica_read
+    def search_page(self, text, limit, cursor=None, profile=None,
+                    min_price=None, max_price=None, amenity_ids=None):
+        """Full-text page ranked by bm25, best first; returns ([(place, score)], next_cursor).
+
+        Every matching place is ranked, so the best hit of a common word is
+        found however old it is; SQLite keeps only the best ``limit + 1``
+        while sorting. The price is that a query scores all its matches: a
+        word found in most of 200k listings takes about 0.4 s. The cursor carries the (score, rowid) of the last hit, so
+        later pages seek past it instead of re-ranking and skipping rows.
+        """
+        fts_rowid = fulltext.places_fts.c.rowid
+        candidates = self.apply_filters(
+            select(fts_rowid.label("rowid"), fulltext.score().label("score"))
+            .join(Place, literal_column("places.rowid") == fts_rowid)
+            .where(fulltext.matches(fulltext.match_expression(text))),
+            min_price, max_price, amenity_ids,
+        ).subquery("hits")
+
+        query = (
+            self.query(profile)
+            .join(candidates, candidates.c.rowid == literal_column("places.rowid"))
+            .add_columns(candidates.c.score, candidates.c.rowid)
+        )
+
+        if cursor:
+            try:
+                last_score, last_rowid = decode_keyset(cursor)
+                last_score, last_rowid = float(last_score), int(last_rowid)
+            except (ValueError, TypeError):
+                raise ValueError("Invalid cursor")
+            query = query.filter(or_(
+                candidates.c.score > last_score,
+                and_(candidates.c.score == last_score, candidates.c.rowid > last_rowid),
+            ))
+
+        rows = query.order_by(candidates.c.score, candidates.c.rowid).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_keyset([rows[-1].score, rows[-1].rowid])
+        return [(row[0], row.score) for row in rows], next_cursor
+
+    @replica_read
+    def get_near(self, lat, lon, radius_km, limit, profile=None,
+                 min_price=None, max_price=None, amenity_ids=None):
+        """The ``limit`` closest places within ``radius_km``, as (place, distance_km) pairs."""
+        candidates = self.apply_filters(
+            db.session.query(Place.id, Place.latitude, Place.longitude)
+            .filter(self._within_boxes(geo.radius_bboxes(lat, lon, radius_km))),
+            min_price, max_price, amenity_ids,
+        ).all()
+
+        distances = {}
+        for row in candidates:
+            distance = geo.haversine_km(lat, lon, row.latitude, row.longitude)
+            if distance <= radius_km:
+                distances[row.id] = distance
+
+        nearest = heapq.nsmallest(limit, distances, key=distances.get)
+        if not nearest:
+            return []
+
+        places = {p.id: p for p in self.query(profile).filter(Place.id.in_(nearest)).all()}
+        return [(places[pid], distances[pid]) for pid in nearest if pid in places]
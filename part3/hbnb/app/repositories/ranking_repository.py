@@ -0,0 +1,135 @@
+from sqlalchemy import delete, insert, select
+
+from app.extensions import db
+from app.db.routing import replica_read
+from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
+from app.models import ranking
+from app.models.place import Place
+from app.models.ranking import PlaceRanking
+from app.models.review import Review
+
+
+def rebuild_rankings(executor, params, chunk_size=1000):
+    """Recompute the whole leaderboard from places and reviews.
+
+    ``executor`` is a session or connection. Reviews are streamed in
+    place order, so memory holds one trend key per place, not every review.
+    Returns the number of ranked places.
+    """
+    places, reviews, rankings = Place.__table__, Review.__table__, PlaceRanking.__table__
+
+    keys = {}
+    stream = executor.execute(
+        select(reviews.c.place_id, reviews.c.created_at)
+        .order_by(reviews.c.place_id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for row in stream:
+        keys[row.place_id] = ranking.trend_key([row.created_at], params, keys.get(row.place_id))
+
+    rows = [
+        {
+            "place_id": row.id,
+            "rating_score": ranking.bayesian_score(row.rating_sum, row.review_count, params),
+            "trend_key": keys[row.id],
+        }
+        for row in executor.execute(
+            select(places.c.id, places.c.review_count, places.c.rating_sum)
+            .where(places.c.review_count > 0)
+        )
+        if row.id in keys
+    ]
+
+    executor.execute(delete(rankings))
+    for start in range(0, len(rows), chunk_size):
+        executor.execute(insert(rankings), rows[start:start + chunk_size])
+    return len(rows)
+
+
+class LeaderboardRepository(SQLAlchemyRepository):
+    """Materialized place rankings, kept current by the facade on every review write."""
+
+    boards = {
+        "rating": PlaceRanking.rating_score,
+        "trending": PlaceRanking.trend_key,
+    }
+
+    def __init__(self):
+        super().__init__(PlaceRanking)
+
+    @replica_read
+    def top(self, by, limit, options=()):
+        """The ``limit`` best places on a board, as (place, ranking) pairs."""
+        try:
+            column = self.boards[by]
+        except KeyError:
+            raise ValueError(f"Unknown leaderboard: {by}")
+
+        return (
+            db.session.query(Place, PlaceRanking)
+            .join(PlaceRanking, PlaceRanking.place_id == Place.id)
+            .options(*options)
+            .order_by(column.desc(), PlaceRanking.place_id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def record(self, new_reviews, params, chunk_size=500):
+        """Fold review writes into the affected places' rows.
+
+        ``new_reviews`` maps place_id -> created_at of reviews just added
+        (possibly none, when only ratings changed). Rating scores are
+        recomputed from the place aggregates; trend keys absorb the new
+        reviews with one log-add each.
+        """
+        place_ids = list(new_reviews)
+        for start in range(0, len(place_ids), chunk_size):
+            chunk = place_ids[start:start + chunk_size]
+            existing = {
+                row.place_id: row
+                for row in PlaceRanking.query.filter(PlaceRanking.place_id.in_(chunk))
+            }
+            places = db.session.execute(
+                select(Place.id, Place.review_count, Place.rating_sum).where(Place.id.in_(chunk))
+            )
+
+            for place in places:
+                row = existing.get(place.id)
+                key = ranking.trend_key(new_reviews[place.id], params, row.trend_key if row else None)
+                if key is None or not place.review_count:
+                    if row is not None:
+                        db.session.delete(row)
+                    continue
+                if row is None:
+                    row = PlaceRanking(place_id=place.id)
+                    db.session.add(row)
+                row.rating_score = ranking.bayesian_score(place.rating_sum, place.review_count, params)
+                row.trend_key = key
+        db.session.flush()
+
+    def recompute(self, place_ids, params):
+        """Rebuild the rows of a few places from their reviews, e.g. after a delete.
+
+        Trend keys cannot be decremented in log space without losing
+        precision, so the place's review times are re-read (indexed by
+        place_id) and summed again.
+        """
+        place_ids = list(place_ids)
+        times = {place_id: [] for place_id in place_ids}
+        for place_id, created_at in db.session.execute(
+            select(Review.place_id, Review.created_at).where(Review.place_id.in_(place_ids))
+        ):
+            times[place_id].append(created_at)
+
+        db.session.execute(delete(PlaceRanking).where(PlaceRanking.place_id.in_(place_ids)))
+        self.record(times, params)
+
+    def rebuild(self, params):
+        return rebuild_rankings(db.session, params)
+
+    def is_missing(self):
+        """Whether the board is empty although reviews exist (rows loaded behind the facade's back)."""
+        return (
+            db.session.query(PlaceRanking.place_id).first() is None
+            and db.session.query(Review.id).first() is not None
+        )
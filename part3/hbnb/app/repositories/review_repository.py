@@ -1,13 +1,37 @@
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.db.routing import replica_read
 from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
 from app.models.review import Review
 
 
 class ReviewRepository(SQLAlchemyRepository):
+    profiles = {
+        "review_with_author": (joinedload(Review.user),),
+    }
+
     def __init__(self):
         super().__init__(Review)
 
-    def get_by_place_id(self, place_id):
-        return self.model.query.filter_by(place_id=place_id).all()
+    @replica_read
+    def get_page_by_place_id(self, place_id, limit, cursor=None, profile=None):
+        return self.get_page(limit, cursor, self.query(profile).filter_by(place_id=place_id))
 
+    @replica_read
     def get_by_user_and_place(self, user_id, place_id):
         return self.model.query.filter_by(user_id=user_id, place_id=place_id).first()
+
+    @replica_read
+    def get_reviewed_place_ids(self, user_id, place_ids, chunk_size=500):
+        place_ids = list(dict.fromkeys(place_ids))
+        reviewed = set()
+        for start in range(0, len(place_ids), chunk_size):
+            chunk = place_ids[start:start + chunk_size]
+            rows = (
+                db.session.query(self.model.place_id)
+                .filter(self.model.user_id == user_id, self.model.place_id.in_(chunk))
+                .all()
+            )
+            reviewed.update(row.place_id for row in rows)
+        return reviewed
@@ -1,23 +1,239 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, insert, inspect, or_, select
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from app.cache import objects as object_cache
+from app.db.routing import read_primary, read_replica, replica_read
 from app.extensions import db
 
+
+def encode_keyset(values):
+    """Opaque cursor for the sort key of the last row of a page."""
+    payload = json.dumps(list(values))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_keyset(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def encode_cursor(obj):
+    created_at = obj.created_at.isoformat() if obj.created_at is not None else None
+    return encode_keyset([created_at, obj.id])
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, obj_id = decode_keyset(cursor)
+        if created_at is not None:
+            created_at = datetime.fromisoformat(created_at)
+        return created_at, str(obj_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+# loaded by every sparse profile: keyset cursors, fragment keys and
+# Last-Modified headers read them
+ALWAYS_LOADED = frozenset(("id", "created_at", "updated_at"))
+
+
+def sparse_options(model, serialize):
+    """Loader options that load only what a compiled serializer reads.
+
+    Unread columns are deferred; relationships the serializer nests are
+    eager-loaded (and themselves sparse), the others are left alone.
+    """
+    columns = sorted(serialize.columns | ALWAYS_LOADED)
+    options = [load_only(*(getattr(model, name) for name in columns))]
+    relationships = inspect(model).relationships
+    for name, nested in serialize.relationships.items():
+        rel = relationships[name]
+        strategy = selectinload if rel.uselist else joinedload
+        options.append(strategy(getattr(model, name)).options(*sparse_options(rel.mapper.class_, nested)))
+    return tuple(options)
+
+
 class SQLAlchemyRepository:
+    """Generic data access for one model.
+
+    Write methods only flush: committing is the job of the surrounding unit
+    of work (see app.services.unit_of_work), which the facade and every
+    request open.
+    """
+
+    # name -> tuple of loader options; subclasses fill this in
+    profiles = {}
+
+    # serve get_by_id/get_by_key from the object cache (app/cache/objects.py);
+    # cache_keys lists the unique columns get_by_key may be called with
+    cached = False
+    cache_keys = ()
+    # columns never written to the cache (which may be a shared backend);
+    # a cache hit loads them from the database on first access
+    cache_exclude = ()
+
     def __init__(self, model):
         self.model = model
 
+    def loader_options(self, profile=None):
+        """Options for a named profile, or for a compiled serializer used as
+        one (app/serializers.py): then only what it reads is loaded."""
+        if profile is None:
+            return ()
+        if callable(profile):
+            return sparse_options(self.model, profile)
+        try:
+            return self.profiles[profile]
+        except KeyError:
+            raise ValueError(f"Unknown loading profile: {profile}")
+
+    def query(self, profile=None):
+        return self.model.query.options(*self.loader_options(profile))
+
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        db.session.flush()
         return obj
 
-    def get_by_id(self, obj_id):
-        return db.session.get(self.model, obj_id)
+    def add_many(self, rows, chunk_size=1000):
+        """Bulk-insert column dicts in chunks of chunk_size.
+
+        Rows go through an ORM bulk INSERT (executemany) instead of building
+        and flushing one instance per row; column defaults still apply.
+        """
+        rows = list(rows)
+        for start in range(0, len(rows), chunk_size):
+            db.session.execute(insert(self.model), rows[start:start + chunk_size])
+        return len(rows)
+
+    @replica_read
+    def get_by_ids(self, obj_ids, chunk_size=500):
+        obj_ids = list(dict.fromkeys(obj_ids))
+        found = []
+        for start in range(0, len(obj_ids), chunk_size):
+            chunk = obj_ids[start:start + chunk_size]
+            found.extend(self.model.query.filter(self.model.id.in_(chunk)).all())
+        return found
+
+    def _cache(self):
+        cache = object_cache.current_cache() if self.cached else None
+        if cache is None or not cache.enabled_for(self.model.__table__.name):
+            return None
+        return cache
+
+    def _read_through(self, key, load, store=True):
+        """Answer a lookup from the object cache, or run ``load`` and remember the row."""
+        cache = self._cache()
+        if cache is None:
+            return load()
+
+        state = cache.lookup(self.model, key)
+        if state is not None:
+            return object_cache.restore(db.session, self.model, state)
+
+        if not (store and object_cache.can_store(db.session)):
+            return load()
+
+        generation = cache.generation(self.model.__table__.name)
+        # a miss is filled from the primary, never from a lagging replica
+        with read_primary(db.session):
+            obj = load()
+        if obj is not None:
+            cache.store(obj, self.cache_keys, generation, self.cache_exclude)
+        return obj
+
+    @replica_read
+    def get_by_id(self, obj_id, profile=None):
+        """Row by primary key. A cache hit skips the profile's eager loads;
+        relationships then load lazily on first access. Partial rows (a
+        serializer as the profile) are not cached."""
+        return self._read_through(
+            ("id", obj_id),
+            lambda: db.session.get(self.model, obj_id, options=self.loader_options(profile)),
+            store=not callable(profile),
+        )
+
+    @replica_read
+    def get_by_key(self, column, value):
+        """Row by one of the unique columns in ``cache_keys``."""
+        if column not in self.cache_keys:
+            raise ValueError(f"{column} is not a unique key of {self.model.__name__}")
+        return self._read_through(
+            (column, value),
+            lambda: self.model.query.filter_by(**{column: value}).first(),
+        )
+
+    @replica_read
+    def get_all(self, profile=None):
+        return self.query(profile).all()
+
+    def stream(self, profile=None, chunk_size=1000):
+        """Every row in (created_at, id) order, as a generator.
+
+        The ids come off one server-side cursor ``chunk_size`` at a time
+        (yield_per); each chunk of rows is then loaded with the profile's
+        eager loads, so memory stays flat however large the table is.
+        (Eager loads on the yield_per query itself would be simpler, but
+        selectinload of a many-to-many collection cannot run under it.)
+        """
+        ids = (
+            select(self.model.id)
+            .order_by(self.model.created_at, self.model.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        # the whole iteration reads from the replica, not just the first chunk
+        with read_replica(db.session):
+            for chunk in db.session.execute(ids).scalars().partitions():
+                rows = {obj.id: obj for obj in self.query(profile).filter(self.model.id.in_(chunk))}
+                yield from (rows[obj_id] for obj_id in chunk if obj_id in rows)
+
+    @replica_read
+    def get_page(self, limit, cursor=None, query=None, profile=None):
+        """Keyset page ordered by (created_at, id); returns (items, next_cursor)."""
+        if query is None:
+            query = self.query(profile)
+        elif profile is not None:
+            query = query.options(*self.loader_options(profile))
+
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            if created_at is None:
+                # rows without created_at sort first (SQLite orders NULLs low)
+                query = query.filter(or_(
+                    self.model.created_at.is_not(None),
+                    and_(self.model.created_at.is_(None), self.model.id > last_id),
+                ))
+            else:
+                query = query.filter(or_(
+                    self.model.created_at > created_at,
+                    and_(self.model.created_at == created_at, self.model.id > last_id),
+                ))
+
+        items = (
+            query.order_by(self.model.created_at, self.model.id)
+            .limit(limit + 1)
+            .all()
+        )
 
-    def get_all(self):
-        return self.model.query.all()
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1])
+        return items, next_cursor
 
     def update(self):
-        db.session.commit()
+        db.session.flush()
 
     def delete(self, obj):
         db.session.delete(obj)
-        db.session.commit()
+        db.session.flush()
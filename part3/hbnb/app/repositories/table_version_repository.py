@@ -0,0 +1,14 @@
+from app.db.routing import replica_read
+from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
+from app.models.table_version import TableVersion
+
+
+class TableVersionRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(TableVersion)
+
+    @replica_read
+    def get_versions(self, names):
+        """name -> TableVersion for the given tables; tables never written are missing."""
+        rows = self.model.query.filter(self.model.name.in_(list(names))).all()
+        return {row.name: row for row in rows}
@@ -3,8 +3,13 @@ from app.models.user import User
 
 
 class UserRepository(SQLAlchemyRepository):
+    cached = True
+    cache_keys = ("email",)
+    # password hashes stay out of cache backends shared with other processes
+    cache_exclude = ("password",)
+
     def __init__(self):
         super().__init__(User)
 
     def get_by_email(self, email):
-        return self.model.query.filter_by(email=email).first()
+        return self.get_by_key("email", email)
@@ -0,0 +1,178 @@
+"""
+Compiled serializers: one generated function per schema and field set.
+
+A schema lists the JSON fields of a model. ``serializer(name, fields)``
+generates (once, then memoizes) a function that builds the dict with a
+single dict display. Its fast path reads loaded values straight from the
+instance ``__dict__`` instead of going through the ORM attribute
+descriptors; if any value is not loaded (expired column, lazy
+relationship), it falls back to plain attribute access, which loads it.
+"""
+
+import threading
+from collections import namedtuple
+
+
+class Field(namedtuple("Field", "name kind schema default computed")):
+    """One output field.
+
+    kind: "value" (as is), "str" (str()), "datetime" (isoformat or None),
+    "one"/"many" (nested ``schema``), "map" (a dict of columns, ``schema``
+    being its (key, column) pairs). ``default`` replaces None for "value"
+    and in maps. ``computed`` fields (properties) are always read through
+    getattr; ``computed`` lists the columns the property reads.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, name, kind="value", schema=None, default=None, computed=False):
+        return super().__new__(cls, name, kind, schema, default, computed)
+
+
+SCHEMAS = {
+    "user": (
+        Field("id"),
+        Field("email"),
+        Field("first_name"),
+        Field("last_name"),
+        Field("is_admin"),
+        Field("created_at", "datetime"),
+        Field("updated_at", "datetime"),
+    ),
+    "author": (
+        Field("id", "str"),
+        Field("first_name"),
+        Field("last_name"),
+        Field("email"),
+    ),
+    "amenity": (
+        Field("id"),
+        Field("name"),
+        Field("created_at", "datetime"),
+        Field("updated_at", "datetime"),
+    ),
+    "place": (
+        Field("id"),
+        Field("title"),
+        Field("description"),
+        Field("price_per_night"),
+        Field("latitude"),
+        Field("longitude"),
+        Field("owner_id"),
+        Field("created_at", "datetime"),
+        Field("updated_at", "datetime"),
+        Field("review_count", default=0),
+        Field("average_rating", computed=("review_count", "rating_sum")),
+        # Place.rating_histogram, read straight from the rating_N columns
+        Field(
+            "rating_histogram", "map",
+            schema=tuple((str(star), f"rating_{star}") for star in range(1, 6)), default=0,
+        ),
+        Field("amenities", "many", schema=("amenity", ("id", "name"))),
+        Field("reviews", "many", schema=("review", None)),
+    ),
+    "review": (
+        Field("id", "str"),
+        Field("text"),
+        Field("rating"),
+        Field("user_id", "str"),
+        Field("place_id", "str"),
+        Field("created_at", "datetime"),
+        Field("updated_at", "datetime"),
+        Field("user", "one", schema=("author", None)),
+    ),
+}
+
+# fields left out unless asked for by name
+OPTIONAL = {
+    "place": {"reviews"},
+}
+
+_compiled = {}
+_lock = threading.RLock()  # compiling a schema compiles its nested ones
+
+
+def field_names(schema, fields=None):
+    """The requested field names in schema order; None means the defaults."""
+    declared = [field.name for field in SCHEMAS[schema]]
+    if fields is None:
+        return tuple(name for name in declared if name not in OPTIONAL.get(schema, ()))
+    unknown = set(fields) - set(declared)
+    if unknown:
+        raise ValueError(f"Unknown field(s) for {schema}: {', '.join(sorted(unknown))}")
+    return tuple(name for name in declared if name in fields)
+
+
+def _expression(field, fast, env):
+    source = f'd["{field.name}"]' if fast and not field.computed else f"obj.{field.name}"
+    if field.kind == "map":
+        items = (
+            f'"{key}": ' + _expression(Field(column, default=field.default), fast, env)
+            for key, column in field.schema
+        )
+        return "{" + ", ".join(items) + "}"
+    if field.kind == "str":
+        return f"str({source})"
+    if field.kind == "datetime":
+        return f"(_v.isoformat() if (_v := {source}) is not None else None)"
+    if field.kind in ("one", "many"):
+        child = f"_{field.name}"
+        env[child] = serializer(*field.schema)
+        if field.kind == "one":
+            return f"({child}(_v) if (_v := {source}) is not None else None)"
+        return f"[{child}(_x) for _x in ({source} or ())]"
+    if field.default is not None:
+        return f"(_v if (_v := {source}) is not None else {field.default!r})"
+    return source
+
+
+def _compile(schema, names):
+    fields = [field for field in SCHEMAS[schema] if field.name in names]
+    env = {}
+    fast = ", ".join(f'"{f.name}": {_expression(f, True, env)}' for f in fields)
+    slow = ", ".join(f'"{f.name}": {_expression(f, False, env)}' for f in fields)
+    name = f"serialize_{schema}"
+    source = (
+        f"def {name}(obj):\n"
+        f"    d = obj.__dict__\n"
+        f"    try:\n"
+        f"        return {{{fast}}}\n"
+        f"    except KeyError:\n"
+        f"        return {{{slow}}}\n"
+    )
+    exec(compile(source, f"<serializer {schema}:{','.join(names)}>", "exec"), env)
+    function = env[name]
+    function.key = (schema, names)
+    # what the function reads, for loading no more than that (see
+    # SQLAlchemyRepository.loader_options) and for fragment dependencies
+    function.columns = frozenset(_columns(fields))
+    function.relationships = {f.name: env[f"_{f.name}"] for f in fields if f.kind in ("one", "many")}
+    return function
+
+
+def _columns(fields):
+    for field in fields:
+        if field.computed:
+            yield from field.computed
+        elif field.kind == "map":
+            yield from (column for _, column in field.schema)
+        elif field.kind not in ("one", "many"):
+            yield field.name
+
+
+def serializer(schema, fields=None):
+    """The compiled function for ``schema`` restricted to ``fields``."""
+    names = field_names(schema, fields)
+    key = (schema, names)
+    function = _compiled.get(key)
+    if function is None:
+        with _lock:
+            function = _compiled.get(key)
+            if function is None:
+                function = _compiled[key] = _compile(schema, names)
+    return function
+
+
+def serialize_many(schema, objs, fields=None):
+    function = serializer(schema, fields)
+    return [function(obj) for obj in objs]
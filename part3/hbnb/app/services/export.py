@@ -0,0 +1,81 @@
+"""
+Streaming export of whole tables as NDJSON or CSV.
+
+Rows come from facade.stream, which reads them chunk by chunk (yield_per),
+and leave as byte chunks of the same number of rows, so the memory used
+does not grow with the table. Both the export endpoint and the ``flask
+export`` command write these chunks out as they are produced.
+"""
+
+import csv
+import io
+import json
+
+from app.serializers import serializer
+from app.services.facade import facade
+
+# entity -> serializer schema
+ENTITIES = {"places": "place", "reviews": "review", "users": "user"}
+
+# format -> media type
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _ndjson(rows, serialize):
+    for obj in rows:
+        yield json.dumps(serialize(obj), separators=(",", ":"), default=str) + "\n"
+
+
+def _cell(value):
+    # nested values (amenities, authors, histograms) are written as JSON text
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), default=str)
+    return value
+
+
+def _csv(rows, serialize):
+    names = serialize.key[1]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for obj in rows:
+        data = serialize(obj)
+        writer.writerow([_cell(data[name]) for name in names])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # header of an empty table
+        yield buffer.getvalue()
+
+
+_WRITERS = {"ndjson": _ndjson, "csv": _csv}
+
+
+def _chunks(lines, size):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield "".join(batch).encode("utf-8")
+            batch = []
+    if batch:
+        yield "".join(batch).encode("utf-8")
+
+
+def export(entity, fmt, serialize=None, chunk_size=1000):
+    """The rows of ``entity`` in ``fmt``, as a generator of byte chunks.
+
+    ``serialize`` is a compiled serializer for the entity's schema (a
+    sparse field set); it defaults to all fields. Bad arguments raise
+    ValueError here, before anything is read.
+    """
+    if entity not in ENTITIES:
+        raise ValueError(f"Unknown entity: {entity}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (expected {' or '.join(FORMATS)})")
+    if serialize is None:
+        serialize = serializer(ENTITIES[entity])
+
+    rows = facade.stream(entity, profile=serialize, chunk_size=chunk_size)
+    return _chunks(_WRITERS[fmt](rows, serialize), chunk_size)
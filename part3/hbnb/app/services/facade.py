@@ -1,14 +1,22 @@
-from app.extensions import db
+import uuid
+from datetime import datetime
+
+from flask import current_app
 
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
+from app.models import ranking
 
 from app.repositories.user_repository import UserRepository
 from app.repositories.place_repository import PlaceRepository
 from app.repositories.review_repository import ReviewRepository
 from app.repositories.amenity_repository import AmenityRepository
+from app.repositories.ranking_repository import LeaderboardRepository
+from app.repositories.table_version_repository import TableVersionRepository
+from app.services.singleflight import coalesced
+from app.services.unit_of_work import transactional
 
 
 class HBnBFacade:
@@ -17,9 +25,26 @@ class HBnBFacade:
         self.place_repo = PlaceRepository()
         self.review_repo = ReviewRepository()
         self.amenity_repo = AmenityRepository()
+        self.leaderboard_repo = LeaderboardRepository()
+        self.version_repo = TableVersionRepository()
+
+    # ===================== VERSIONS =====================
+
+    def get_tables_version(self, names):
+        """(version tag, last modified) of a set of tables, for cache validation.
+
+        The tag changes whenever any of the tables is written; last modified
+        is the latest of their write times, or None if none was written yet.
+        """
+        names = sorted(names)
+        rows = self.version_repo.get_versions(names)
+        tag = ".".join(str(rows[n].version) if n in rows else "0" for n in names)
+        stamps = [row.updated_at for row in rows.values() if row.updated_at]
+        return tag, max(stamps) if stamps else None
 
     # ===================== USERS =====================
 
+    @transactional
     def create_user(self, email, password, first_name=None, last_name=None, is_admin=False):
         if not email or not password:
             raise ValueError("Email and password are required")
@@ -37,18 +62,38 @@ class HBnBFacade:
         user.set_password(password)
         return self.user_repo.add(user)
 
+    def authenticate(self, email, password):
+        """The user with these credentials, or None.
+
+        A password stored at another cost than BCRYPT_LOG_ROUNDS is rehashed
+        at the configured cost while we have it in clear.
+        """
+        user = self.user_repo.get_by_email(email)
+        if user is None or not user.check_password(password):
+            return None
+        if user.password_needs_rehash():
+            self._rehash_password(user, password)
+        return user
+
+    @transactional
+    def _rehash_password(self, user, password):
+        user.set_password(password)
+        self.user_repo.update()
+
+    def get_users_page(self, limit, cursor=None, profile=None):
+        return self.user_repo.get_page(limit, cursor, profile=profile)
+
     # ===================== PLACES =====================
 
-    def create_place(self, place_data: dict):
-        title = (place_data.get("title") or "").strip()
+    def _place_fields(self, place_data: dict, owner_id):
+        title = place_data.get("title") or ""
+        description = place_data.get("description") or ""
+        if not isinstance(title, str) or not isinstance(description, str):
+            raise ValueError("Title and description must be strings")
+        title = title.strip()
         if not title:
             raise ValueError("Title is required")
 
-        owner_id = place_data.get("owner_id")
-        owner = self.user_repo.get_by_id(owner_id)
-        if not owner:
-            raise ValueError("Owner not found")
-
         lat = place_data.get("latitude")
         lon = place_data.get("longitude")
 
@@ -61,32 +106,122 @@ class HBnBFacade:
         except (TypeError, ValueError):
             raise ValueError("Latitude and longitude must be valid numbers")
 
+        self._check_coordinates(lat, lon)
+
+        try:
+            price = float(place_data.get("price_per_night") or 0.0)
+        except (TypeError, ValueError):
+            raise ValueError("Price per night must be a valid number")
+
+        return {
+            "title": title,
+            "description": description,
+            "price_per_night": price,
+            "latitude": lat,
+            "longitude": lon,
+            "owner_id": owner_id,
+        }
+
+    @transactional
+    def create_place(self, place_data: dict):
+        owner_id = place_data.get("owner_id")
+        owner = self.user_repo.get_by_id(owner_id)
+        if not owner:
+            raise ValueError("Owner not found")
+
+        place = Place(**self._place_fields(place_data, owner_id))
+        return self.place_repo.add(place)
+
+    @transactional
+    def create_places(self, items, owner_id):
+        """Validate and insert many places for one owner in a single transaction.
+
+        Returns one result per input item, in order: ``{"index", "id"}`` for
+        created places and ``{"index", "error"}`` for rejected ones.
+        """
+        owner = self.user_repo.get_by_id(owner_id)
+        if not owner:
+            raise ValueError("Owner not found")
+
+        results = []
+        rows = []
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Item must be an object")
+                row = self._place_fields(item, owner_id)
+            except ValueError as e:
+                results.append({"index": index, "error": str(e)})
+                continue
+
+            row["id"] = str(uuid.uuid4())
+            rows.append(row)
+            results.append({"index": index, "id": row["id"]})
+
+        self.place_repo.add_many(rows)
+        return results
+
+    def get_all_places(self, profile=None):
+        return self.place_repo.get_all(profile)
+
+    def _check_place_filters(self, min_price, max_price):
+        if min_price is not None and min_price < 0:
+            raise ValueError("min_price must not be negative")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price must not exceed max_price")
+
+    def get_places_page(self, limit, cursor=None, profile=None, bbox=None,
+                        min_price=None, max_price=None, amenity_ids=None):
+        """Keyset page of places, optionally inside bbox (min_lon, min_lat, max_lon, max_lat)
+        and filtered by price range and required amenities."""
+        self._check_place_filters(min_price, max_price)
+
+        box = None
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            self._check_coordinates(min_lat, min_lon)
+            self._check_coordinates(max_lat, max_lon)
+            if min_lat > max_lat:
+                raise ValueError("bbox minimum latitude is above its maximum")
+            box = (min_lat, min_lon, max_lat, max_lon)
+
+        query = self.place_repo.listing_query(profile, box, min_price, max_price, amenity_ids)
+        return self.place_repo.get_page(limit, cursor, query)
+
+    def search_places(self, text, limit, cursor=None, profile=None,
+                      min_price=None, max_price=None, amenity_ids=None):
+        self._check_place_filters(min_price, max_price)
+        return self.place_repo.search_page(
+            text, limit, cursor, profile, min_price, max_price, amenity_ids,
+        )
+
+    def _check_coordinates(self, lat, lon):
         if not (-90 <= lat <= 90):
             raise ValueError("Latitude must be between -90 and 90")
         if not (-180 <= lon <= 180):
             raise ValueError("Longitude must be between -180 and 180")
 
-        place = Place(
-            title=title,
-            description=(place_data.get("description") or ""),
-            price_per_night=float(place_data.get("price_per_night") or 0.0),
-            latitude=lat,
-            longitude=lon,
-            owner_id=owner_id,
+    def get_places_near(self, lat, lon, radius_km, limit, profile=None,
+                        min_price=None, max_price=None, amenity_ids=None):
+        self._check_coordinates(lat, lon)
+        if not (0 < radius_km <= current_app.config.get("GEO_MAX_RADIUS_KM", 1000)):
+            raise ValueError("radius_km out of range")
+        self._check_place_filters(min_price, max_price)
+        return self.place_repo.get_near(
+            lat, lon, radius_km, limit, profile, min_price, max_price, amenity_ids
         )
 
-        return self.place_repo.add(place)
-
-    def get_all_places(self):
-        return self.place_repo.get_all()
-
-    def get_place(self, place_id):
-        return self.place_repo.get_by_id(place_id)
+    @coalesced
+    def get_place(self, place_id, profile=None):
+        return self.place_repo.get_by_id(place_id, profile)
 
     # ===================== REVIEWS =====================
 
-    def create_review(self, review_data: dict):
-        text = (review_data.get("text") or "").strip()
+    def _validate_review_fields(self, review_data: dict):
+        text = review_data.get("text") or ""
+        if not isinstance(text, str):
+            raise ValueError("Review text must be a string")
+        text = text.strip()
         if not text:
             raise ValueError("Review text is required")
 
@@ -99,6 +234,12 @@ class HBnBFacade:
         if not (1 <= rating_int <= 5):
             raise ValueError("Rating must be between 1 and 5")
 
+        return text, rating_int
+
+    @transactional
+    def create_review(self, review_data: dict):
+        text, rating_int = self._validate_review_fields(review_data)
+
         user_id = review_data.get("user_id")
         place_id = review_data.get("place_id")
 
@@ -127,23 +268,157 @@ class HBnBFacade:
             place_id=place_id
         )
 
-        return self.review_repo.add(review)
+        self.review_repo.add(review)
+        self.place_repo.adjust_ratings({place_id: {rating_int: 1}})
+        self.leaderboard_repo.record({place_id: [review.created_at]}, self._ranking_params())
+        return review
+
+    @transactional
+    def create_reviews(self, items, user_id):
+        """Validate and insert many reviews by one user in a single transaction.
+
+        Places and already-reviewed places are fetched in bulk up front, so
+        validation costs a handful of queries rather than several per item.
+        Results follow the same shape as ``create_places``.
+        """
+        user = self.user_repo.get_by_id(user_id)
+        if not user:
+            raise ValueError("User not found")
+
+        place_ids = [item.get("place_id") for item in items if isinstance(item, dict)]
+        places = {p.id: p for p in self.place_repo.get_by_ids(p for p in place_ids if p and isinstance(p, str))}
+        reviewed = self.review_repo.get_reviewed_place_ids(user_id, places.keys())
+
+        results = []
+        rows = []
+        now = datetime.utcnow()
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Item must be an object")
+                text, rating_int = self._validate_review_fields(item)
+
+                place_id = item.get("place_id")
+                place = places.get(place_id) if isinstance(place_id, str) else None
+                if not place:
+                    raise ValueError("Place not found")
+                if place.owner_id == user_id:
+                    raise ValueError("You cannot review your own place")
+                if place.id in reviewed:
+                    raise ValueError("You have already reviewed this place")
+            except ValueError as e:
+                results.append({"index": index, "error": str(e)})
+                continue
+
+            row = {
+                "id": str(uuid.uuid4()),
+                "text": text,
+                "rating": rating_int,
+                "user_id": user_id,
+                "place_id": place.id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            reviewed.add(place.id)
+            rows.append(row)
+            results.append({"index": index, "id": row["id"]})
+
+        self.review_repo.add_many(rows)
+
+        changes = {}
+        for row in rows:
+            ratings = changes.setdefault(row["place_id"], {})
+            ratings[row["rating"]] = ratings.get(row["rating"], 0) + 1
+        self.place_repo.adjust_ratings(changes)
+        self.leaderboard_repo.record(
+            {place_id: [now] * sum(ratings.values()) for place_id, ratings in changes.items()},
+            self._ranking_params(),
+        )
+        return results
+
+    def get_all_reviews(self, profile=None):
+        return self.review_repo.get_all(profile)
 
-    def get_all_reviews(self):
-        return self.review_repo.get_all()
+    @coalesced
+    def get_reviews_page(self, limit, cursor=None, place_id=None, profile=None):
+        if place_id is None:
+            return self.review_repo.get_page(limit, cursor, profile=profile)
 
-    def get_reviews_by_place(self, place_id):
         place = self.place_repo.get_by_id(place_id)
         if not place:
             raise ValueError("Place not found")
 
-        return self.review_repo.get_by_place_id(place_id)
-
-    def get_review(self, review_id):
-        return self.review_repo.get_by_id(review_id)
+        return self.review_repo.get_page_by_place_id(place_id, limit, cursor, profile)
+
+    def get_review(self, review_id, profile=None):
+        return self.review_repo.get_by_id(review_id, profile)
+
+    @transactional
+    def update_review(self, review_id, data: dict):
+        review = self.review_repo.get_by_id(review_id)
+        if not review:
+            raise ValueError("Review not found")
+
+        text, rating_int = self._validate_review_fields({
+            "text": data["text"] if data.get("text") is not None else review.text,
+            "rating": data["rating"] if data.get("rating") is not None else review.rating,
+        })
+
+        old_rating = review.rating
+        review.text = text
+        review.rating = rating_int
+        self.review_repo.update()
+
+        if rating_int != old_rating:
+            self.place_repo.adjust_ratings({review.place_id: {old_rating: -1, rating_int: 1}})
+            self.leaderboard_repo.record({review.place_id: []}, self._ranking_params())
+        return review
+
+    @transactional
+    def delete_review(self, review_id):
+        review = self.review_repo.get_by_id(review_id)
+        if not review:
+            raise ValueError("Review not found")
+
+        place_id, rating = review.place_id, review.rating
+        self.review_repo.delete(review)
+        self.place_repo.adjust_ratings({place_id: {rating: -1}})
+        self.leaderboard_repo.recompute([place_id], self._ranking_params())
+
+    @transactional
+    def repair_rating_aggregates(self):
+        """Recompute every place's rating aggregates; returns how many were wrong."""
+        return self.place_repo.repair_ratings()
+
+    # ===================== LEADERBOARD =====================
+
+    def _ranking_params(self):
+        return ranking.RankingParams.from_config(current_app.config)
+
+    def get_top_places(self, by, limit, profile=None):
+        """Best places on the "rating" or "trending" board as (place, score) pairs."""
+        params = self._ranking_params()
+        top = self.leaderboard_repo.top(by, limit, self.place_repo.loader_options(profile))
+        if by == "trending":
+            now = datetime.utcnow()
+            return [(place, ranking.trend_weight(row.trend_key, params, now)) for place, row in top]
+        return [(place, row.rating_score) for place, row in top]
+
+    @transactional
+    def refresh_leaderboard(self):
+        """Rebuild the leaderboard from scratch; returns how many places are ranked."""
+        return self.leaderboard_repo.rebuild(self._ranking_params())
+
+    @transactional
+    def repair_leaderboard(self):
+        """Rebuild the leaderboard if it is empty although reviews exist; returns how many places were ranked."""
+        if not self.leaderboard_repo.is_missing():
+            return 0
+        return self.leaderboard_repo.rebuild(self._ranking_params())
 
     # ===================== AMENITIES =====================
 
+    @transactional
     def create_amenity(self, amenity_data: dict):
         name = (amenity_data.get("name") or "").strip()
         if not name:
@@ -156,12 +431,14 @@ class HBnBFacade:
         amenity = Amenity(name=name)
         return self.amenity_repo.add(amenity)
 
-    def get_all_amenities(self):
-        return self.amenity_repo.get_all()
+    @coalesced
+    def get_amenities_page(self, limit, cursor=None, profile=None):
+        return self.amenity_repo.get_page(limit, cursor, profile=profile)
 
-    def get_amenity(self, amenity_id):
-        return self.amenity_repo.get_by_id(amenity_id)
+    def get_amenity(self, amenity_id, profile=None):
+        return self.amenity_repo.get_by_id(amenity_id, profile)
 
+    @transactional
     def update_amenity(self, amenity_id, data: dict):
         amenity = self.amenity_repo.get_by_id(amenity_id)
         if not amenity:
@@ -179,8 +456,17 @@ class HBnBFacade:
 
             amenity.name = name
 
-        db.session.commit()
+        self.amenity_repo.update()
         return amenity
 
+    # ===================== EXPORT =====================
+
+    def stream(self, entity, profile=None, chunk_size=1000):
+        """Every row of ``entity`` (places, reviews or users), fetched chunk by chunk."""
+        repos = {"places": self.place_repo, "reviews": self.review_repo, "users": self.user_repo}
+        if entity not in repos:
+            raise ValueError(f"Unknown entity: {entity}")
+        return repos[entity].stream(profile, chunk_size)
+
 
 facade = HBnBFacade()
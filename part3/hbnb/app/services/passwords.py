@@ -0,0 +1,112 @@
+"""
+bcrypt hashing off the request thread, in a bounded process pool.
+
+A hash at the default cost takes a quarter of a second of CPU. Done inline,
+a burst of logins occupies every request thread at once; here at most
+BCRYPT_POOL_SIZE hashes run at a time (one per process), at most
+BCRYPT_MAX_PENDING more wait for a process (4 per process by default), and
+a request finding those all taken waits BCRYPT_BUSY_TIMEOUT seconds for a
+place, then is refused with HasherBusy instead of queueing without bound.
+With a pool size of 0 hashing runs inline.
+
+The pool runs bcrypt's own functions, so its processes never import the
+application. It is created on first use in each process, after any fork
+of the server's workers.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from flask import current_app, has_app_context
+
+EXTENSION = "password_hasher"
+
+
+class HasherBusy(RuntimeError):
+    """Too many password hashes are already waiting for the pool."""
+
+
+def hash_cost(pw_hash):
+    """The log2 rounds a bcrypt hash was made with ("$2b$12$..." -> 12)."""
+    try:
+        return int(pw_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, rounds=12, prefix="2b", pool_size=0, max_pending=None, timeout=1.0):
+        self.rounds = rounds
+        self.prefix = prefix.encode("ascii")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(
+            pool_size + (max_pending if max_pending is not None else 4 * pool_size)
+        ) if pool_size else None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # forkserver: workers start from a clean process, not a copy of
+                # this (threaded) one
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._executor = ProcessPoolExecutor(self.pool_size, mp_context=context)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self.pool_size:
+            return func(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy("Too many password checks in progress, try again shortly")
+        try:
+            return self._pool().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        salt = bcrypt.gensalt(rounds=self.rounds, prefix=self.prefix)
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def check(self, pw_hash, password):
+        if not pw_hash or not password:
+            return False
+        return self._run(bcrypt.checkpw, password.encode("utf-8"), pw_hash.encode("utf-8"))
+
+    def needs_rehash(self, pw_hash):
+        return hash_cost(pw_hash) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_inline = PasswordHasher()
+
+
+def current_hasher():
+    """The application's hasher; outside an application, inline at the default cost."""
+    if has_app_context():
+        hasher = current_app.extensions.get(EXTENSION)
+        if hasher is not None:
+            return hasher
+    return _inline
+
+
+def init_app(app):
+    app.extensions[EXTENSION] = PasswordHasher(
+        rounds=int(app.config.get("BCRYPT_LOG_ROUNDS", 12)),
+        prefix=app.config.get("BCRYPT_HASH_PREFIX", "2b"),
+        pool_size=int(app.config.get("BCRYPT_POOL_SIZE", 0)),
+        max_pending=app.config.get("BCRYPT_MAX_PENDING"),
+        timeout=float(app.config.get("BCRYPT_BUSY_TIMEOUT", 1.0)),
+    )
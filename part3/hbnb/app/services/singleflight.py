@@ -0,0 +1,185 @@
+"""
+Single-flight coalescing of facade reads.
+
+Concurrent identical calls of a ``@coalesced`` facade method run it once:
+the first caller (the leader) executes it, the others wait and get the
+same result. ORM objects belong to the leader's session, so when anyone
+waited the leader freezes what it loaded (columns and loaded relationships,
+no new queries) and each follower rebuilds it as clean persistent objects
+in its own session.
+
+A flight only takes new followers until the next commit in this process,
+so a request never joins a read that started before a write it has seen
+committed. Sessions that have written (see app.db.routing.is_pinned) never
+coalesce: they must read their own writes.
+"""
+
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.routing import is_pinned
+from app.extensions import db
+
+EXTENSION = "singleflight"
+
+
+class _Frozen:
+    __slots__ = ("model", "identity", "columns", "relationships")
+
+    def __init__(self, model, identity, columns, relationships):
+        self.model, self.identity = model, identity
+        self.columns, self.relationships = columns, relationships
+
+
+def freeze(value, memo=None):
+    """Copy the loaded state of ORM objects (in lists/tuples) into plain data."""
+    memo = {} if memo is None else memo
+    if isinstance(value, (list, tuple)):
+        return type(value)(freeze(item, memo) for item in value)
+    if not hasattr(value, "__mapper__"):
+        return value
+
+    state = inspect(value)
+    if state.key in memo:
+        return memo[state.key]
+    loaded = state.dict
+    frozen = _Frozen(
+        state.mapper.class_, state.key,
+        {attr.key: loaded[attr.key] for attr in state.mapper.column_attrs if attr.key in loaded},
+        {},
+    )
+    memo[state.key] = frozen
+    for rel in state.mapper.relationships:
+        if rel.key in loaded:
+            related = loaded[rel.key]
+            frozen.relationships[rel.key] = freeze(list(related) if rel.uselist else related, memo)
+    return frozen
+
+
+def thaw(session, value, memo=None):
+    """Rebuild frozen objects in ``session``; objects it already has are used as they are."""
+    memo = {} if memo is None else memo
+    if isinstance(value, (list, tuple)):
+        return type(value)(thaw(session, item, memo) for item in value)
+    if not isinstance(value, _Frozen):
+        return value
+    if value.identity in memo:
+        return memo[value.identity]
+
+    existing = session.identity_map.get(value.identity)
+    if existing is not None:
+        memo[value.identity] = existing
+        return existing
+
+    obj = value.model.__mapper__.class_manager.new_instance()
+    memo[value.identity] = obj
+    for key, column in value.columns.items():
+        set_committed_value(obj, key, column)
+    make_transient_to_detached(obj)
+    session.add(obj)
+    for key, related in value.relationships.items():
+        set_committed_value(obj, key, thaw(session, related, memo))
+    return obj
+
+
+class _Flight:
+    def __init__(self, epoch):
+        self.epoch = epoch
+        self.followers = 0
+        self.done = threading.Event()
+        self.result = self.error = None
+
+
+class SingleFlight:
+    """In-flight calls of one application, with per-method counters."""
+
+    # a follower gives up waiting and runs the call itself after this long
+    timeout = 30.0
+
+    def __init__(self):
+        self.epoch = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {"calls": 0, "executions": 0, "coalesced": 0})
+
+    def bump(self):
+        with self._lock:
+            self.epoch += 1
+
+    def run(self, name, key, compute):
+        with self._lock:
+            counters = self._counters[name]
+            counters["calls"] += 1
+            flight = self._flights.get(key)
+            leading = flight is None or flight.epoch != self.epoch
+            if leading:
+                flight = self._flights[key] = _Flight(self.epoch)
+                counters["executions"] += 1
+            else:
+                flight.followers += 1
+                counters["coalesced"] += 1
+
+        if not leading:
+            if not flight.done.wait(self.timeout):
+                return compute()
+            if flight.error is not None:
+                raise flight.error
+            return thaw(db.session, flight.result)
+
+        try:
+            result = compute()
+        except Exception as e:
+            self._land(key, flight)
+            flight.error = e
+            flight.done.set()
+            raise
+        if self._land(key, flight):
+            flight.result = freeze(result)
+        flight.done.set()
+        return result
+
+    def _land(self, key, flight):
+        """Stop taking followers; returns how many joined."""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            return flight.followers
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(counters) for name, counters in sorted(self._counters.items())}
+
+
+def current_flights():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION)
+
+
+def coalesced(func):
+    """Coalesce concurrent identical calls of a facade read method."""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        flights = current_flights()
+        if flights is None or is_pinned(db.session):
+            return func(self, *args, **kwargs)
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        return flights.run(func.__name__, key, lambda: func(self, *args, **kwargs))
+    return wrapper
+
+
+def init_app(app):
+    app.extensions[EXTENSION] = SingleFlight() if app.config.get("SINGLE_FLIGHT_ENABLED", True) else None
+
+
+@event.listens_for(Session, "after_commit")
+def _close_flights(session):
+    flights = current_flights()
+    if flights is not None:
+        flights.bump()
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db.routing import pin_primary
+from app.extensions import db
+
+_DEPTH = "uow_depth"
+_WRITES = "uow_writes"
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session, flush_context):
+    session.info[_WRITES] = True
+    pin_primary(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WRITES] = True
+        pin_primary(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_writes(session):
+    session.info.pop(_WRITES, None)
+
+
+def has_pending_writes(session=None):
+    """True once the current transaction has flushed or bulk-executed a write."""
+    session = session if session is not None else db.session
+    return bool(session.info.get(_WRITES))
+
+
+def _begin():
+    info = db.session.info
+    info[_DEPTH] = info.get(_DEPTH, 0) + 1
+
+
+def _end(success):
+    """Leave one level; the outermost level commits or rolls back."""
+    info = db.session.info
+    depth = info.get(_DEPTH, 1) - 1
+    info[_DEPTH] = depth
+    if depth > 0:
+        return
+
+    writes = info.pop(_WRITES, False)
+    if success and writes:
+        db.session.commit()
+    elif writes:
+        db.session.rollback()
+
+
+@contextmanager
+def unit_of_work():
+    """Group repository writes into one transaction.
+
+    Repositories only flush; the outermost unit commits once when the block
+    succeeds and rolls back if it raises. Nested units join the outer one.
+    Reads inside a unit are pinned to the primary database.
+    """
+    pin_primary(db.session)
+    _begin()
+    try:
+        yield db.session
+    except BaseException:
+        _end(success=False)
+        raise
+    _end(success=True)
+
+
+def transactional(func):
+    """Run a facade method inside a unit of work."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with unit_of_work():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def init_app(app):
+    """Make every request one unit of work, committed when the response is a success."""
+    @app.before_request
+    def _begin_request_unit():
+        _begin()
+
+    @app.after_request
+    def _end_request_unit(response):
+        _end(success=response.status_code < 400)
+        return response
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Login throughput, and the latency of other requests, during a login burst.
+
+Serves the app from a threaded WSGI server on a file-backed database, has
+--concurrency clients log in as fast as they can for --seconds, and
+meanwhile times a cheap GET from one more client. Runs once with hashing
+inline (BCRYPT_POOL_SIZE=0) and once per --pool size.
+
+    python3 benchmarks/login_bench.py --concurrency 16 --pool 2 4
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from config import DevelopmentConfig
+
+
+def request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body else None,
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def run(tmpdir, pool_size, users, concurrency, seconds, rounds):
+    class BenchConfig(DevelopmentConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmpdir, f'login{pool_size}.db')}"
+        BCRYPT_LOG_ROUNDS = rounds
+        BCRYPT_POOL_SIZE = pool_size
+        BCRYPT_MAX_PENDING = concurrency
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        for i in range(users):
+            user = User(email=f"bench{i}@hbnb.io")
+            user.set_password("benchpass")
+            db.session.add(user)
+        db.session.commit()
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stop = threading.Event()
+    logins, failures, other = [], [], []
+
+    def login_client(n):
+        i = n
+        while not stop.is_set():
+            status = request(port, "POST", "/api/v1/auth/login",
+                             {"email": f"bench{i % users}@hbnb.io", "password": "benchpass"})
+            (logins if status == 200 else failures).append(status)
+            i += concurrency
+
+    def other_client():
+        while not stop.is_set():
+            started = time.perf_counter()
+            request(port, "GET", "/api/v1/amenities/")
+            other.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_client, args=(n,)) for n in range(concurrency)]
+    threads.append(threading.Thread(target=other_client))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+    app.extensions["password_hasher"].shutdown()
+    with app.app_context():
+        db.engine.dispose()
+
+    p95 = statistics.quantiles(other, n=20)[-1] if len(other) > 1 else float("nan")
+    return len(logins) / seconds, len(failures), statistics.median(other), p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--pool", type=int, nargs="*", default=[os.cpu_count() or 1])
+    args = parser.parse_args()
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    print(f"{'pool':<8}{'logins/s':>10}{'refused':>9}{'GET p50 ms':>12}{'GET p95 ms':>12}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for pool_size in [0, *args.pool]:
+            rate, refused, p50, p95 = run(
+                tmpdir, pool_size, args.users, args.concurrency, args.seconds, args.rounds
+            )
+            print(f"{pool_size or 'inline':<8}{rate:>10.1f}{refused:>9}{p50:>12.1f}{p95:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
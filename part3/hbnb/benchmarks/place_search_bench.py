@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Latency of full-text place search on a large file-backed database.
+
+Loads --places synthetic listings through the bulk insert path (so the
+FTS5 index is built as in production), then times a first page and the page after
+it for queries ranging from a word in most listings to a rare one.
+
+    python3 benchmarks/place_search_bench.py --places 1000000 --repeat 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.services.facade import facade
+from config import DevelopmentConfig
+
+# a Zipf-like vocabulary of pseudo-words: the first words appear in most
+# listings, the tail in only a handful, so the queries span both extremes
+_rng = random.Random(7)
+VOCABULARY = list(dict.fromkeys(
+    "".join(_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_rng.randint(4, 10)))
+    for _ in range(5200)
+))[:5000]
+WEIGHTS = [1 / (i + 1) for i in range(len(VOCABULARY))]
+
+QUERIES = (
+    VOCABULARY[0],
+    f"{VOCABULARY[1]} {VOCABULARY[2]}",
+    VOCABULARY[3][:3],
+    VOCABULARY[50],
+    f"{VOCABULARY[20]} {VOCABULARY[800][:4]}",
+    VOCABULARY[4999],
+)
+
+
+def load(app, count, chunk_size=10000):
+    rng = random.Random(42)
+    with app.app_context():
+        db.create_all()
+        owner = User(email="bench@hbnb.io", password="x")
+        db.session.add(owner)
+        db.session.commit()
+        owner_id = owner.id
+
+        for start in range(0, count, chunk_size):
+            rows = [
+                {
+                    "title": " ".join(rng.choices(VOCABULARY, WEIGHTS, k=3)),
+                    "description": " ".join(rng.choices(VOCABULARY, WEIGHTS, k=20)),
+                    "price_per_night": float(rng.randint(10, 500)),
+                    "latitude": rng.uniform(-60, 60),
+                    "longitude": rng.uniform(-180, 180),
+                    "owner_id": owner_id,
+                }
+                for _ in range(min(chunk_size, count - start))
+            ]
+            facade.create_places(rows, owner_id)
+
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        class BenchConfig(DevelopmentConfig):
+            DEBUG = False
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmpdir, 'search.db')}"
+            SQLITE_PROFILE = "production"
+
+        app = create_app(BenchConfig)
+
+        started = time.perf_counter()
+        load(app, args.places)
+        print(f"loaded {args.places} places in {time.perf_counter() - started:.1f}s")
+
+        print(f"{'query':<28}{'first page ms':>15}{'next page ms':>15}")
+        with app.app_context():
+            for query in QUERIES:
+                _, cursor = facade.search_places(query, args.limit, profile="card")
+                first = time_ms(lambda: facade.search_places(query, args.limit, profile="card"), args.repeat)
+                following = time_ms(
+                    lambda: facade.search_places(query, args.limit, cursor, profile="card"), args.repeat
+                )
+                print(f"{query:<28}{first:>15.2f}{following:>15.2f}")
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
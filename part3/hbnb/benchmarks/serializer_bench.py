@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Per-row cost of the compiled serializers against the code they replaced.
+
+Loads --places listings (each with a few amenities) and --reviews reviews,
+then serializes the loaded rows repeatedly with the previous hand-written
+to_dict() bodies, with flask-restx marshalling (the users endpoints'
+previous path) and with app.serializers. Nothing is queried while timing.
+
+    python3 benchmarks/serializer_bench.py --places 2000 --repeat 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_restx import fields, marshal
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.serializers import serializer
+from app.services.facade import facade
+from config import DevelopmentConfig
+
+USER_FIELDS = {
+    "id": fields.String,
+    "email": fields.String,
+    "first_name": fields.String,
+    "last_name": fields.String,
+    "is_admin": fields.Boolean,
+}
+
+
+def place_to_dict(self):
+    """Place.to_dict() before app.serializers."""
+    return {
+        "id": self.id,
+        "title": self.title,
+        "description": self.description,
+        "price_per_night": self.price_per_night,
+        "latitude": self.latitude,
+        "longitude": self.longitude,
+        "owner_id": self.owner_id,
+        "created_at": self.created_at.isoformat() if self.created_at else None,
+        "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        "review_count": self.review_count or 0,
+        "average_rating": self.average_rating,
+        "rating_histogram": self.rating_histogram,
+        "amenities": [{"id": a.id, "name": a.name} for a in (self.amenities or [])],
+    }
+
+
+def review_to_dict(self):
+    """Review.to_dict() before app.serializers."""
+    return {
+        "id": str(self.id),
+        "text": self.text,
+        "rating": self.rating,
+        "user_id": str(self.user_id),
+        "place_id": str(self.place_id),
+        "created_at": self.created_at.isoformat() if self.created_at else None,
+        "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        "user": {
+            "id": str(self.user.id),
+            "first_name": self.user.first_name,
+            "last_name": self.user.last_name,
+            "email": self.user.email,
+        },
+    }
+
+
+def load(app, places, reviews):
+    rng = random.Random(42)
+    with app.app_context():
+        db.create_all()
+        users = [User(email=f"bench{i}@hbnb.io", password="x", first_name="Bench", last_name=str(i))
+                 for i in range(20)]
+        amenities = [Amenity(name=f"amenity {i}") for i in range(10)]
+        db.session.add_all(users + amenities)
+        db.session.commit()
+
+        facade.create_places([
+            {
+                "title": f"Place {i}",
+                "description": "A synthetic listing " * 4,
+                "price_per_night": float(rng.randint(10, 500)),
+                "latitude": rng.uniform(-60, 60),
+                "longitude": rng.uniform(-180, 180),
+            }
+            for i in range(places)
+        ], users[0].id)
+
+        rows = Place.query.all()
+        for place in rows:
+            place.amenities = rng.sample(amenities, 3)
+        # one review per (user, place) at most
+        pairs = rng.sample(range(len(users) * len(rows)), min(reviews, len(users) * len(rows)))
+        db.session.add_all(
+            Review(text="Nice stay", rating=rng.randint(1, 5),
+                   user_id=users[pair % len(users)].id, place_id=rows[pair // len(users)].id)
+            for pair in pairs
+        )
+        db.session.commit()
+
+
+def per_row_us(fn, rows, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            fn(row)
+        samples.append((time.perf_counter() - started) / len(rows) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        class BenchConfig(DevelopmentConfig):
+            DEBUG = False
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmpdir, 'serializers.db')}"
+
+        app = create_app(BenchConfig)
+        load(app, args.places, args.reviews)
+
+        with app.app_context():
+            places = facade.place_repo.get_page(args.places, profile="card")[0]
+            reviews = Review.query.options(db.joinedload(Review.user)).all()
+            users = User.query.all()
+
+            cases = (
+                ("place", places, place_to_dict, serializer("place")),
+                ("review", reviews, review_to_dict, serializer("review")),
+                ("user", users, lambda user: marshal(user, USER_FIELDS), serializer("user", tuple(USER_FIELDS))),
+            )
+            print(f"{'schema':<10}{'rows':>8}{'previous us/row':>18}{'compiled us/row':>18}{'speedup':>10}")
+            for name, rows, previous, compiled in cases:
+                assert previous(rows[0]) == compiled(rows[0]), name
+                before = per_row_us(previous, rows, args.repeat)
+                after = per_row_us(compiled, rows, args.repeat)
+                print(f"{name:<10}{len(rows):>8}{before:>18.2f}{after:>18.2f}{before / after:>9.1f}x")
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
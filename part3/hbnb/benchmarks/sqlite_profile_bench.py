@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write throughput of each SQLite engine profile.
+
+Readers page through places while writers create places, all through the
+facade on a file-backed database, for a fixed amount of time per profile.
+
+    python3 benchmarks/sqlite_profile_bench.py --seconds 5 --readers 6 --writers 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.db.sqlite import SQLITE_PROFILES
+from app.extensions import db
+from app.models.place import Place
+from app.models.user import User
+from app.services.facade import facade
+from config import DevelopmentConfig
+
+
+def run_profile(profile, seconds, readers, writers, tmpdir):
+    path = os.path.join(tmpdir, f"{profile}.db")
+
+    class BenchConfig(DevelopmentConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLITE_PROFILE = profile
+        DB_POOL_SIZE = readers + writers
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        owner = User(email="bench@hbnb.io", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        db.session.add_all(
+            Place(title=f"seed {i}", latitude=0.0, longitude=0.0, owner_id=owner.id)
+            for i in range(1000)
+        )
+        db.session.commit()
+        owner_id = owner.id
+
+    totals = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader():
+        done = 0
+        while time.perf_counter() < deadline:
+            with app.app_context():
+                try:
+                    facade.get_places_page(50, profile="card")
+                    done += 1
+                except OperationalError:
+                    with lock:
+                        totals["locked"] += 1
+        with lock:
+            totals["reads"] += done
+
+    def writer():
+        done = 0
+        while time.perf_counter() < deadline:
+            with app.app_context():
+                try:
+                    facade.create_place({
+                        "title": "bench", "latitude": 1.0, "longitude": 2.0, "owner_id": owner_id,
+                    })
+                    done += 1
+                except OperationalError:
+                    with lock:
+                        totals["locked"] += 1
+        with lock:
+            totals["writes"] += done
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with app.app_context():
+        db.engine.dispose()
+
+    return {name: count / seconds for name, count in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=6)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'locked/s':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for profile in SQLITE_PROFILES:
+            rates = run_profile(profile, args.seconds, args.readers, args.writers, tmpdir)
+            print(f"{profile:<12}{rates['reads']:>10.1f}{rates['writes']:>10.1f}{rates['locked']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
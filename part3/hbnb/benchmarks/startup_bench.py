@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cold start of the app: imports, create_app and the first request.
+
+Each run is a fresh interpreter. Flask and Flask-SQLAlchemy are imported
+first and reported apart ("framework"): every mode pays for them. The app
+factory is what follows, importing ``app`` and calling create_app, and is
+held to --target-ms in lazy mode (LAZY_API), which moves the API build to
+the first request. Exits 1 when the target is missed.
+
+    python3 benchmarks/startup_bench.py --repeat 7 --importtime 15
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import flask, flask_sqlalchemy
+framework = time.perf_counter()
+from app import create_app
+from config import DevelopmentConfig
+imported = time.perf_counter()
+
+class BenchConfig(DevelopmentConfig):
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    LAZY_API = sys.argv[1] == "lazy"
+
+app = create_app(BenchConfig)
+created = time.perf_counter()
+
+from app.db.schema import create_tables
+from app.extensions import db
+with app.app_context():
+    create_tables(db.engine)
+client = app.test_client()
+ready = time.perf_counter()
+status = client.get("/api/v1/amenities/").status_code
+served = time.perf_counter()
+
+json.dump({
+    "framework": framework - started,
+    "import": imported - framework,
+    "create_app": created - imported,
+    "first_request": served - ready,
+    "status": status,
+    "modules": len(sys.modules),
+}, sys.stdout)
+"""
+
+PHASES = ("framework", "import", "create_app", "first_request")
+
+IMPORTTIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def run(mode, importtime=False):
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", CHILD, mode]
+    done = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(done.stdout), done.stderr
+
+
+def breakdown(stderr, top):
+    """Cumulative import time per top-level package, from -X importtime output."""
+    totals = {}
+    for match in IMPORTTIME.finditer(stderr):
+        cumulative, indent, name = match.groups()
+        if indent:  # counted in its top-level importer
+            continue
+        package = name if name.startswith("app") else name.split(".")[0]
+        totals[package] = totals.get(package, 0) + int(cumulative) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=150)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="also print the N slowest top-level imports of each mode (first request included)")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}" + "".join(f"{phase + ' ms':>18}" for phase in PHASES)
+          + f"{'factory ms':>14}{'modules':>9}")
+    factories = {}
+    for mode in ("eager", "lazy"):
+        runs = [run(mode)[0] for _ in range(args.repeat)]
+        assert all(r["status"] == 200 for r in runs), runs
+        median = {phase: statistics.median(r[phase] for r in runs) * 1000 for phase in PHASES}
+        factories[mode] = statistics.median((r["import"] + r["create_app"]) * 1000 for r in runs)
+        print(f"{mode:<8}" + "".join(f"{median[phase]:>18.1f}" for phase in PHASES)
+              + f"{factories[mode]:>14.1f}{runs[0]['modules']:>9}")
+
+    for mode in ("eager", "lazy") if args.importtime else ():
+        print(f"\nslowest imports, {mode}:")
+        for package, ms in breakdown(run(mode, importtime=True)[1], args.importtime):
+            print(f"  {package:<40}{ms:>8.1f} ms")
+
+    met = factories["lazy"] <= args.target_ms
+    print(f"\nlazy app factory {factories['lazy']:.1f} ms, target {args.target_ms:.0f} ms: "
+          + ("met" if met else "MISSED"))
+    sys.exit(0 if met else 1)
+
+
+if __name__ == "__main__":
+    main()
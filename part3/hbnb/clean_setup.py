@@ -7,6 +7,7 @@ from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
+from app.services.facade import facade
 from werkzeug.security import generate_password_hash
 
 app = create_app(DevelopmentConfig)
@@ -87,6 +88,9 @@ with app.app_context():
     )
     db.session.add(review1)
     db.session.commit()
+    # reviews added directly skip the facade's rating bookkeeping
+    facade.repair_rating_aggregates()
+    facade.refresh_leaderboard()
     print("✅ Reviews created")
     
     print("\n" + "="*50)
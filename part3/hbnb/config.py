@@ -6,20 +6,98 @@ class Config:
     JWT_SECRET_KEY = "jwt-super-secret-key"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
+    # bcrypt cost (log2 rounds); stored hashes at another cost are rehashed at login
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+    # production server (wsgi.py, gunicorn.conf.py): WEB_WORKERS processes forked
+    # from one preloaded app, WEB_THREADS request threads each; a worker is
+    # replaced after WEB_MAX_REQUESTS requests (0: never)
+    WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:8000")
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", os.cpu_count() or 1))
+    WEB_THREADS = int(os.getenv("WEB_THREADS", 4))
+    WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", 30))
+    WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", 0))
+    # processes hashing passwords (app/services/passwords.py), per worker, so
+    # that all workers together use about one per CPU; 0 hashes inline
+    BCRYPT_POOL_SIZE = int(os.getenv("BCRYPT_POOL_SIZE", max(1, (os.cpu_count() or 1) // WEB_WORKERS)))
+    # hashes that may wait for a pool process (4 per process); a request finding
+    # them all taken waits BCRYPT_BUSY_TIMEOUT seconds for one, then gets a 503
+    BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", 4 * BCRYPT_POOL_SIZE))
+    BCRYPT_BUSY_TIMEOUT = float(os.getenv("BCRYPT_BUSY_TIMEOUT", 1.0))
+    # build the API (flask-restx, namespaces, facade) on the first request rather
+    # than in create_app; for processes that may never serve one. Under gunicorn's
+    # preload_app the master pays that cost once for all workers, so leave it off
+    LAZY_API = os.getenv("LAZY_API", "0") == "1"
+    PAGE_SIZE_DEFAULT = 50
+    PAGE_SIZE_MAX = 200
+    BATCH_MAX_ITEMS = 10000
+    # rows per fetch (yield_per) and per written chunk of /api/v1/export and `flask export`
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+    GEO_MAX_RADIUS_KM = 1000
+    # leaderboard: every place starts with PRIOR_WEIGHT reviews of PRIOR_MEAN
+    # stars; trending weight halves every HALF_LIFE_HOURS
+    LEADERBOARD_PRIOR_MEAN = float(os.getenv("LEADERBOARD_PRIOR_MEAN", 3.5))
+    LEADERBOARD_PRIOR_WEIGHT = float(os.getenv("LEADERBOARD_PRIOR_WEIGHT", 5))
+    LEADERBOARD_TREND_HALF_LIFE_HOURS = float(os.getenv("LEADERBOARD_TREND_HALF_LIFE_HOURS", 72))
+
+    # where cache entries live: "memory" (per process), "sqlite:///path" (shared
+    # by a host's workers) or "redis://host:port/db"; invalidations reach the
+    # other workers through CACHE_INVALIDATION_URL, which defaults to the same
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_INVALIDATION_URL = os.getenv("CACHE_INVALIDATION_URL")
+    # a sqlite invalidation bus is read at most once per this many seconds per
+    # worker, so other workers' writes may be served stale for that long
+    CACHE_INVALIDATION_POLL_INTERVAL = float(os.getenv("CACHE_INVALIDATION_POLL_INTERVAL", 0.05))
+    # concurrent identical facade reads run once (app/services/singleflight.py)
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "1") == "1"
+    # rows fetched by id or unique key are cached per table (app/cache/objects.py);
+    # OBJECT_CACHE_DISABLED is a comma-separated list of tables, or "*"
+    OBJECT_CACHE_SIZE = int(os.getenv("OBJECT_CACHE_SIZE", 10000))
+    OBJECT_CACHE_TTL = float(os.getenv("OBJECT_CACHE_TTL", 300))
+    OBJECT_CACHE_DISABLED = os.getenv("OBJECT_CACHE_DISABLED", "")
+    # encoded JSON of list rows, bounded by total size (app/cache/fragments.py); 0 disables
+    FRAGMENT_CACHE_BYTES = int(os.getenv("FRAGMENT_CACHE_BYTES", 32 * 1024 * 1024))
+    # negotiated br/gzip/deflate of response bodies of at least COMPRESS_MIN_SIZE bytes
+    # (app/compression.py); br needs the brotli package. Compressed bodies are
+    # cached per ETag up to COMPRESS_CACHE_BYTES; 0 disables that cache
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 500))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))
+    COMPRESS_CACHE_BYTES = int(os.getenv("COMPRESS_CACHE_BYTES", 16 * 1024 * 1024))
+
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+
+    # PRAGMA set applied to SQLite connections, see app/db/sqlite.py
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
 
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///development.db"
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 10))
 
 
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URI")
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+
+    # optional read replica; repository reads are routed to it (see app/db/routing.py)
+    if os.getenv("DATABASE_REPLICA_URI"):
+        SQLALCHEMY_BINDS = {"replica": os.getenv("DATABASE_REPLICA_URI")}
 
 
 config = {
     "development": DevelopmentConfig,
     "production": ProductionConfig,
 }
+
+
+def get_config(default="development"):
+    """The config class named by FLASK_ENV."""
+    return config.get(os.getenv("FLASK_ENV", default).lower(), config[default])
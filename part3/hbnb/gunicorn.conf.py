@@ -0,0 +1,36 @@
+"""
+gunicorn settings, read from the working directory by default:
+
+    flask --app wsgi init-db
+    gunicorn wsgi:app
+
+The app is imported once in the master and WEB_WORKERS workers are forked
+from it, each serving WEB_THREADS requests at a time (see Config).
+"""
+
+from config import get_config
+
+_config = get_config("production")
+
+bind = _config.WEB_BIND
+workers = _config.WEB_WORKERS
+threads = _config.WEB_THREADS
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = _config.WEB_TIMEOUT
+max_requests = _config.WEB_MAX_REQUESTS
+max_requests_jitter = max_requests // 10
+preload_app = True
+
+
+def post_fork(server, worker):
+    # the module was imported by the master (preload_app), so this is its app
+    from app.db.database import dispose_after_fork
+    from wsgi import app
+
+    dispose_after_fork(app)
+
+
+def worker_exit(server, worker):
+    from wsgi import app
+
+    app.extensions["password_hasher"].shutdown()
@@ -1,26 +1,29 @@
-import os
-from app import create_app
-from config import DevelopmentConfig, ProductionConfig
-from app.extensions import db
+"""
+Development server: ``python3 run.py``.
 
-def get_config():
-    env = os.getenv("FLASK_ENV", "development").lower()
-    if env == "production":
-        return ProductionConfig
-    return DevelopmentConfig
+Creates missing tables before serving, for convenience; importing this
+module has no side effects beyond building the app. Production runs
+``wsgi.py`` under gunicorn and ``flask --app wsgi init-db`` instead.
+"""
 
-# Create Flask app
-app = create_app(get_config())
+from app import create_app
+from config import get_config
 
-# Initialize database tables
-with app.app_context():
-    from app.models.user import User  
-    from app.models.place import Place  
-    from app.models.review import Review 
-    from app.models.amenity import Amenity 
-    db.create_all()
+app = create_app(get_config())
 
 if __name__ == "__main__":
+    from app.db.schema import create_tables, ensure_schema
+    from app.extensions import db
+
+    with app.app_context():
+        for name in create_tables(db.engine):
+            print(f"Created table {name}")
+        report = ensure_schema(db.engine)
+        for name in report["columns"]:
+            print(f"Added column {name}")
+        for name in report["indexes"]:
+            print(f"Created index {name}")
+
     app.run(
         host="127.0.0.1",  # Use 127.0.0.1 for development
         port=5000,
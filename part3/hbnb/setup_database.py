@@ -17,6 +17,7 @@ from app.models.user import User
 from app.models.place import Place
 from app.models.amenity import Amenity
 from app.models.review import Review
+from app.services.facade import facade
 
 def main():
     """Setup database with sample data"""
@@ -205,6 +206,11 @@ def main():
             db.session.commit()
             print(f"Created {Review.query.count()} reviews")
             
+            # Step 7: Ratings and leaderboard (reviews added directly skip the facade's bookkeeping)
+            print("\nComputing ratings and rankings...")
+            print(f"Rated {facade.repair_rating_aggregates()} places")
+            print(f"Ranked {facade.refresh_leaderboard()} places on the leaderboard")
+            
             # Success Summary
             print("\n" + "="*60)
             print("Database setup completed successfully!")
@@ -1,3 +1,6 @@
+DROP TABLE IF EXISTS places_fts;
+DROP TABLE IF EXISTS place_rankings;
+DROP TABLE IF EXISTS table_versions;
 DROP TABLE IF EXISTS place_amenity;
 DROP TABLE IF EXISTS reviews;
 DROP TABLE IF EXISTS amenities;
@@ -23,6 +26,14 @@ CREATE TABLE places (
     price_per_night INTEGER NOT NULL DEFAULT 0,
     latitude FLOAT,
     longitude FLOAT,
+    geohash VARCHAR(12),
+    review_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    rating_1 INTEGER NOT NULL DEFAULT 0,
+    rating_2 INTEGER NOT NULL DEFAULT 0,
+    rating_3 INTEGER NOT NULL DEFAULT 0,
+    rating_4 INTEGER NOT NULL DEFAULT 0,
+    rating_5 INTEGER NOT NULL DEFAULT 0,
     created_at DATETIME NOT NULL,
     updated_at DATETIME NOT NULL,
     FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE
@@ -38,7 +49,8 @@ CREATE TABLE reviews (
     updated_at DATETIME NOT NULL,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,
-    UNIQUE (user_id, place_id)
+    CONSTRAINT uq_review_user_place UNIQUE (user_id, place_id),
+    CONSTRAINT ck_review_rating_1_5 CHECK (rating >= 1 AND rating <= 5)
 );
 
 CREATE TABLE amenities (
@@ -55,3 +67,55 @@ CREATE TABLE place_amenity (
     FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,
     FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE
 );
+
+CREATE TABLE place_rankings (
+    place_id VARCHAR(36) PRIMARY KEY,
+    rating_score FLOAT NOT NULL,
+    trend_key FLOAT NOT NULL,
+    updated_at DATETIME,
+    FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE
+);
+
+-- write counter per table, bumped once per committing transaction
+CREATE TABLE table_versions (
+    name VARCHAR(64) PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL
+);
+
+CREATE INDEX ix_users_created_at ON users (created_at);
+CREATE INDEX ix_places_created_at ON places (created_at);
+CREATE INDEX ix_places_owner_id ON places (owner_id);
+CREATE INDEX ix_places_price_per_night ON places (price_per_night);
+CREATE INDEX ix_places_geohash ON places (geohash);
+CREATE INDEX ix_reviews_created_at ON reviews (created_at);
+CREATE INDEX ix_reviews_place_id ON reviews (place_id);
+CREATE INDEX ix_amenities_created_at ON amenities (created_at);
+CREATE INDEX ix_place_amenity_amenity_id ON place_amenity (amenity_id);
+CREATE INDEX ix_place_rankings_rating ON place_rankings (rating_score, place_id);
+CREATE INDEX ix_place_rankings_trend ON place_rankings (trend_key, place_id);
+
+-- full-text index over place titles and descriptions (see app/models/fulltext.py)
+CREATE VIRTUAL TABLE places_fts USING fts5(
+    title, description,
+    content='places', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE TRIGGER places_fts_ai AFTER INSERT ON places BEGIN
+    INSERT INTO places_fts(rowid, title, description)
+    VALUES (new.rowid, new.title, new.description);
+END;
+
+CREATE TRIGGER places_fts_ad AFTER DELETE ON places BEGIN
+    INSERT INTO places_fts(places_fts, rowid, title, description)
+    VALUES ('delete', old.rowid, old.title, old.description);
+END;
+
+CREATE TRIGGER places_fts_au AFTER UPDATE OF title, description ON places BEGIN
+    INSERT INTO places_fts(places_fts, rowid, title, description)
+    VALUES ('delete', old.rowid, old.title, old.description);
+    INSERT INTO places_fts(rowid, title, description)
+    VALUES (new.rowid, new.title, new.description);
+END;
@@ -9,6 +9,6 @@ INSERT INTO users (
     'Admin',
     'HBnB',
     1,
-    CURRENT_TIMESTAMP,
-    CURRENT_TIMESTAMP
+    strftime('%Y-%m-%d %H:%M:%f', 'now') || '000',
+    strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'
 );
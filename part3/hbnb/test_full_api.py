@@ -1,6 +1,13 @@
 import json
+import os
+import tempfile
+import threading
+import time
 import unittest
 
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import IntegrityError
+
 from app import create_app
 from config import DevelopmentConfig
 from app.extensions import db
@@ -9,6 +16,10 @@ from app.models.user import User
 from app.models.place import Place, place_amenity
 from app.models.review import Review
 from app.models.amenity import Amenity
+from app.models.ranking import PlaceRanking
+from app.models import fulltext, geo
+from app.services.facade import facade
+from app.services.unit_of_work import unit_of_work
 
 
 def _headers(token: str | None = None):
@@ -28,6 +39,7 @@ class HBnBAllCasesTests(unittest.TestCase):
             SQLALCHEMY_TRACK_MODIFICATIONS = False
             JWT_SECRET_KEY = getattr(DevelopmentConfig, "JWT_SECRET_KEY", "jwt-super-secret-key")
             SECRET_KEY = getattr(DevelopmentConfig, "SECRET_KEY", "super-secret-key")
+            BCRYPT_LOG_ROUNDS = 4
 
         cls.app = create_app(TestConfig)
         cls.client = cls.app.test_client()
@@ -47,6 +59,7 @@ class HBnBAllCasesTests(unittest.TestCase):
             
             db.session.execute(place_amenity.delete())
             
+            db.session.query(PlaceRanking).delete()
             db.session.query(Review).delete()
             db.session.query(Place).delete()
             db.session.query(Amenity).delete()
@@ -111,6 +124,31 @@ class HBnBAllCasesTests(unittest.TestCase):
         self.assertEqual(r.status_code, 201, msg=r.get_data(as_text=True))
         return r.get_json()
 
+    def _count_queries(self, fn):
+        statements = []
+
+        def _before(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", _before)
+        try:
+            result = fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", _before)
+        return len(statements), result
+
+    def _seed_places_with_amenities_and_reviews(self, count, prefix):
+        with self.app.app_context():
+            reviewer = db.session.get(User, self.admin_id)
+            for i in range(count):
+                place = Place(title=f"{prefix}{i}", latitude=1.0, longitude=2.0, owner_id=self.user_id)
+                place.amenities.extend([Amenity(name=f"{prefix}a{i}"), Amenity(name=f"{prefix}b{i}")])
+                db.session.add(place)
+                db.session.add(Review(text="ok", rating=4, user=reviewer, place=place))
+            db.session.commit()
+
     def _assert_unauthorized_token(self, r):
         
         self.assertIn(r.status_code, (401, 422), msg=r.get_data(as_text=True))
@@ -124,6 +162,55 @@ class HBnBAllCasesTests(unittest.TestCase):
         )
         self.assertEqual(r.status_code, 401)
 
+    def test_login_rehashes_password_at_configured_cost(self):
+        import bcrypt
+        from app.services.passwords import hash_cost
+
+        with self.app.app_context():
+            hasher = self.app.extensions["password_hasher"]
+            self.assertEqual((hasher.rounds, hasher.pool_size), (4, os.cpu_count() or 1))
+            old = bcrypt.hashpw(b"rehashpass", bcrypt.gensalt(rounds=5)).decode("utf-8")
+            db.session.add(User(email="rehash@example.com", password=old))
+            db.session.commit()
+
+        self._login("rehash@example.com", "rehashpass")
+        with self.app.app_context():
+            stored = User.query.filter_by(email="rehash@example.com").one().password
+        self.assertEqual(hash_cost(stored), 4)
+        self.assertTrue(bcrypt.checkpw(b"rehashpass", stored.encode("utf-8")))
+        self._login("rehash@example.com", "rehashpass")
+
+    def test_password_pool_refuses_work_beyond_its_bound(self):
+        from app.services.passwords import PasswordHasher
+
+        hasher = self.app.extensions["password_hasher"]
+        config = self.app.config
+        self.assertEqual(hasher.timeout, config["BCRYPT_BUSY_TIMEOUT"])
+        if hasher.pool_size:
+            self.assertEqual(hasher._slots._value, config["BCRYPT_POOL_SIZE"] + config["BCRYPT_MAX_PENDING"])
+
+        busy = PasswordHasher(rounds=4, pool_size=1, max_pending=0, timeout=0.01)
+        busy._slots.acquire()  # the one process is taken
+        self.app.extensions["password_hasher"] = busy
+        try:
+            r = self.client.post(
+                "/api/v1/auth/login",
+                data=json.dumps({"email": "admin@example.com", "password": "adminpass"}),
+                headers=_headers(),
+            )
+            r_put = self.client.put(
+                f"/api/v1/users/{self.user_id}",
+                data=json.dumps({"password": "newpass"}),
+                headers=_headers(self.admin_token),
+            )
+        finally:
+            self.app.extensions["password_hasher"] = hasher
+        for response in (r, r_put):
+            self.assertEqual(response.status_code, 503, msg=response.get_data(as_text=True))
+            self.assertEqual(response.headers["Retry-After"], "1")
+            self.assertIn("message", response.get_json())
+        self._login("user@example.com", "userpass")
+
     def test_auth_missing_fields_returns_4xx(self):
         
         r1 = self.client.post(
@@ -166,8 +253,8 @@ class HBnBAllCasesTests(unittest.TestCase):
         r = self.client.get("/api/v1/users/", headers=_headers(self.admin_token))
         self.assertEqual(r.status_code, 200)
         data = r.get_json()
-        self.assertIsInstance(data, list)
-        self.assertGreaterEqual(len(data), 2)
+        self.assertIsInstance(data["items"], list)
+        self.assertGreaterEqual(len(data["items"]), 2)
 
     def test_users_admin_create_duplicate_email(self):
         
@@ -249,7 +336,485 @@ class HBnBAllCasesTests(unittest.TestCase):
         r = self.client.get("/api/v1/places/", headers=_headers())
         self.assertEqual(r.status_code, 200)
         data = r.get_json()
-        self.assertIsInstance(data, list)
+        self.assertIsInstance(data["items"], list)
+        self.assertIn("next_cursor", data)
+
+    def test_places_cursor_pagination_walks_every_row_once(self):
+        with self.app.app_context():
+            for i in range(5):
+                db.session.add(Place(title=f"P{i}", latitude=1.0, longitude=2.0, owner_id=self.user_id))
+            db.session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/v1/places/?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            r = self.client.get(url, headers=_headers())
+            self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+            body = r.get_json()
+            self.assertLessEqual(len(body["items"]), 2)
+            seen.extend(p["id"] for p in body["items"])
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_ensure_schema_backfills_bump_table_versions(self):
+        with self.app.app_context():
+            facade.create_places([{"title": "Unhashed", "latitude": 1.0, "longitude": 2.0}], self.user_id)
+            conn = db.session.connection()
+            conn.exec_driver_sql("UPDATE places SET geohash = NULL")
+            conn.exec_driver_sql("UPDATE users SET created_at = '2024-01-01 12:00:00'")
+            db.session.commit()
+            before = facade.get_tables_version(["places"])[0], facade.get_tables_version(["users"])[0]
+            unrelated = facade.get_tables_version(["amenities"])[0]
+
+        r = self.app.test_cli_runner().invoke(args=["ensure-schema"])
+        self.assertIn("backfilled 1 rows of places.geohash", r.output)
+        with self.app.app_context():
+            after = facade.get_tables_version(["places"])[0], facade.get_tables_version(["users"])[0]
+            self.assertEqual(facade.get_tables_version(["amenities"])[0], unrelated)
+        self.assertNotEqual(after[0], before[0])
+        self.assertNotEqual(after[1], before[1])
+
+    def test_cursor_pagination_walks_rows_written_by_plain_sql(self):
+        seed = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql", "insert_amenities.sql")
+        with self.app.app_context():
+            conn = db.session.connection()
+            # CURRENT_TIMESTAMP stores "2024-01-01 12:00:00", without microseconds
+            conn.exec_driver_sql(
+                "INSERT INTO amenities (id, name, created_at, updated_at) VALUES "
+                "('legacy-1', 'Sauna', '2024-01-01 12:00:00', '2024-01-01 12:00:00'), "
+                "('legacy-2', 'Garden', '2024-01-01 12:00:00', '2024-01-01 12:00:00'), "
+                "('legacy-3', 'Gym', NULL, NULL)"
+            )
+            with open(seed) as f:
+                conn.exec_driver_sql(f.read())
+            db.session.commit()
+
+        r = self.app.test_cli_runner().invoke(args=["ensure-schema"])
+        self.assertIn("backfilled 2 rows of amenities.created_at", r.output)
+
+        names = []
+        cursor = None
+        while True:
+            url = "/api/v1/amenities/?limit=1" + (f"&cursor={cursor}" if cursor else "")
+            r = self.client.get(url, headers=_headers())
+            self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+            names.extend(a["name"] for a in r.get_json()["items"])
+            cursor = r.get_json()["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(
+            sorted(names),
+            ["Air Conditioning", "Garden", "Gym", "Sauna", "Swimming Pool", "WiFi"],
+        )
+
+    def test_places_list_query_count_is_constant(self):
+        self._seed_places_with_amenities_and_reviews(2, "small")
+        small, r = self._count_queries(lambda: self.client.get("/api/v1/places/", headers=_headers()))
+        self.assertEqual(len(r.get_json()["items"]), 2)
+
+        self._seed_places_with_amenities_and_reviews(6, "large")
+        large, r = self._count_queries(lambda: self.client.get("/api/v1/places/", headers=_headers()))
+        self.assertEqual(len(r.get_json()["items"]), 8)
+        self.assertEqual(small, large)
+
+    def test_reviews_list_query_count_is_constant(self):
+        self._seed_places_with_amenities_and_reviews(2, "rsmall")
+        small, r = self._count_queries(lambda: self.client.get("/api/v1/reviews/", headers=_headers()))
+        self.assertEqual(len(r.get_json()["items"]), 2)
+
+        self._seed_places_with_amenities_and_reviews(6, "rlarge")
+        large, r = self._count_queries(lambda: self.client.get("/api/v1/reviews/", headers=_headers()))
+        self.assertEqual(len(r.get_json()["items"]), 8)
+        self.assertEqual(small, large)
+
+    def _seed_geo_places(self):
+        spots = {
+            "Kingdom Centre": (24.7114, 46.6744),
+            "Diriyah": (24.7343, 46.5756),
+            "Jeddah Corniche": (21.5433, 39.1728),
+            "Date Line East": (0.0, 179.99),
+            "Date Line West": (0.0, -179.99),
+        }
+        with self.app.app_context():
+            rows = [{"title": t, "latitude": lat, "longitude": lon} for t, (lat, lon) in spots.items()]
+            facade.create_places(rows, self.user_id)
+
+    def test_places_near_filters_by_radius_and_sorts_by_distance(self):
+        self._seed_geo_places()
+        r = self.client.get("/api/v1/places/?near=24.7136,46.6753&radius_km=15", headers=_headers())
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        items = r.get_json()["items"]
+        self.assertEqual([p["title"] for p in items], ["Kingdom Centre", "Diriyah"])
+        self.assertLess(items[0]["distance_km"], items[1]["distance_km"])
+        self.assertLessEqual(items[1]["distance_km"], 15)
+
+    def test_places_near_across_the_antimeridian(self):
+        self._seed_geo_places()
+        r = self.client.get("/api/v1/places/?near=0,180&radius_km=5", headers=_headers())
+        titles = sorted(p["title"] for p in r.get_json()["items"])
+        self.assertEqual(titles, ["Date Line East", "Date Line West"])
+
+    def test_places_near_matches_brute_force_at_high_latitudes(self):
+        spots = [(lat / 2, lon) for lat in range(140, 180) for lon in range(-180, 180, 6)]
+        with self.app.app_context():
+            facade.create_places(
+                [{"title": f"Polar {lat} {lon}", "latitude": lat, "longitude": lon} for lat, lon in spots],
+                self.user_id,
+            )
+
+        for lat, lon, radius in ((76.16, -169.08, 500), (88.68, 109.0, 100), (84.0, 177.0, 400)):
+            expected = sorted(
+                f"Polar {p_lat} {p_lon}" for p_lat, p_lon in spots
+                if geo.haversine_km(lat, lon, p_lat, p_lon) <= radius
+            )
+            r = self.client.get(f"/api/v1/places/?near={lat},{lon}&radius_km={radius}&limit=200", headers=_headers())
+            self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+            self.assertEqual(sorted(p["title"] for p in r.get_json()["items"]), expected)
+
+    def test_places_bbox_and_bad_geo_params(self):
+        self._seed_geo_places()
+        r = self.client.get("/api/v1/places/?bbox=39,21,40,22", headers=_headers())
+        self.assertEqual([p["title"] for p in r.get_json()["items"]], ["Jeddah Corniche"])
+
+        self.assertEqual(self.client.get("/api/v1/places/?near=1", headers=_headers()).status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/places/?near=95,0", headers=_headers()).status_code, 400)
+        self.assertEqual(
+            self.client.get("/api/v1/places/?near=0,0&radius_km=-1", headers=_headers()).status_code, 400
+        )
+
+    def test_places_filter_by_price_and_amenities(self):
+        with self.app.app_context():
+            wifi, pool = Amenity(name="filter-wifi"), Amenity(name="filter-pool")
+            for title, price, amenities in (
+                ("Cheap", 20.0, [wifi]),
+                ("Mid", 60.0, [wifi, pool]),
+                ("Dear", 150.0, [wifi, pool]),
+            ):
+                place = Place(title=title, price_per_night=price, latitude=24.7, longitude=46.7,
+                              owner_id=self.user_id)
+                place.amenities.extend(amenities)
+                db.session.add(place)
+            db.session.commit()
+            wifi_id, pool_id = wifi.id, pool.id
+
+        def titles(query):
+            r = self.client.get(f"/api/v1/places/?{query}", headers=_headers())
+            self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+            return sorted(p["title"] for p in r.get_json()["items"])
+
+        self.assertEqual(titles("max_price=100"), ["Cheap", "Mid"])
+        self.assertEqual(titles("min_price=50&max_price=200"), ["Dear", "Mid"])
+        self.assertEqual(titles(f"amenities={wifi_id},{pool_id}"), ["Dear", "Mid"])
+        self.assertEqual(titles(f"amenities={pool_id}&max_price=100"), ["Mid"])
+        self.assertEqual(titles(f"near=24.7,46.7&radius_km=5&amenities={wifi_id}&min_price=100"), ["Dear"])
+        self.assertEqual(titles("bbox=46,24,47,25&max_price=30"), ["Cheap"])
+
+        for bad in ("min_price=abc", "min_price=-1", "min_price=100&max_price=50"):
+            r = self.client.get(f"/api/v1/places/?{bad}", headers=_headers())
+            self.assertEqual(r.status_code, 400, msg=bad)
+
+    def test_places_search_ranks_prefixes_and_pages(self):
+        with self.app.app_context():
+            rows = [
+                {"title": "Desert camp", "description": "Tents under the stars", "latitude": 1.0, "longitude": 2.0},
+                {"title": "Beach house", "description": "Walk to the desert dunes", "latitude": 1.0, "longitude": 2.0},
+                {"title": "City flat", "description": "Near the metro", "latitude": 1.0, "longitude": 2.0},
+            ]
+            facade.create_places(rows, self.user_id)
+
+        def search(query):
+            r = self.client.get(f"/api/v1/places/search?{query}", headers=_headers())
+            self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+            return r.get_json()
+
+        body = search("q=deser")
+        self.assertEqual([p["title"] for p in body["items"]], ["Desert camp", "Beach house"])
+        self.assertGreater(body["items"][0]["score"], body["items"][1]["score"])
+
+        first = search("q=desert&limit=1")
+        second = search(f"q=desert&limit=1&cursor={first['next_cursor']}")
+        self.assertEqual([p["title"] for p in first["items"] + second["items"]], ["Desert camp", "Beach house"])
+        self.assertIsNone(second["next_cursor"])
+
+        self.assertEqual(search("q=metro OR desert")["items"], [])
+
+        with self.app.app_context():
+            flat = Place.query.filter_by(title="City flat").one()
+            flat.description = "Desert views"
+            db.session.commit()
+            db.session.query(Place).filter_by(title="Beach house").delete()
+            db.session.commit()
+        self.assertEqual(sorted(p["title"] for p in search("q=desert")["items"]), ["City flat", "Desert camp"])
+
+        for bad in ("q=", "q=%22*", "q=desert&cursor=nope"):
+            r = self.client.get(f"/api/v1/places/search?{bad}", headers=_headers())
+            self.assertEqual(r.status_code, 400, msg=bad)
+
+    def test_places_search_ranks_every_match_not_just_the_newest(self):
+        with self.app.app_context():
+            rows = [{"title": "Lagoon", "description": "Lagoon villa", "latitude": 1.0, "longitude": 2.0}]
+            rows += [
+                {"title": f"Flat {i}", "description": "A flat, the lagoon is a long drive away",
+                 "latitude": 1.0, "longitude": 2.0}
+                for i in range(1200)
+            ]
+            facade.create_places(rows, self.user_id)
+
+        r = self.client.get("/api/v1/places/search?q=lagoon&limit=1", headers=_headers())
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        self.assertEqual([p["title"] for p in r.get_json()["items"]], ["Lagoon"])
+
+    def test_ensure_schema_rebuilds_missing_fulltext_index(self):
+        with self.app.app_context():
+            db.session.add(Place(title="Oasis retreat", latitude=1.0, longitude=2.0, owner_id=self.user_id))
+            db.session.commit()
+            for statement in fulltext.DROP_STATEMENTS:
+                db.session.execute(text(statement))
+            db.session.commit()
+
+        r = self.app.test_cli_runner().invoke(args=["ensure-schema"])
+        self.assertIn(f"created index {fulltext.FTS_TABLE}", r.output)
+        self.assertIn(f"backfilled 1 rows of {fulltext.FTS_TABLE}", r.output)
+
+        r = self.client.get("/api/v1/places/search?q=oasis", headers=_headers())
+        self.assertEqual([p["title"] for p in r.get_json()["items"]], ["Oasis retreat"])
+
+    def test_ensure_schema_rebuilds_fulltext_index_after_rowids_change(self):
+        with self.app.app_context():
+            db.session.add(Place(title="Oasis retreat", latitude=1.0, longitude=2.0, owner_id=self.user_id))
+            db.session.commit()
+            # what a VACUUM or a dump and restore may do to the implicit rowids
+            db.session.execute(text("UPDATE places SET rowid = rowid + 1000"))
+            db.session.commit()
+
+        search = lambda: self.client.get("/api/v1/places/search?q=oasis", headers=_headers()).get_json()["items"]
+        self.assertEqual(search(), [])
+
+        r = self.app.test_cli_runner().invoke(args=["ensure-schema"])
+        self.assertIn(f"backfilled 1 rows of {fulltext.FTS_TABLE}", r.output)
+        self.assertEqual([p["title"] for p in search()], ["Oasis retreat"])
+
+        r = self.app.test_cli_runner().invoke(args=["ensure-schema"])
+        self.assertEqual(r.output.strip(), "schema up to date")
+
+    def test_place_rating_aggregates_follow_review_writes(self):
+        with self.app.app_context():
+            place = Place(title="Rated", latitude=1.0, longitude=2.0, owner_id=self.user_id)
+            other = Place(title="Other", latitude=1.0, longitude=2.0, owner_id=self.user_id)
+            db.session.add_all([place, other])
+            db.session.commit()
+            place_id, other_id = place.id, other.id
+
+            first = facade.create_review({"text": "Good", "rating": 4, "user_id": self.admin_id, "place_id": place_id})
+            review_id = first.id
+            facade.create_reviews(
+                [{"text": "Fine", "rating": 2, "place_id": other_id}], self.admin_id
+            )
+            facade.update_review(review_id, {"rating": 5})
+
+        statements = []
+        with self.app.app_context():
+            engine = db.engine
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            body = self.client.get(f"/api/v1/places/{place_id}", headers=_headers()).get_json()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        self.assertFalse([s for s in statements if "FROM reviews" in s])
+        self.assertEqual((body["review_count"], body["average_rating"]), (1, 5.0))
+        self.assertEqual(body["rating_histogram"], {"1": 0, "2": 0, "3": 0, "4": 0, "5": 1})
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Place, other_id).rating_2, 1)
+            facade.delete_review(review_id)
+            place = db.session.get(Place, place_id)
+            self.assertEqual((place.review_count, place.rating_sum, place.average_rating), (0, 0, None))
+
+    def test_repair_ratings_cli_recomputes_drifted_aggregates(self):
+        self._seed_places_with_amenities_and_reviews(3, "drift")
+        with self.app.app_context():
+            db.session.execute(text("UPDATE places SET review_count = 7, rating_4 = 0"))
+            db.session.commit()
+
+        runner = self.app.test_cli_runner()
+        r1 = runner.invoke(args=["repair-ratings"])
+        self.assertIn("repaired rating aggregates of 3 places", r1.output)
+        r2 = runner.invoke(args=["repair-ratings"])
+        self.assertIn("rating aggregates consistent", r2.output)
+
+        with self.app.app_context():
+            counts = {(p.review_count, p.rating_sum, p.rating_4) for p in Place.query.all()}
+        self.assertEqual(counts, {(1, 4, 1)})
+
+    def _seed_rated_places(self, ratings_by_title):
+        """Places owned by the regular user, reviewed by throwaway users with the given ratings."""
+        with self.app.app_context():
+            ids = {}
+            for title, ratings in ratings_by_title.items():
+                place = Place(title=title, latitude=1.0, longitude=2.0, owner_id=self.user_id)
+                db.session.add(place)
+                db.session.flush()
+                ids[title] = place.id
+            reviewers = [User(email=f"ranker{i}@example.com", password="x") for i in range(5)]
+            db.session.add_all(reviewers)
+            db.session.commit()
+            reviewer_ids = [u.id for u in reviewers]
+
+            for title, ratings in ratings_by_title.items():
+                for reviewer_id, rating in zip(reviewer_ids, ratings):
+                    facade.create_review(
+                        {"text": "ok", "rating": rating, "user_id": reviewer_id, "place_id": ids[title]}
+                    )
+        return ids
+
+    def _top(self, query):
+        r = self.client.get(f"/api/v1/places/top?{query}", headers=_headers())
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        return [p["title"] for p in r.get_json()["items"]]
+
+    def test_top_places_by_bayesian_rating(self):
+        ids = self._seed_rated_places({
+            "Proven": [5, 5, 5, 5, 5],
+            "Lucky": [5],
+            "Average": [3, 3, 3],
+        })
+        self.assertEqual(self._top("by=rating"), ["Proven", "Lucky", "Average"])
+        self.assertEqual(self._top("by=rating&limit=1"), ["Proven"])
+        self.assertEqual(self.client.get("/api/v1/places/top?by=nope", headers=_headers()).status_code, 400)
+
+        with self.app.app_context():
+            review = Review.query.filter_by(place_id=ids["Lucky"]).one()
+            facade.delete_review(review.id)
+        self.assertEqual(self._top("by=rating"), ["Proven", "Average"])
+
+    def test_top_places_trending_and_refresh_matches_incremental(self):
+        self._seed_rated_places({"Old favourite": [4, 4, 4, 4, 4], "New hotspot": [4, 4]})
+        with self.app.app_context():
+            incremental = {r.place_id: (r.rating_score, r.trend_key) for r in PlaceRanking.query}
+            facade.refresh_leaderboard()
+            rebuilt = {r.place_id: (r.rating_score, r.trend_key) for r in PlaceRanking.query}
+        self.assertEqual(incremental.keys(), rebuilt.keys())
+        for place_id, (score, key) in rebuilt.items():
+            self.assertAlmostEqual(incremental[place_id][0], score)
+            self.assertAlmostEqual(incremental[place_id][1], key)
+
+        self.assertEqual(self._top("by=trending"), ["Old favourite", "New hotspot"])
+        with self.app.app_context():
+            old_id = Place.query.filter_by(title="Old favourite").one().id
+            db.session.execute(
+                text("UPDATE reviews SET created_at = datetime(created_at, '-30 days') WHERE place_id = :p"),
+                {"p": old_id},
+            )
+            db.session.commit()
+
+        r = self.app.test_cli_runner().invoke(args=["refresh-leaderboard"])
+        self.assertIn("ranked 2 places", r.output)
+        self.assertEqual(self._top("by=trending"), ["New hotspot", "Old favourite"])
+        self.assertEqual(self._top("by=rating"), ["Old favourite", "New hotspot"])
+
+    def test_places_list_conditional_get_uses_table_versions(self):
+        self._seed_places_with_amenities_and_reviews(2, "etag")
+        r1 = self.client.get("/api/v1/places/?limit=5", headers=_headers())
+        etag, last_modified = r1.headers["ETag"], r1.headers["Last-Modified"]
+        self.assertTrue(etag.startswith('"'))
+
+        statements, r2 = [], None
+        with self.app.app_context():
+            engine = db.engine
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            r2 = self.client.get("/api/v1/places/?limit=5", headers={"If-None-Match": etag})
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        self.assertEqual(r2.status_code, 304)
+        self.assertEqual(r2.headers["ETag"], etag)
+        self.assertEqual(r2.get_data(), b"")
+        self.assertFalse([s for s in statements if "FROM places" in s])
+
+        r3 = self.client.get("/api/v1/places/?limit=5", headers={"If-Modified-Since": last_modified})
+        self.assertEqual(r3.status_code, 304)
+        r4 = self.client.get("/api/v1/places/?limit=4", headers={"If-None-Match": etag})
+        self.assertEqual(r4.status_code, 200)
+
+        with self.app.app_context():
+            facade.create_places([{"title": "Bulk", "latitude": 1.0, "longitude": 2.0}], self.user_id)
+        r5 = self.client.get("/api/v1/places/?limit=5", headers={"If-None-Match": etag})
+        self.assertEqual(r5.status_code, 200)
+        self.assertNotEqual(r5.headers["ETag"], etag)
+
+        with self.app.app_context():
+            place = Place.query.filter_by(title="Bulk").one()
+            place.amenities.append(Amenity.query.first())
+            db.session.commit()
+        r6 = self.client.get("/api/v1/places/?limit=5", headers={"If-None-Match": r5.headers["ETag"]})
+        self.assertEqual(r6.status_code, 200)
+
+    def test_item_conditional_get_follows_body(self):
+        amenity = self._create_amenity_as_admin("Sauna")
+        url = f"/api/v1/amenities/{amenity['id']}"
+        r1 = self.client.get(url)
+        self.assertEqual(r1.status_code, 200)
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": r1.headers["ETag"]}).status_code, 304)
+
+        self.client.put(url, data=json.dumps({"name": "Steam room"}), headers=_headers(self.admin_token))
+        r2 = self.client.get(url, headers={"If-None-Match": r1.headers["ETag"]})
+        self.assertEqual(r2.status_code, 200)
+        self.assertEqual(r2.get_json()["name"], "Steam room")
+        self.assertEqual(self.client.get("/api/v1/amenities/nope", headers={"If-None-Match": "*"}).status_code, 404)
+
+    def test_responses_are_compressed_once_per_etag(self):
+        import gzip
+        import zlib
+
+        self._seed_places_with_amenities_and_reviews(5, "gz")
+        plain = self.client.get("/api/v1/places/?limit=5")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertIn("Accept-Encoding", plain.headers["Vary"])
+
+        cache = self.app.extensions["compression"].cache
+        misses = cache.misses
+        for _ in range(2):
+            r = self.client.get("/api/v1/places/?limit=5", headers={"Accept-Encoding": "gzip, deflate;q=0.5"})
+            self.assertEqual(r.headers["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(r.get_data()), plain.get_data())
+        self.assertEqual(cache.misses - misses, 1)
+        self.assertEqual(r.headers["ETag"], "W/" + plain.headers["ETag"])
+        r = self.client.get("/api/v1/places/?limit=5", headers={"If-None-Match": r.headers["ETag"]})
+        self.assertEqual(r.status_code, 304)
+
+        r = self.client.get("/api/v1/places/?limit=5", headers={"Accept-Encoding": "gzip;q=0, deflate"})
+        self.assertEqual(r.headers["Content-Encoding"], "deflate")
+        self.assertEqual(zlib.decompress(r.get_data()), plain.get_data())
+
+        # below COMPRESS_MIN_SIZE
+        r = self.client.get("/api/v1/places/?limit=1&fields=id", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", r.headers)
+
+    def test_geohash_follows_coordinate_updates(self):
+        with self.app.app_context():
+            place = Place(title="Mover", latitude=24.7, longitude=46.7, owner_id=self.user_id)
+            db.session.add(place)
+            db.session.commit()
+            first = place.geohash
+            self.assertTrue(first.startswith("th3"))
+            place.latitude = 21.5
+            place.longitude = 39.2
+            db.session.commit()
+            self.assertNotEqual(place.geohash, first)
+
+    def test_places_invalid_cursor_or_limit_400(self):
+        r1 = self.client.get("/api/v1/places/?cursor=not-a-cursor", headers=_headers())
+        self.assertEqual(r1.status_code, 400)
+        r2 = self.client.get("/api/v1/places/?limit=0", headers=_headers())
+        self.assertEqual(r2.status_code, 400)
 
     def test_places_create_requires_auth(self):
         r = self.client.post(
@@ -483,7 +1048,7 @@ class HBnBAllCasesTests(unittest.TestCase):
     def test_amenities_public_get_ok(self):
         r = self.client.get("/api/v1/amenities/", headers=_headers())
         self.assertEqual(r.status_code, 200)
-        self.assertIsInstance(r.get_json(), list)
+        self.assertIsInstance(r.get_json()["items"], list)
 
     def test_amenities_get_nonexistent_404(self):
         r = self.client.get("/api/v1/amenities/nope", headers=_headers())
@@ -539,5 +1104,1062 @@ class HBnBAllCasesTests(unittest.TestCase):
         self.assertEqual(r.status_code, 400, msg=r.get_data(as_text=True))
 
 
+    def test_pool_stats_admin_only(self):
+        r1 = self.client.get("/api/v1/admin/pool", headers=_headers(self.user_token))
+        self.assertEqual(r1.status_code, 403)
+
+        r2 = self.client.get("/api/v1/admin/pool", headers=_headers(self.admin_token))
+        self.assertEqual(r2.status_code, 200, msg=r2.get_data(as_text=True))
+        self.assertIn("default", r2.get_json()["engines"])
+
+    def test_review_table_constraints_are_declared(self):
+        self.assertEqual(Review.__tablename__, "reviews")
+        with self.app.app_context():
+            place = Place(title="Checked", latitude=1.0, longitude=2.0, owner_id=self.user_id)
+            db.session.add(place)
+            db.session.commit()
+
+            db.session.add(Review(text="bad", rating=9, user_id=self.admin_id, place_id=place.id))
+            with self.assertRaises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+
+    def test_ensure_indexes_cli_adds_missing_and_is_idempotent(self):
+        runner = self.app.test_cli_runner()
+        with self.app.app_context():
+            db.session.execute(text("DROP INDEX ix_reviews_place_id"))
+            db.session.commit()
+
+        r1 = runner.invoke(args=["ensure-indexes"])
+        self.assertIn("created index ix_reviews_place_id", r1.output)
+
+        r2 = runner.invoke(args=["ensure-indexes"])
+        self.assertIn("all indexes present", r2.output)
+
+        r3 = runner.invoke(args=["ensure-schema"])
+        self.assertIn("schema up to date", r3.output)
+
+
+    def test_places_batch_reports_per_item_results(self):
+        items = [
+            {"title": "B1", "latitude": 1.0, "longitude": 2.0, "price_per_night": 10},
+            {"title": "", "latitude": 1.0, "longitude": 2.0},
+            {"title": "B3", "latitude": 91.0, "longitude": 2.0},
+            {"title": "B4", "latitude": -1.0, "longitude": -2.0},
+        ]
+        r = self.client.post(
+            "/api/v1/places/batch",
+            data=json.dumps({"items": items}),
+            headers=_headers(self.user_token),
+        )
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        body = r.get_json()
+        self.assertEqual((body["created"], body["failed"]), (2, 2))
+        self.assertEqual(body["results"][1], {"index": 1, "error": "Title is required"})
+        self.assertEqual(body["results"][2]["error"], "Latitude must be between -90 and 90")
+
+        r_get = self.client.get(f"/api/v1/places/{body['results'][3]['id']}", headers=_headers())
+        self.assertEqual(r_get.status_code, 200)
+        self.assertEqual(r_get.get_json()["owner_id"], self.user_id)
+
+    def test_reviews_batch_applies_facade_rules_per_item(self):
+        with self.app.app_context():
+            own = Place(title="Own", latitude=1.0, longitude=2.0, owner_id=self.user_id)
+            other = Place(title="Other", latitude=1.0, longitude=2.0, owner_id=self.admin_id)
+            db.session.add_all([own, other])
+            db.session.commit()
+            own_id, other_id = own.id, other.id
+
+        items = [
+            {"text": "Great", "rating": 5, "place_id": other_id},
+            {"text": "Again", "rating": 4, "place_id": other_id},
+            {"text": "Mine", "rating": 5, "place_id": own_id},
+            {"text": "Bad", "rating": 7, "place_id": other_id},
+            {"text": "Ghost", "rating": 3, "place_id": "missing"},
+        ]
+        r = self.client.post(
+            "/api/v1/reviews/batch",
+            data=json.dumps({"items": items}),
+            headers=_headers(self.user_token),
+        )
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        errors = [res.get("error") for res in r.get_json()["results"]]
+        self.assertEqual(errors, [
+            None,
+            "You have already reviewed this place",
+            "You cannot review your own place",
+            "Rating must be between 1 and 5",
+            "Place not found",
+        ])
+
+    def test_batch_rejects_malformed_items_without_500(self):
+        r = self.client.post(
+            "/api/v1/places/batch",
+            data=json.dumps({"items": [{"title": "T", "latitude": 1.0, "longitude": 2.0, "price_per_night": {"a": 1}}]}),
+            headers=_headers(self.user_token),
+        )
+        self.assertEqual(r.status_code, 400, msg=r.get_data(as_text=True))
+        r = self.client.post(
+            "/api/v1/reviews/batch",
+            data=json.dumps({"items": [{"text": "Hi", "rating": 4, "place_id": ["p"]}]}),
+            headers=_headers(self.user_token),
+        )
+        self.assertEqual(r.status_code, 400, msg=r.get_data(as_text=True))
+
+        # the facade reports type errors per item rather than raising
+        with self.app.app_context():
+            places = facade.create_places([
+                {"title": "T", "latitude": 1.0, "longitude": 2.0, "price_per_night": {"a": 1}},
+                {"title": ["T"], "latitude": 1.0, "longitude": 2.0},
+                {"title": "Ok", "latitude": 1.0, "longitude": 2.0},
+            ], self.user_id)
+            reviews = facade.create_reviews([
+                {"text": "Hi", "rating": 4, "place_id": ["p"]},
+                {"text": 5, "rating": 4, "place_id": places[2]["id"]},
+            ], self.admin_id)
+        self.assertEqual([r.get("error") for r in places], [
+            "Price per night must be a valid number", "Title and description must be strings", None,
+        ])
+        self.assertEqual([r.get("error") for r in reviews], [
+            "Place not found", "Review text must be a string",
+        ])
+
+    def test_batch_requires_non_empty_items(self):
+        r = self.client.post("/api/v1/places/batch", data=json.dumps({"items": []}), headers=_headers(self.user_token))
+        self.assertEqual(r.status_code, 400)
+
+    def test_large_place_batch_is_indexed_once_and_keeps_the_trigger(self):
+        items = [{"title": f"Batched {i}", "latitude": 57.64911, "longitude": 10.40744} for i in range(150)]
+        items[-1]["title"] = "Zanzibar lighthouse"
+        with self.app.app_context():
+            facade.create_places(items, self.user_id)
+            found, _ = facade.search_places("zanzibar", 5)
+            self.assertEqual([p.title for p, _ in found], ["Zanzibar lighthouse"])
+            self.assertEqual(found[0][0].geohash, geo.encode(57.64911, 10.40744))
+            self.assertEqual(geo.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+            trigger = db.session.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'places_fts_ai'"
+            )).first()
+            self.assertIsNotNone(trigger)
+
+            facade.create_place({"title": "Zanzibar cabin", "latitude": 1.0, "longitude": 2.0, "owner_id": self.user_id})
+            found, _ = facade.search_places("zanzibar", 5)
+            self.assertEqual(len(found), 2)
+
+
+    def test_signup_commits_once(self):
+        commits = []
+        with self.app.app_context():
+            engine = db.engine
+        listener = lambda conn: commits.append(conn)
+        event.listen(engine, "commit", listener)
+        try:
+            r = self.client.post(
+                "/api/v1/users/signup",
+                data=json.dumps({"email": "once@example.com", "password": "pw"}),
+                headers=_headers(),
+            )
+        finally:
+            event.remove(engine, "commit", listener)
+        self.assertEqual(r.status_code, 201, msg=r.get_data(as_text=True))
+        self.assertEqual(len(commits), 1)
+
+    def test_unit_of_work_rolls_back_every_write_on_error(self):
+        with self.app.app_context():
+            with self.assertRaises(RuntimeError):
+                with unit_of_work():
+                    facade.create_amenity({"name": "Sauna"})
+                    facade.create_amenity({"name": "Spa"})
+                    raise RuntimeError("boom")
+            self.assertIsNone(facade.amenity_repo.get_by_name("Sauna"))
+
+            facade.create_amenity({"name": "Sauna"})
+        with self.app.app_context():
+            self.assertIsNotNone(facade.amenity_repo.get_by_name("Sauna"))
+
+    def _cache_stats(self, table):
+        return self.app.extensions["object_cache"].stats().get(table, {})
+
+    def test_object_cache_serves_repeat_reads_by_id_and_key(self):
+        amenity = self._create_amenity_as_admin("Pool")
+        get = lambda: self.client.get(f"/api/v1/amenities/{amenity['id']}", headers=_headers())
+
+        cold, _ = self._count_queries(get)
+        warm, r = self._count_queries(get)
+        self.assertEqual(r.get_json()["name"], "Pool")
+        self.assertEqual(warm, cold - 1)
+
+        hits = self._cache_stats("amenities")["hits"]
+        for _ in range(2):
+            with self.app.app_context():
+                self.assertEqual(facade.amenity_repo.get_by_name("Pool").id, amenity["id"])
+        stats = self._cache_stats("amenities")
+        # caching the row by id also registered its unique name
+        self.assertEqual(stats["hits"] - hits, 2)
+        self.assertEqual(stats["size"], 2)
+
+    def test_object_cache_keeps_password_hashes_out(self):
+        cache = self.app.extensions["object_cache"]
+        with self.app.app_context():
+            facade.user_repo.get_by_email("user@example.com")
+            state = cache.lookup(User, ("email", "user@example.com"))
+        self.assertIsNotNone(state)
+        self.assertNotIn("password", state)
+
+        # a hit loads the hash from the database when it is needed
+        self._login("user@example.com", "userpass")
+        with self.app.app_context():
+            user = facade.user_repo.get_by_email("user@example.com")
+            self.assertTrue(user.check_password("userpass"))
+
+    def test_object_cache_is_invalidated_by_writes(self):
+        amenity = self._create_amenity_as_admin("Pool")
+        with self.app.app_context():
+            facade.amenity_repo.get_by_name("Pool")
+
+        self.client.put(
+            f"/api/v1/amenities/{amenity['id']}",
+            data=json.dumps({"name": "Lap pool"}),
+            headers=_headers(self.admin_token),
+        )
+        with self.app.app_context():
+            self.assertEqual(facade.get_amenity(amenity["id"]).name, "Lap pool")
+            self.assertIsNone(facade.amenity_repo.get_by_name("Pool"))
+
+        # Core UPDATEs drop exactly the rows they name
+        ids = self._seed_rated_places({"Cached": [4], "Other": [3]})
+        with self.app.app_context():
+            facade.get_place(ids["Cached"])
+            facade.get_place(ids["Other"])
+        with self.app.app_context():
+            with unit_of_work():
+                facade.place_repo.adjust_ratings({ids["Cached"]: {2: 1}})
+        self.assertEqual(self._cache_stats("places")["size"], 1)
+        with self.app.app_context():
+            self.assertEqual(facade.get_place(ids["Cached"]).review_count, 2)
+
+        # bulk deletes that name no rows drop the whole table
+        with self.app.app_context():
+            db.session.query(Amenity).delete()
+            db.session.commit()
+        with self.app.app_context():
+            self.assertIsNone(facade.get_amenity(amenity["id"]))
+
+    def test_object_cache_can_be_switched_off_per_repository(self):
+        amenity = self._create_amenity_as_admin("Pool")
+        before = self._cache_stats("amenities")
+        facade.amenity_repo.cached = False
+        try:
+            for _ in range(2):
+                with self.app.app_context():
+                    self.assertIsNotNone(facade.get_amenity(amenity["id"]))
+        finally:
+            del facade.amenity_repo.cached
+        self.assertEqual(self._cache_stats("amenities"), before)
+
+    def test_lru_cache_evicts_least_recent_and_expires(self):
+        from app.cache.lru import LRUCache
+
+        now = [0.0]
+        cache = LRUCache(2, ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+        now[0] = 11
+        self.assertIsNone(cache.get("c"))
+        stats = cache.stats()
+        self.assertEqual((stats["evictions"], stats["expirations"], stats["size"]), (1, 1, 1))
+
+    def test_list_fragments_are_reused_until_the_row_changes(self):
+        ids = self._seed_rated_places({"Loft": [4], "Cabin": [3]})
+        amenity = self._create_amenity_as_admin("Sauna")
+        with self.app.app_context():
+            with unit_of_work():
+                loft = facade.get_place(ids["Loft"])
+                loft.amenities.append(db.session.get(Amenity, amenity["id"]))
+                facade.place_repo.update()
+
+        cache = self.app.extensions["fragment_cache"]
+
+        def listing():
+            # the same query string would be answered with a 304-able ETag;
+            # vary it so every call renders the page
+            r = self.client.get(f"/api/v1/places/?limit={50 - cache.hits - cache.misses}", headers=_headers())
+            self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+            return {p["title"]: p for p in r.get_json()["items"]}
+
+        listing()
+        hits, misses = cache.hits, cache.misses
+        places = listing()
+        self.assertEqual((cache.hits - hits, cache.misses - misses), (2, 0))
+        self.assertEqual(places["Loft"]["amenities"], [{"id": amenity["id"], "name": "Sauna"}])
+
+        # rating aggregates change through Core UPDATEs, amenity names elsewhere
+        self.client.put(
+            f"/api/v1/amenities/{amenity['id']}",
+            data=json.dumps({"name": "Steam room"}),
+            headers=_headers(self.admin_token),
+        )
+        with self.app.app_context():
+            with unit_of_work():
+                facade.place_repo.adjust_ratings({ids["Cabin"]: {5: 1}})
+
+        hits, misses = cache.hits, cache.misses
+        places = listing()
+        self.assertEqual((cache.hits - hits, cache.misses - misses), (0, 2))
+        self.assertEqual(places["Loft"]["amenities"][0]["name"], "Steam room")
+        self.assertEqual(places["Cabin"]["review_count"], 2)
+
+    def test_lru_cache_bounds_total_bytes(self):
+        from app.cache.lru import LRUCache
+
+        cache = LRUCache(None, maxbytes=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"5678")
+        cache.set("c", b"90ab")
+        cache.set("huge", b"x" * 11)
+        self.assertEqual((cache.get("a"), cache.get("huge")), (None, None))
+        stats = cache.stats()
+        self.assertEqual((stats["bytes"], stats["size"], stats["evictions"]), (8, 2, 1))
+
+    def test_compiled_serializers(self):
+        from app.serializers import field_names, serializer
+
+        ids = self._seed_rated_places({"Loft": [4, 2]})
+        with self.app.app_context():
+            # the serializer is its own loading profile: reviews and authors included
+            with_reviews = serializer("place", ("reviews", *field_names("place")))
+            place = facade.get_place(ids["Loft"], profile=with_reviews)
+            data = place.to_dict(include_reviews=True)
+            self.assertEqual(data["rating_histogram"], {"1": 0, "2": 1, "3": 0, "4": 1, "5": 0})
+            self.assertEqual((data["review_count"], data["average_rating"]), (2, 3.0))
+            self.assertEqual(data["amenities"], [])
+            self.assertEqual(
+                sorted(r["user"]["email"] for r in data["reviews"]),
+                ["ranker0@example.com", "ranker1@example.com"],
+            )
+            self.assertEqual(serializer("place", ["title", "id"])(place), {"id": ids["Loft"], "title": "Loft"})
+            self.assertIs(serializer("place", ("id", "title")), serializer("place", {"title", "id"}))
+            with self.assertRaises(ValueError):
+                serializer("place", ("id", "password"))
+
+            # expired attributes are not in __dict__: the slow path loads them
+            db.session.expire(place)
+            self.assertEqual(serializer("place", ("title", "review_count"))(place), {"title": "Loft", "review_count": 2})
+
+    def test_sparse_fieldsets_select_only_requested_fields(self):
+        self._seed_places_with_amenities_and_reviews(3, "sparse")
+        statements = []
+
+        def _before(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", _before)
+        try:
+            r = self.client.get("/api/v1/places/?fields=id,title,amenities", headers=_headers())
+        finally:
+            event.remove(engine, "before_cursor_execute", _before)
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        items = [p for p in r.get_json()["items"] if p["title"].startswith("sparse")]
+        self.assertEqual(len(items), 3)
+        self.assertEqual(set(items[0]), {"id", "title", "amenities"})
+        self.assertEqual(len(items[0]["amenities"]), 2)
+
+        # one SELECT for the page, one SELECT ... IN for the amenities
+        page, related = [s for s in statements if "FROM places" in s]
+        self.assertNotIn("places.description", page)
+        self.assertNotIn("places.price_per_night", page)
+        self.assertIn("amenities.name", related)
+        self.assertFalse([s for s in statements if "FROM reviews" in s])
+
+        place_id = items[0]["id"]
+        r = self.client.get(f"/api/v1/places/{place_id}?fields=title,reviews", headers=_headers())
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        self.assertEqual(set(r.get_json()), {"title", "reviews"})
+        self.assertEqual(r.get_json()["reviews"][0]["user"]["id"], self.admin_id)
+
+        r = self.client.get("/api/v1/amenities/?fields=name", headers=_headers())
+        self.assertEqual({tuple(a) for a in r.get_json()["items"]}, {("name",)})
+        r = self.client.get("/api/v1/places/?fields=id,password", headers=_headers())
+        self.assertEqual(r.status_code, 400)
+
+    def test_export_streams_rows_in_chunks(self):
+        self._seed_places_with_amenities_and_reviews(5, "export")
+        with self.app.app_context():
+            total = Place.query.count()
+
+        def export_places():
+            # the body is produced while it is read
+            r = self.client.get("/api/v1/export/places", headers=_headers(self.admin_token))
+            return r, r.get_data(as_text=True)
+
+        self.app.config["EXPORT_CHUNK_SIZE"] = 2
+        try:
+            count, (r, body) = self._count_queries(export_places)
+        finally:
+            self.app.config["EXPORT_CHUNK_SIZE"] = 1000
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        # generator body: no Content-Length, sent as it is produced
+        self.assertNotIn("Content-Length", r.headers)
+        self.assertEqual(r.mimetype, "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), total)
+        self.assertEqual(len(next(p for p in rows if p["title"] == "export0")["amenities"]), 2)
+        # the id cursor, then the places and their amenities chunk by chunk
+        self.assertEqual(count, 1 + 2 * ((total + 1) // 2))
+
+        r = self.client.get("/api/v1/export/reviews?format=csv&fields=id,rating,user", headers=_headers(self.admin_token))
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        lines = r.get_data(as_text=True).splitlines()
+        self.assertEqual(lines[0], "id,rating,user")
+        self.assertIn('"{""id"":', lines[1])
+
+        self.assertEqual(self.client.get("/api/v1/export/places", headers=_headers(self.user_token)).status_code, 403)
+        self.assertEqual(self.client.get("/api/v1/export/secrets", headers=_headers(self.admin_token)).status_code, 404)
+        r = self.client.get("/api/v1/export/users?format=xml", headers=_headers(self.admin_token))
+        self.assertEqual(r.status_code, 400)
+
+        result = self.app.test_cli_runner().invoke(args=["export", "users", "--format", "csv", "--fields", "email"])
+        self.assertEqual(result.exit_code, 0, msg=result.output)
+        self.assertEqual(result.output.splitlines()[0], "email")
+        self.assertIn("admin@example.com", result.output.splitlines())
+
+    def test_admin_cache_stats(self):
+        amenity = self._create_amenity_as_admin("Pool")
+        self.client.get(f"/api/v1/amenities/{amenity['id']}", headers=_headers())
+
+        r = self.client.get("/api/v1/admin/cache", headers=_headers(self.user_token))
+        self.assertEqual(r.status_code, 403)
+        r = self.client.get("/api/v1/admin/cache", headers=_headers(self.admin_token))
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        self.assertEqual(r.get_json()["regions"]["amenities"], self._cache_stats("amenities"))
+        self.assertEqual(r.get_json()["regions"]["amenities"]["size"], 2)
+
+        r = self.client.delete("/api/v1/admin/cache", headers=_headers(self.admin_token))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(self._cache_stats("amenities")["size"], 0)
+
+
+
+class ReadReplicaRoutingTests(unittest.TestCase):
+    """Two SQLite files stand in for the primary and the replica."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        primary = os.path.join(cls.tmp.name, "primary.db")
+        replica = os.path.join(cls.tmp.name, "replica.db")
+
+        class ReplicaConfig(DevelopmentConfig):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{primary}"
+            SQLALCHEMY_BINDS = {"replica": f"sqlite:///{replica}"}
+            # cache misses are read from the primary; these tests are about routing
+            OBJECT_CACHE_SIZE = 0
+
+        cls.app = create_app(ReplicaConfig)
+        cls.client = cls.app.test_client()
+        with cls.app.app_context():
+            db.create_all()
+            db.metadata.create_all(db.engines["replica"])
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        cls.tmp.cleanup()
+
+    def _insert_amenity(self, bind, name):
+        with self.app.app_context():
+            amenity_id = f"id-{name}"
+            with db.engines[bind].begin() as conn:
+                conn.execute(Amenity.__table__.insert().values(id=amenity_id, name=name))
+        return amenity_id
+
+    def test_file_databases_share_one_instrumented_pool(self):
+        from app.db.pool import InstrumentedQueuePool, pool_status
+        from app.db.session import SessionLocal
+
+        with self.app.app_context():
+            engine = db.engine
+            self.assertIsInstance(engine.pool, InstrumentedQueuePool)
+            self.assertIs(SessionLocal.kw["bind"], engine)
+
+            c1, c2 = engine.connect(), engine.connect()
+            try:
+                status = pool_status(engine)
+                self.assertEqual(status["checked_out"], 2)
+                self.assertEqual(status["size"], DevelopmentConfig.DB_POOL_SIZE)
+                self.assertGreaterEqual(status["waits"]["checkouts"], 2)
+            finally:
+                c1.close()
+                c2.close()
+
+    def test_repository_reads_go_to_the_replica(self):
+        amenity_id = self._insert_amenity("replica", "ReplicaOnly")
+        r = self.client.get(f"/api/v1/amenities/{amenity_id}")
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        self.assertEqual(r.get_json()["name"], "ReplicaOnly")
+
+    def test_writes_and_reads_after_them_stay_on_the_primary(self):
+        with self.app.app_context():
+            amenity = facade.create_amenity({"name": "PrimaryOnly"})
+            self.assertIsNotNone(facade.get_amenity(amenity.id))
+            self.assertIsNotNone(facade.amenity_repo.get_by_name("PrimaryOnly"))
+            amenity_id = amenity.id
+
+        with self.app.app_context():
+            with db.engines["replica"].connect() as conn:
+                rows = conn.execute(Amenity.__table__.select().where(Amenity.id == amenity_id)).all()
+            self.assertEqual(rows, [])
+            # a fresh session with no writes reads from the (lagging) replica
+            self.assertIsNone(facade.get_amenity(amenity_id))
+
+    def test_object_cache_is_filled_from_the_primary(self):
+        with self.app.app_context():
+            for bind, name in (("replica", "Stale copy"), (None, "Fresh copy")):
+                with db.engines[bind].begin() as conn:
+                    conn.execute(Amenity.__table__.insert().values(id="id-lagging", name=name))
+
+        cache = self.app.extensions["object_cache"]
+        cache.maxsize = 100
+        try:
+            for _ in range(2):  # a miss, then a hit
+                with self.app.app_context():
+                    self.assertEqual(facade.get_amenity("id-lagging").name, "Fresh copy")
+            self.assertIsNotNone(cache.lookup(Amenity, ("id", "id-lagging")))
+        finally:
+            cache.clear()
+            cache.maxsize = 0
+
+
+
+class SQLiteProfileTests(unittest.TestCase):
+    def test_production_profile_sets_pragmas_on_each_connection(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            class ProfileConfig(DevelopmentConfig):
+                TESTING = True
+                SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'wal.db')}"
+                SQLITE_PROFILE = "production"
+
+            app = create_app(ProfileConfig)
+            with app.app_context():
+                with db.engine.connect() as conn:
+                    pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                    self.assertEqual(pragma("journal_mode"), "wal")
+                    self.assertEqual(pragma("synchronous"), 1)  # NORMAL
+                    self.assertEqual(pragma("busy_timeout"), 5000)
+                    self.assertEqual(pragma("temp_store"), 2)  # MEMORY
+                db.engine.dispose()
+
+    def test_unknown_profile_is_rejected(self):
+        class BadConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+            SQLITE_PROFILE = "turbo"
+
+        with self.assertRaises(ValueError):
+            create_app(BadConfig)
+
+
+
+class _RespStandIn:
+    """In-process stand-in for a Redis server: the commands the cache uses, nothing else."""
+
+    def __init__(self):
+        import fnmatch
+        import socketserver
+        import threading
+
+        self.data, self.subscribers, self.lock = {}, {}, threading.Lock()
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def _reply(self, value):
+                if value is None:
+                    out = b"$-1\r\n"
+                elif isinstance(value, int):
+                    out = b":%d\r\n" % value
+                elif isinstance(value, str):
+                    out = f"+{value}\r\n".encode()
+                elif isinstance(value, bytes):
+                    out = b"$%d\r\n%s\r\n" % (len(value), value)
+                else:
+                    self.wfile.write(b"*%d\r\n" % len(value))
+                    for item in value:
+                        self._reply(item)
+                    return
+                self.wfile.write(out)
+
+            def _command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+            def handle(self):
+                while True:
+                    args = self._command()
+                    if args is None:
+                        return
+                    name, args = args[0].upper(), args[1:]
+                    with stand_in.lock:
+                        if name == b"GET":
+                            entry = stand_in.data.get(args[0])
+                            if entry and entry[1] is not None and entry[1] <= time.monotonic():
+                                del stand_in.data[args[0]]
+                                entry = None
+                            self._reply(entry[0] if entry else None)
+                        elif name == b"SET":
+                            ttl = int(args[3]) / 1000 if len(args) > 3 else None
+                            stand_in.data[args[0]] = (args[1], time.monotonic() + ttl if ttl else None)
+                            self._reply("OK")
+                        elif name == b"DEL":
+                            self._reply(sum(stand_in.data.pop(k, None) is not None for k in args))
+                        elif name == b"SCAN":
+                            pattern = args[args.index(b"MATCH") + 1].decode()
+                            keys = [k for k in stand_in.data if fnmatch.fnmatchcase(k.decode(), pattern)]
+                            self._reply([b"0", keys])
+                        elif name == b"PUBLISH":
+                            sinks = stand_in.subscribers.get(args[0], [])
+                            for sink in sinks:
+                                sink._reply([b"message", args[0], args[1]])
+                            self._reply(len(sinks))
+                        elif name == b"SUBSCRIBE":
+                            stand_in.subscribers.setdefault(args[0], []).append(self)
+                            self._reply([b"subscribe", args[0], 1])
+                        else:
+                            self._reply("OK")
+
+        class Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.url = f"redis://127.0.0.1:{self.server.server_address[1]}/0"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SharedCacheBackendTests(unittest.TestCase):
+    """Two ObjectCache instances stand in for two gunicorn workers."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.sqlite_url = f"sqlite:///{os.path.join(self.tmp.name, 'cache.db')}"
+
+    def _workers(self, backend, bus_url):
+        from app.cache import backends
+        from app.cache.objects import ObjectCache
+
+        workers = []
+        for _ in range(2):
+            bus = backends.open_bus(bus_url, "invalidations")
+            workers.append(ObjectCache(100, 60, (), backend, bus))
+            if hasattr(bus, "close"):
+                self.addCleanup(bus.close)
+        return workers
+
+    def _amenity(self, name="Pool"):
+        amenity = Amenity(name=name)
+        amenity.id = "a-1"
+        return amenity
+
+    def _wait_for(self, condition):
+        deadline = time.monotonic() + 2
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def _check_shared_store(self, backend, bus_url):
+        a, b = self._workers(backend, bus_url)
+        a.store(self._amenity(), ("name",))
+        self.assertEqual(b.lookup(Amenity, ("name", "Pool"))["id"], "a-1")
+
+        b.lookup(Amenity, ("id", "a-1"))  # subscribes b before a publishes
+        generation = b.generation("amenities")
+        a.invalidate("amenities", ["a-1"], publish=True)
+        self.assertIsNone(b.lookup(Amenity, ("id", "a-1")))
+        # b's reads that started before the invalidation are not stored
+        self.assertTrue(self._wait_for(lambda: b.lookup(Amenity, ("id", "x")) is None
+                                       and b.generation("amenities") > generation))
+
+    def test_sqlite_file_is_shared_and_fans_out_invalidations(self):
+        self._check_shared_store(self.sqlite_url, self.sqlite_url)
+
+    def test_redis_protocol_backend_against_a_stand_in_server(self):
+        server = _RespStandIn()
+        self.addCleanup(server.close)
+        self._check_shared_store(server.url, server.url)
+
+        a, _ = self._workers(server.url, server.url)
+        a.clear(["amenities"])
+        self.assertEqual([k for k in server.data if b"obj:amenities" in k], [])
+
+    def test_per_process_copies_are_invalidated_through_the_bus(self):
+        a, b = self._workers("memory", self.sqlite_url)
+        for worker in (a, b):
+            worker.store(self._amenity(), ("name",))
+        a.invalidate("amenities", ["a-1"], publish=True)
+        self.assertIsNone(a.lookup(Amenity, ("id", "a-1")))
+        self.assertIsNone(b.lookup(Amenity, ("id", "a-1")))
+        self.assertEqual(b.regions["amenities"].stats()["size"], 1)  # only the name alias is left
+
+    def test_sqlite_bus_polls_at_most_once_per_interval(self):
+        from app.cache import backends
+
+        sender = backends.open_bus(self.sqlite_url, "invalidations")
+        receiver = backends.open_bus(self.sqlite_url, "invalidations", poll_interval=60)
+        received = []
+        receiver.subscribe(received.append)
+        receiver.poll()
+        sender.publish({"table": "amenities", "ids": ["a-1"]})
+        receiver.poll()
+        self.assertEqual(received, [])
+
+        receiver._next_poll = 0
+        receiver.poll()
+        self.assertEqual(received, [{"table": "amenities", "ids": ["a-1"]}])
+
+    def test_unreachable_cache_degrades_to_misses(self):
+        server = _RespStandIn()
+        server.close()
+        missing_dir = f"sqlite:///{os.path.join(self.tmp.name, 'missing', 'cache.db')}"
+        for backend in (server.url, missing_dir):
+            a, _ = self._workers(backend, backend)
+            a.store(self._amenity(), ("name",))
+            self.assertIsNone(a.lookup(Amenity, ("id", "a-1")))
+            a.invalidate("amenities", ["a-1"], publish=True)
+            self.assertGreater(a.regions["amenities"].stats()["errors"], 0, backend)
+
+        class OutageConfig(DevelopmentConfig):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(self.tmp.name, 'outage.db')}"
+            CACHE_BACKEND = server.url
+
+        app = create_app(OutageConfig)
+        self.addCleanup(app.extensions["object_cache"].bus.close)
+        with app.app_context():
+            db.metadata.create_all(db.engine)
+            # the commit's invalidation cannot reach the server; the write stands
+            amenity_id = facade.create_amenity({"name": "Pool"}).id
+            facade.update_amenity(amenity_id, {"name": "Lap pool"})
+        r = app.test_client().get(f"/api/v1/amenities/{amenity_id}")
+        self.assertEqual(r.status_code, 200, msg=r.get_data(as_text=True))
+        self.assertEqual(r.get_json()["name"], "Lap pool")
+        with app.app_context():
+            db.engine.dispose()
+
+    def test_apps_sharing_a_cache_file_see_each_others_writes(self):
+        database = os.path.join(self.tmp.name, "hbnb.db")
+
+        class WorkerConfig(DevelopmentConfig):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+            CACHE_BACKEND = self.sqlite_url
+
+        first, second = create_app(WorkerConfig), create_app(WorkerConfig)
+        with first.app_context():
+            db.metadata.create_all(db.engine)
+            amenity_id = facade.create_amenity({"name": "Pool"}).id
+            db.session.commit()
+
+        for app in (first, second):
+            with app.app_context():
+                self.assertEqual(facade.get_amenity(amenity_id).name, "Pool")
+        self.assertEqual(second.extensions["object_cache"].regions["amenities"].hits, 1)
+
+        with first.app_context():
+            facade.update_amenity(amenity_id, {"name": "Lap pool"})
+        with second.app_context():
+            self.assertEqual(facade.get_amenity(amenity_id).name, "Lap pool")
+
+        for app in (first, second):
+            with app.app_context():
+                db.engine.dispose()
+
+
+
+class SingleFlightTests(unittest.TestCase):
+    """Threads stand in for concurrent requests; a file database lets them share data."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+
+        class FlightConfig(DevelopmentConfig):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(cls.tmp.name, 'flights.db')}"
+
+        cls.app = create_app(FlightConfig)
+        with cls.app.app_context():
+            db.metadata.create_all(db.engine)
+            owner = User(email="owner@example.com", password="x")
+            place = Place(title="Loft", latitude=1.0, longitude=2.0, owner=owner)
+            place.amenities.append(Amenity(name="Wifi"))
+            db.session.add(place)
+            db.session.commit()
+            cls.place_id = place.id
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls.app.app_context():
+            db.engine.dispose()
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.flights = self.app.extensions["singleflight"]
+        self.app.extensions["object_cache"].clear(["places"])
+        self.release = threading.Event()
+        original = facade.place_repo.get_by_id
+
+        def slow_get_by_id(*args, **kwargs):
+            self.release.wait(5)
+            return original(*args, **kwargs)
+
+        facade.place_repo.get_by_id = slow_get_by_id
+        self.addCleanup(lambda: delattr(facade.place_repo, "get_by_id"))
+
+    def _get_place(self, results):
+        def run():
+            with self.app.app_context():
+                place = facade.get_place(self.place_id, profile="detail")
+                loaded = "amenities" in inspect(place).dict
+                results.append((place.title, loaded, [a.name for a in place.amenities], db.session()))
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def _counters(self):
+        return self.flights.stats().get("get_place", {"calls": 0, "executions": 0, "coalesced": 0})
+
+    def _wait_for_calls(self, calls):
+        deadline = time.monotonic() + 5
+        while self._counters()["calls"] < calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_concurrent_reads_share_one_execution(self):
+        before = self._counters()
+        results = []
+        threads = [self._get_place(results) for _ in range(5)]
+        self._wait_for_calls(before["calls"] + 5)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        after = self._counters()
+        self.assertEqual(after["executions"] - before["executions"], 1)
+        self.assertEqual(after["coalesced"] - before["coalesced"], 4)
+        # followers got the place with its amenities already loaded
+        self.assertEqual({(title, loaded, tuple(names)) for title, loaded, names, _ in results},
+                         {("Loft", True, ("Wifi",))})
+        # every request got objects of its own session
+        self.assertEqual(len({id(r[3]) for r in results}), 5)
+
+    def test_reads_after_a_commit_do_not_join_older_flights(self):
+        before = self._counters()
+        results = []
+        first = self._get_place(results)
+        self._wait_for_calls(before["calls"] + 1)
+
+        with self.app.app_context():
+            facade.create_amenity({"name": f"Sauna {before['calls']}"})
+            db.session.commit()
+
+        second = self._get_place(results)
+        self._wait_for_calls(before["calls"] + 2)
+        self.release.set()
+        first.join()
+        second.join()
+
+        after = self._counters()
+        self.assertEqual(after["executions"] - before["executions"], 2)
+        self.assertEqual(after["coalesced"], before["coalesced"])
+
+    def test_review_and_amenity_list_pages_coalesce(self):
+        original = facade.amenity_repo.get_page
+
+        def slow_get_page(*args, **kwargs):
+            self.release.wait(5)
+            return original(*args, **kwargs)
+
+        facade.amenity_repo.get_page = slow_get_page
+        self.addCleanup(lambda: delattr(facade.amenity_repo, "get_page"))
+
+        stats = lambda: {
+            name: self.flights.stats().get(name, {"calls": 0, "executions": 0})
+            for name in ("get_reviews_page", "get_amenities_page")
+        }
+        before = stats()
+        reviews = f"/api/v1/reviews/?place_id={self.place_id}&limit=5"
+        # identical pages share a flight; another limit is another flight
+        urls = [reviews] * 3 + [reviews.replace("limit=5", "limit=6")]
+        urls += ["/api/v1/amenities/?limit=5"] * 3 + ["/api/v1/amenities/?limit=6"]
+        statuses = []
+
+        def get(url):
+            statuses.append(self.app.test_client().get(url).status_code)
+
+        threads = [threading.Thread(target=get, args=(url,)) for url in urls]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while (any(stats()[name]["calls"] - before[name]["calls"] < 4 for name in before)
+               and time.monotonic() < deadline):
+            time.sleep(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200] * 8)
+        for name, counters in stats().items():
+            self.assertEqual(counters["calls"] - before[name]["calls"], 4, name)
+            self.assertEqual(counters["executions"] - before[name]["executions"], 2, name)
+
+    def test_followers_get_the_leaders_error(self):
+        errors = []
+
+        def run():
+            with self.app.app_context():
+                try:
+                    facade.get_reviews_page(10, place_id="missing")
+                except ValueError as e:
+                    errors.append(str(e))
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while self.flights.stats().get("get_reviews_page", {}).get("calls", 0) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, ["Place not found"] * 3)
+
+
+class ProductionEntryPointTests(unittest.TestCase):
+    """The app factory leaves the schema alone; init-db and the gunicorn config do the rest."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        class FreshConfig(DevelopmentConfig):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(self.tmp.name, 'fresh.db')}"
+
+        self.app = create_app(FreshConfig)
+        self.addCleanup(self._dispose)
+
+    def _dispose(self):
+        with self.app.app_context():
+            db.engine.dispose()
+
+    def _tables(self):
+        with self.app.app_context():
+            return set(inspect(db.engine).get_table_names())
+
+    def test_init_db_creates_the_schema_the_app_factory_does_not(self):
+        self.assertNotIn("places", self._tables())
+
+        runner = self.app.test_cli_runner()
+        r1 = runner.invoke(args=["init-db"])
+        self.assertEqual(r1.exit_code, 0, r1.output)
+        self.assertIn("created table users", r1.output)
+        self.assertIn("created table places", r1.output)
+        self.assertTrue({"users", "places", "reviews", "amenities", fulltext.FTS_TABLE} <= self._tables())
+
+        r2 = runner.invoke(args=["init-db"])
+        self.assertEqual(r2.output.strip(), "schema up to date")
+
+    def test_init_db_rebuilds_an_empty_leaderboard_over_existing_reviews(self):
+        runner = self.app.test_cli_runner()
+        runner.invoke(args=["init-db"])
+        with self.app.app_context():
+            owner = User(email="owner@x.io", password="x")
+            guest = User(email="guest@x.io", password="x")
+            db.session.add_all([owner, guest])
+            db.session.flush()
+            place = Place(title="Seeded", latitude=1.0, longitude=2.0, owner_id=owner.id)
+            db.session.add(place)
+            db.session.flush()
+            db.session.add(Review(text="Lovely", rating=5, user_id=guest.id, place_id=place.id))
+            db.session.commit()
+            facade.repair_rating_aggregates()
+
+        r = runner.invoke(args=["init-db"])
+        self.assertEqual(r.output.strip(), "leaderboard was empty: ranked 1 places")
+        with self.app.app_context():
+            self.assertEqual(PlaceRanking.query.count(), 1)
+        self.assertEqual(runner.invoke(args=["init-db"]).output.strip(), "schema up to date")
+
+    def test_forked_workers_start_with_empty_pools(self):
+        from app.db.database import dispose_after_fork
+
+        with self.app.app_context():
+            with db.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            inherited = db.engine.pool
+            self.assertEqual(inherited.checkedin(), 1)
+
+        dispose_after_fork(self.app)
+        with self.app.app_context():
+            self.assertIsNot(db.engine.pool, inherited)
+            self.assertEqual(db.engine.pool.checkedin(), 0)
+            with db.engine.connect() as conn:
+                self.assertEqual(conn.execute(text("SELECT 1")).scalar(), 1)
+
+    def test_gunicorn_settings_come_from_config(self):
+        import runpy
+        from config import get_config
+
+        settings = runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py"))
+        config = get_config("production")
+        self.assertTrue(settings["preload_app"])
+        self.assertEqual(settings["workers"], config.WEB_WORKERS)
+        self.assertEqual(settings["threads"], config.WEB_THREADS)
+        self.assertEqual(settings["bind"], config.WEB_BIND)
+        self.assertTrue(callable(settings["post_fork"]))
+
+    def test_lazy_api_is_built_by_the_first_request(self):
+        from app.api.v1 import DeferredApi, load_api
+
+        class LazyConfig(DevelopmentConfig):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+            LAZY_API = True
+
+        app = create_app(LazyConfig)
+        deferred = app.extensions["api"]
+        self.assertIsInstance(deferred, DeferredApi)
+        self.assertFalse(any(rule.rule.startswith("/api/v1/places") for rule in app.url_map.iter_rules()))
+
+        with app.app_context():
+            db.metadata.create_all(db.engine)
+        r = app.test_client().get("/api/v1/amenities/")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(any(rule.rule.startswith("/api/v1/places") for rule in app.url_map.iter_rules()))
+
+        api = deferred.api
+        self.assertIs(load_api(app), api)
+        self.assertEqual(app.test_client().get("/api/v1/places/").status_code, 200)
+        self.assertIs(deferred.api, api)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,11 @@
+"""
+Production entry point: ``gunicorn wsgi:app`` (settings in gunicorn.conf.py).
+
+Only builds the app. The schema is created and migrated by ``flask --app
+wsgi init-db``, once per deployment, not by every worker that imports this.
+"""
+
+from app import create_app
+from config import get_config
+
+app = create_app(get_config("production"))
@@ -98,12 +98,36 @@ function setupLoginForm() {
     }
 }
 
+// ========== Pagination ==========
+async function fetchAllPages(url) {
+    const items = [];
+    let cursor = null;
+
+    do {
+        const sep = url.includes('?') ? '&' : '?';
+        const pageUrl = cursor ? `${url}${sep}cursor=${encodeURIComponent(cursor)}` : url;
+        // revalidate with the API's ETag: unchanged pages come back as 304
+        // and are served from the browser cache
+        const response = await fetch(pageUrl, { cache: 'no-cache' });
+        if (!response.ok) throw new Error('Failed');
+        const page = await response.json();
+        items.push(...(page.items || []));
+        cursor = page.next_cursor;
+    } while (cursor);
+
+    return items;
+}
+
 // ========== Places ==========
-async function fetchPlaces() {
+async function fetchPlaces(filters = {}) {
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') params.set(key, value);
+    });
+    const query = params.toString();
+
     try {
-        const response = await fetch(`${API_URL}/places/`);
-        if (!response.ok) throw new Error('Failed');
-        return await response.json();
+        return await fetchAllPages(`${API_URL}/places/${query ? '?' + query : ''}`);
     } catch (error) {
         return [];
     }
@@ -183,35 +207,31 @@ async function displayPlaces() {
 async function displayPlacesInContainer(container, filterElementId) {
     if (!container) return;
 
-    try {
-        const places = await fetchPlaces();
-        
-        if (!places || places.length === 0) {
-            container.innerHTML = '<div class="col-span-full text-center py-12 text-gray-600">No places available</div>';
-            return;
-        }
+    const filter = document.getElementById(filterElementId);
+
+    async function loadPlaces() {
+        const val = filter ? filter.value : 'all';
+        const filters = val === 'all' ? {} : { max_price: val };
+
+        try {
+            const places = await fetchPlaces(filters);
+
+            if (!places || places.length === 0) {
+                container.innerHTML = '<div class="col-span-full text-center py-12 text-gray-600">No places available</div>';
+                return;
+            }
 
-        function renderPlaces(list) {
-            container.innerHTML = list.map(p => createPlaceCard(p)).join('');
+            container.innerHTML = places.map(p => createPlaceCard(p)).join('');
             setupFavorites();
+        } catch (error) {
+            container.innerHTML = '<div class="col-span-full text-center py-12 text-red-600">Error loading places</div>';
         }
+    }
 
-        renderPlaces(places);
-
-        const filter = document.getElementById(filterElementId);
-        if (filter) {
-            filter.addEventListener('change', (e) => {
-                const val = e.target.value;
-                if (val === 'all') {
-                    renderPlaces(places);
-                } else {
-                    const filtered = places.filter(p => p.price_per_night <= Number(val));
-                    renderPlaces(filtered);
-                }
-            });
-        }
-    } catch (error) {
-        container.innerHTML = '<div class="col-span-full text-center py-12 text-red-600">Error loading places</div>';
+    await loadPlaces();
+
+    if (filter) {
+        filter.addEventListener('change', loadPlaces);
     }
 }
 
@@ -252,30 +272,14 @@ async function fetchPlaceDetails(id) {
 async function fetchReviews(placeId) {
     console.log(' Fetching reviews for place:', placeId);
     try {
-        const url = `${API_URL}/reviews/?place_id=${placeId}`;
+        const url = `${API_URL}/reviews/?place_id=${encodeURIComponent(placeId)}`;
         console.log(' Full URL:', url);
-        
-        const response = await fetch(url, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json'
-            }
-        });
-        
-        console.log('Response status:', response.status);
-        console.log(' Response headers:', response.headers);
-        
-        if (!response.ok) {
-            const errorText = await response.text();
-            console.error(' Response error:', errorText);
-            return [];
-        }
-        
-        const data = await response.json();
-        console.log(' Reviews data:', data);
-        console.log(' Number of reviews:', Array.isArray(data) ? data.length : 'Not an array');
-        
-        return Array.isArray(data) ? data : [];
+
+        // every page, not just the first PAGE_SIZE_DEFAULT reviews
+        const reviews = await fetchAllPages(url);
+        console.log(' Number of reviews:', reviews.length);
+
+        return reviews;
     } catch (error) {
         console.error(' Fetch error:', error);
         console.error(' Error type:', error.name);